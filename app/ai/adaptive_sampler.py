@@ -0,0 +1,89 @@
+"""
+Adaptive frame sampling for FaceMonitor.
+
+Detection is skipped while the scene is static and exactly one face was
+seen on the last processed frame. Motion is measured against that
+processed frame, so slow drift adds up until it forces detection. Any
+motion, a missing face or an extra face forces detection, and a change
+away from "one face" switches the sampler to a fast rate for
+``boost_sec``.
+
+A face leaving the frame is motion, so it is detected on the next
+sampled frame. `FaceMonitor` treats skipped frames as the face still
+being in view, so the absence clock starts at that detection.
+``max_skip_sec`` bounds how long a motionless change could go unnoticed;
+`FaceMonitor` caps it at its missing threshold.
+"""
+import numpy as np
+
+
+class AdaptiveSampler:
+    def __init__(
+        self,
+        base_interval_sec=0.5,
+        fast_interval_sec=0.1,
+        boost_sec=5.0,
+        max_skip_sec=5.0,
+        motion_threshold=6.0,
+        thumb_step=16,
+    ):
+        self.base_interval_sec = base_interval_sec
+        self.fast_interval_sec = fast_interval_sec
+        self.boost_sec = boost_sec
+        self.max_skip_sec = max_skip_sec
+        self.motion_threshold = motion_threshold
+        self.thumb_step = thumb_step
+
+        self.processed = 0
+        self.skipped = 0
+
+        self._last_thumb = None
+        self._last_face_count = None
+        self._last_processed_at = None
+        self._boost_until = 0.0
+
+    def should_process(self, frame, now) -> bool:
+        # Strided grey thumbnail: a few hundred pixels, no resize or copy of the frame
+        thumb = frame[::self.thumb_step, ::self.thumb_step].mean(axis=2, dtype=np.float32)
+        previous = self._last_thumb
+
+        static = (
+            previous is not None
+            and previous.shape == thumb.shape
+            and float(np.abs(thumb - previous).mean()) < self.motion_threshold
+        )
+
+        skip = (
+            static
+            and self._last_face_count == 1
+            and now >= self._boost_until
+            and now - self._last_processed_at < self.max_skip_sec
+        )
+
+        if skip:
+            self.skipped += 1
+            return False
+        self._last_thumb = thumb
+        return True
+
+    def record(self, face_count, now):
+        """Report the detection result of a processed frame."""
+        if face_count != 1 and self._last_face_count != face_count:
+            self._boost_until = now + self.boost_sec
+
+        self._last_face_count = face_count
+        self._last_processed_at = now
+        self.processed += 1
+
+    def next_interval(self, now) -> float:
+        if now < self._boost_until:
+            return self.fast_interval_sec
+        return self.base_interval_sec
+
+    def stats(self) -> dict:
+        total = self.processed + self.skipped
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,236 @@
+"""
+Background delivery of face worker events to the API.
+
+`send` only queues an event, so capture and detection never wait on the
+network. A sender thread posts queued events to ``/events/batch`` in
+batches over one keep-alive `requests.Session`. Every event carries an
+idempotency key, so a batch retried after a timeout (which the API may
+have stored anyway) is not counted twice.
+
+While the API is unreachable or failing, batches are appended to an
+on-disk spool (one JSON event per line) and retries back off
+exponentially. Any other error, e.g. an unreadable response or a spool
+write failing, is logged and handled the same way; it never stops the
+sender thread. Once the API answers again the spool is replayed in
+order and then truncated. A spool left by a previous run is replayed on
+start. Events the API rejects, e.g. because the session ended, are
+dropped.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from uuid import uuid4
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class EventSender:
+    def __init__(
+        self,
+        api_url,
+        spool_path="face_worker_spool.jsonl",
+        batch_size=50,
+        flush_interval_sec=0.5,
+        timeout_sec=5.0,
+        max_queue=10000,
+        backoff_sec=0.5,
+        max_backoff_sec=30.0,
+    ):
+        self.batch_url = api_url.rstrip("/") + "/events/batch"
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.timeout_sec = timeout_sec
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-sender", daemon=True)
+
+        # One kept-alive connection, reused by every request
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._replayed_bytes = 0
+
+        self.sent = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.failures = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def send(self, payload: dict):
+        """Queue one event without blocking; it gets an idempotency key if it has none."""
+        payload = {**payload, "idempotency_key": payload.get("idempotency_key") or uuid4().hex}
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            # Only reachable if the sender thread is stuck: it spools otherwise
+            self.dropped += 1
+
+    def close(self, timeout=10.0):
+        """Deliver or spool what is queued, then stop."""
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._http.close()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "failures": self.failures,
+            "spool_bytes": self._spool_size(),
+        }
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            try:
+                self._deliver(batch)
+            except Exception:
+                # Never let one bad batch stop delivery for the rest of the run
+                logger.exception("Event delivery failed unexpectedly")
+                self._failed("unexpected error")
+                self._keep(batch)
+
+    def _collect(self) -> list[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval_sec
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch: list[dict]):
+        # 1. Backing off: keep the batch on disk for later
+        if time.monotonic() < self._retry_at:
+            self._spool(batch)
+            return
+
+        # 2. Spooled events go first, so the API sees events in order
+        if self._spool_size() and not self._replay():
+            self._spool(batch)
+            return
+
+        if batch and not self._post(batch):
+            self._spool(batch)
+
+    def _post(self, events: list[dict]) -> bool:
+        """Send one batch; False if it should be retried later."""
+        try:
+            response = self._http.post(self.batch_url, json={"events": events}, timeout=self.timeout_sec)
+        except requests.RequestException as e:
+            return self._failed(type(e).__name__)
+        if response.status_code in RETRY_STATUSES:
+            return self._failed(f"HTTP {response.status_code}")
+
+        self._backoff = 0.0
+        if response.status_code != 200:
+            # Malformed batch: sending it again cannot help
+            logger.error("Dropping %d events: HTTP %d %s", len(events), response.status_code, response.text[:200])
+            self.rejected += len(events)
+            return True
+
+        try:
+            results = [result["status"] for result in response.json()["results"]]
+        except (ValueError, KeyError, TypeError):
+            # Possibly stored: the retry is deduplicated by idempotency key
+            return self._failed("unreadable response")
+
+        for status in results:
+            if status == "rejected":
+                self.rejected += 1
+            elif status == "duplicate":
+                self.duplicates += 1
+            else:
+                self.sent += 1
+        return True
+
+    def _failed(self, reason: str) -> bool:
+        self.failures += 1
+        self._backoff = min(self.max_backoff_sec, max(self.backoff_sec, self._backoff * 2))
+        # Jittered so workers do not all retry at once after an outage
+        self._retry_at = time.monotonic() + self._backoff * random.uniform(0.5, 1.0)
+        logger.warning("Event delivery failed (%s), retrying in %.1fs", reason, self._backoff)
+        return False
+
+    def _spool(self, events: list[dict]):
+        if not events:
+            return
+        with open(self.spool_path, "a") as f:
+            f.write("".join(json.dumps(event) + "\n" for event in events))
+            f.flush()
+            os.fsync(f.fileno())
+        self.spooled += len(events)
+
+    def _keep(self, events: list[dict]):
+        """Spool events after an unexpected error, dropping them only if the disk fails too."""
+        try:
+            self._spool(events)
+        except OSError:
+            logger.exception("Cannot spool %d events, dropping them", len(events))
+            self.dropped += len(events)
+
+    def _replay(self) -> bool:
+        """Send the spool from where the last replay stopped; True once it is empty."""
+        with open(self.spool_path, "rb") as f:
+            f.seek(self._replayed_bytes)
+            while lines := list(itertools.islice(f, self.batch_size)):
+                events = _decode(lines)
+                if events and not self._post(events):
+                    return False
+                self._replayed_bytes += sum(len(line) for line in lines)
+                self.replayed += len(events)
+
+        # Everything was delivered: start a fresh spool
+        os.truncate(self.spool_path, 0)
+        self._replayed_bytes = 0
+        return True
+
+    def _spool_size(self) -> int:
+        try:
+            return os.path.getsize(self.spool_path)
+        except FileNotFoundError:
+            return 0
+
+
+def _decode(lines: list[bytes]) -> list[dict]:
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            # Torn write from a crash while spooling
+            logger.warning("Skipping unreadable spool line")
+    return events
@@ -1,27 +1,169 @@
 import cv2
 import mediapipe as mp
+import numpy as np
 import time
 
+# Detection runs fine well below camera resolution; frames are downscaled
+# to this size (width, height) on the batch path
+DETECTOR_INPUT_SIZE = (320, 240)
 
-class FaceMonitor:
-    def __init__(self, missing_threshold_sec=2):
-        self.mp_face = mp.solutions.face_detection
-        self.detector = self.mp_face.FaceDetection(
-            model_selection=0,
-            min_detection_confidence=0.6
+
+def create_detector():
+    return mp.solutions.face_detection.FaceDetection(
+        model_selection=0,
+        min_detection_confidence=0.6
+    )
+
+
+class FramePreprocessor:
+    """
+    Downscale and BGR->RGB convert a batch of frames into reusable buffers.
+
+    Frames are letterboxed into a preallocated BGR batch: scaled to fit
+    while keeping their aspect ratio, centred, with black bars on the
+    rest, so faces are not stretched out of the detector's range. The
+    whole batch is then colour converted in one cvtColor call over a
+    (batch * height, width) view. Resize buffers are kept per scaled size,
+    so a steady stream of frames allocates nothing. The returned RGB
+    batch is overwritten by the next call.
+    """
+
+    def __init__(self, input_size=DETECTOR_INPUT_SIZE, max_batch=16):
+        self.width, self.height = input_size
+        # (height, width) -> buffer for frames scaled to that size
+        self._scaled = {}
+        self._allocate(max_batch)
+
+    def _allocate(self, max_batch):
+        self.max_batch = max_batch
+        shape = (max_batch, self.height, self.width, 3)
+        self._bgr = np.empty(shape, dtype=np.uint8)
+        self._rgb = np.empty(shape, dtype=np.uint8)
+
+    def prepare(self, frames):
+        count = len(frames)
+        if count > self.max_batch:
+            self._allocate(count)
+
+        for index, frame in enumerate(frames):
+            if frame.shape[:2] == (self.height, self.width):
+                self._bgr[index] = frame
+            else:
+                self._letterbox(frame, self._bgr[index])
+
+        rows = count * self.height
+        cv2.cvtColor(
+            self._bgr[:count].reshape(rows, self.width, 3),
+            cv2.COLOR_BGR2RGB,
+            dst=self._rgb[:count].reshape(rows, self.width, 3),
         )
+        return self._rgb[:count]
+
+    def _letterbox(self, frame, out):
+        height, width = frame.shape[:2]
+        scale = min(self.width / width, self.height / height)
+        scaled_height = min(self.height, max(1, round(height * scale)))
+        scaled_width = min(self.width, max(1, round(width * scale)))
+
+        scaled = self._scaled.get((scaled_height, scaled_width))
+        if scaled is None:
+            scaled = self._scaled[scaled_height, scaled_width] = np.empty(
+                (scaled_height, scaled_width, 3), dtype=np.uint8
+            )
+        cv2.resize(frame, (scaled_width, scaled_height), dst=scaled, interpolation=cv2.INTER_LINEAR)
+
+        top = (self.height - scaled_height) // 2
+        left = (self.width - scaled_width) // 2
+        out[:top] = 0
+        out[top + scaled_height:] = 0
+        out[top:top + scaled_height, :left] = 0
+        out[top:top + scaled_height, left + scaled_width:] = 0
+        out[top:top + scaled_height, left:left + scaled_width] = scaled
+
+
+class FaceMonitor:
+    def __init__(self, missing_threshold_sec=2, detector=None, preprocessor=None, sampler=None):
+        # A worker serving many sessions shares one detector (and batch
+        # buffers) between them; only the per-session timing state lives
+        # on the monitor
+        self.detector = detector or create_detector()
+        self.preprocessor = preprocessor
+
+        # Optional AdaptiveSampler deciding which frames need detection.
+        # It only skips static frames while the face is in view, so a
+        # skipped frame counts as the face still being there. Skipping
+        # longer than the threshold would delay FACE_MISSING
+        self.sampler = sampler
+        if sampler is not None:
+            sampler.max_skip_sec = min(sampler.max_skip_sec, missing_threshold_sec)
 
         self.last_face_time = time.time()
+        self.last_face_count = None
         self.missing_threshold = missing_threshold_sec
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp=None):
+        now = timestamp if timestamp is not None else time.time()
+
+        if not self.should_process(frame, now):
+            return []
+
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self.evaluate(self.count_faces(rgb), now)
+
+    def process_batch(self, frames, timestamps=None):
+        """
+        Process consecutive frames of this session in one pass.
+
+        Returns one ``{"face_count": int, "events": list}`` per frame;
+        ``face_count`` is None for frames skipped by the sampler.
+        """
+        if not frames:
+            return []
+
+        if self.preprocessor is None:
+            self.preprocessor = FramePreprocessor(max_batch=len(frames))
+
+        if timestamps is None:
+            timestamps = [time.time()] * len(frames)
+
+        keep = [
+            index for index, (frame, now) in enumerate(zip(frames, timestamps))
+            if self.should_process(frame, now)
+        ]
+        results = [{"face_count": None, "events": []} for _ in frames]
+        if not keep:
+            return results
+
+        rgb_batch = self.preprocessor.prepare([frames[index] for index in keep])
+
+        for index, rgb in zip(keep, rgb_batch):
+            face_count = self.count_faces(rgb)
+            results[index] = {
+                "face_count": face_count,
+                "events": self.evaluate(face_count, timestamps[index]),
+            }
+        return results
+
+    def should_process(self, frame, now):
+        if self.sampler is None or self.sampler.should_process(frame, now):
+            return True
+        # Same scene as the last detection: the face is still in view, so
+        # the absence clock starts no earlier than the next detection
+        if self.last_face_count:
+            self.last_face_time = now
+        return False
+
+    def count_faces(self, rgb):
         result = self.detector.process(rgb)
+        return len(result.detections) if result.detections else 0
+
+    def evaluate(self, face_count, now):
+        if self.sampler is not None:
+            self.sampler.record(face_count, now)
 
-        face_count = 0
-        if result.detections:
-            face_count = len(result.detections)
-            self.last_face_time = time.time()
+        self.last_face_count = face_count
+        if face_count:
+            self.last_face_time = now
 
         events = []
 
@@ -31,7 +173,7 @@ class FaceMonitor:
 
         # FACE MISSING
         if face_count == 0:
-            elapsed = time.time() - self.last_face_time
+            elapsed = now - self.last_face_time
             if elapsed >= self.missing_threshold:
                 events.append("FACE_MISSING")
 
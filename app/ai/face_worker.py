@@ -1,14 +1,18 @@
 import cv2
 import time
-import requests
 from datetime import datetime
 
 from face_monitor import FaceMonitor
+from adaptive_sampler import AdaptiveSampler
+from event_sender import EventSender
 
-API_URL = "http://127.0.0.1:8000/api/v1/events"
+API_URL = "http://127.0.0.1:8000/api/v1"
 SESSION_ID = "<PUT_ACTIVE_SESSION_ID_HERE>"
+# Events wait here while the API is unreachable, across restarts too
+SPOOL_PATH = "face_worker_spool.jsonl"
 
-monitor = FaceMonitor(missing_threshold_sec=2.0)
+sampler = AdaptiveSampler()
+monitor = FaceMonitor(missing_threshold_sec=2.0, sampler=sampler)
 # cap = cv2.VideoCapture(0)
 # cap = cv2.VideoCapture("/dev/video1", cv2.CAP_V4L2)
 cap = cv2.VideoCapture(
@@ -20,6 +24,8 @@ cap = cv2.VideoCapture(
 if not cap.isOpened():
     raise RuntimeError("Could not open camera")
 
+sender = EventSender(API_URL, spool_path=SPOOL_PATH).start()
+
 print("Face worker started. Press Ctrl+C to stop.")
 
 try:
@@ -39,11 +45,15 @@ try:
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
-            requests.post(API_URL, json=payload, timeout=2)
+            # Queued for the sender thread: detection never waits on the API
+            sender.send(payload)
 
-        time.sleep(0.5)  # sampling interval
+        # Fast sampling while a face is missing or extra, slow when static
+        time.sleep(sampler.next_interval(time.time()))
 
 except KeyboardInterrupt:
-    print("Stopping face worker...")
+    print("Stopping face worker...", sampler.stats())
 finally:
     cap.release()
+    sender.close()
+    print("Event delivery:", sender.stats())
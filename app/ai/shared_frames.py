@@ -0,0 +1,60 @@
+"""
+Fixed-size ring of frame slots in shared memory.
+
+The producer copies a decoded frame into a free slot and sends only the
+slot index and shape to the consumer process, which maps the slot as a
+NumPy view without copying or unpickling pixel data. Consumers hand the
+slot back through `free_slots` once they are done with it.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    def __init__(self, slots, max_shape, ctx, name=None):
+        self.slots = slots
+        self.max_shape = tuple(max_shape)
+        self.slot_bytes = int(np.prod(self.max_shape))
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+        self.free_slots = None
+        if ctx is not None:
+            self.free_slots = ctx.Queue()
+            for slot in range(slots):
+                self.free_slots.put(slot)
+
+    def attach_args(self):
+        """Arguments for `SharedFrameRing.attach` in a child process."""
+        return self.slots, self.max_shape, self.shm.name, self.free_slots
+
+    @classmethod
+    def attach(cls, slots, max_shape, name, free_slots):
+        ring = cls(slots, max_shape, ctx=None, name=name)
+        ring.free_slots = free_slots
+        return ring
+
+    def fits(self, frame) -> bool:
+        return frame.dtype == np.uint8 and frame.nbytes <= self.slot_bytes
+
+    def write(self, slot, frame):
+        view = self.view(slot, frame.shape)
+        np.copyto(view, frame)
+
+    def view(self, slot, shape):
+        offset = slot * self.slot_bytes
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+
+    def release(self, slot):
+        self.free_slots.put(slot)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,43 @@
+"""
+Synthetic camera frames for exercising the frame pipeline locally.
+
+Frames show a slowly drifting face-like blob over a noisy background,
+optionally disappearing for a while, so the pool produces a realistic
+mix of detections and FACE_MISSING events without a camera.
+"""
+import numpy as np
+
+
+def synthetic_frames(width=640, height=480, absent_every=0, absent_for=0, seed=0):
+    """Yield BGR uint8 frames forever."""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 80, size=(height, width, 3), dtype=np.uint8)
+    index = 0
+
+    while True:
+        frame = background.copy()
+
+        hidden = absent_every and (index % absent_every) < absent_for
+        if not hidden:
+            center = (
+                int(width / 2 + width / 8 * np.sin(index / 15)),
+                int(height / 2 + height / 12 * np.cos(index / 20)),
+            )
+            axes = (width // 8, height // 5)
+            cv2.ellipse(frame, center, axes, 0, 0, 360, (140, 170, 210), -1)
+            cv2.circle(frame, (center[0] - axes[0] // 3, center[1] - axes[1] // 4), 8, (40, 40, 40), -1)
+            cv2.circle(frame, (center[0] + axes[0] // 3, center[1] - axes[1] // 4), 8, (40, 40, 40), -1)
+
+        index += 1
+        yield frame
+
+
+def encode_jpeg(frame, quality=80) -> bytes:
+    import cv2
+
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buffer.tobytes()
@@ -0,0 +1,372 @@
+"""
+Multi-process face detection pool for many concurrent sessions.
+
+Each worker process owns one MediaPipe FaceDetection instance and a
+FaceMonitor per session routed to it. Sessions are pinned to a worker by
+a stable hash of the session id so `last_face_time` stays sticky.
+
+Frames are handed over through a per-worker shared-memory ring
+(see `SharedFrameRing`); only the slot index and shape are queued.
+The ring has ``queue_size`` slots, which bounds how far a worker can fall
+behind. When it is full, `submit` applies the drop policy instead of
+blocking the caller:
+
+- ``drop_oldest``: discard the oldest queued frame (keeps latency low)
+- ``drop_newest``: discard the incoming frame
+- ``block``: wait for a free slot (backpressure onto the producer)
+
+Session closes and shutdown go through a separate control queue, so a
+full frame path never holds them up and ``drop_oldest`` never reorders
+them. Frames carry a per-worker sequence number and a close names the
+last one submitted before it, so frames of a closed session that are
+still queued are discarded instead of reopening its monitor.
+"""
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+
+from app.ai.shared_frames import SharedFrameRing
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# Queued behind a control message to wake a worker waiting for frames
+WAKE = ("wake",)
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(worker_id, frame_queue, control_queue, result_queue, ring_args, missing_threshold_sec, stats_interval_sec, batch_size, adaptive_sampling):
+    # Imported in the child so the parent never loads MediaPipe
+    from app.ai.adaptive_sampler import AdaptiveSampler
+    from app.ai.face_monitor import FaceMonitor, FramePreprocessor, create_detector
+
+    ring = SharedFrameRing.attach(*ring_args)
+    detector = create_detector()
+    preprocessor = FramePreprocessor(max_batch=batch_size)
+    monitors = {}
+    # session_id -> sequence number of the last frame submitted before its close
+    closed = {}
+    last_seq = -1
+
+    processed = 0
+    skipped = 0
+    # (stage, seconds) since the last stats message
+    timings = []
+    window_frames = 0
+    window_started = time.monotonic()
+    running = True
+
+    while running:
+        try:
+            items = [frame_queue.get(timeout=stats_interval_sec)]
+        except queue.Empty:
+            items = []
+
+        # Drain whatever else is already queued, across sessions, so the
+        # resize/colour conversion is amortised over one batch
+        while items and len(items) < batch_size:
+            try:
+                items.append(frame_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        while True:
+            try:
+                message = control_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                running = False
+            else:
+                _, session_id, seq = message
+                monitors.pop(session_id, None)
+                closed[session_id] = seq
+
+        frames = []
+        for item in items:
+            if item[0] != "frame":
+                continue
+            _, session_id, slot, _, _, _, seq = item
+            last_seq = max(last_seq, seq)
+            if seq <= closed.get(session_id, -1):
+                # Submitted before its session closed
+                ring.release(slot)
+            else:
+                frames.append(item)
+        # Frames are queued in order: nothing older than last_seq is left
+        closed = {session_id: seq for session_id, seq in closed.items() if seq > last_seq}
+
+        if frames:
+            dequeued_at = time.time()
+            batch = []
+            views = []
+            for _, session_id, slot, shape, timestamp, queued_at, _ in frames:
+                timings.append(("queue_wait", dequeued_at - queued_at))
+                monitor = monitors.get(session_id)
+                if monitor is None:
+                    monitor = FaceMonitor(
+                        missing_threshold_sec,
+                        detector=detector,
+                        sampler=AdaptiveSampler() if adaptive_sampling else None,
+                    )
+                    monitor.last_face_time = timestamp
+                    monitors[session_id] = monitor
+
+                view = ring.view(slot, shape)
+                if monitor.should_process(view, timestamp):
+                    batch.append((monitor, session_id, timestamp))
+                    views.append(view)
+                else:
+                    skipped += 1
+
+            started = time.perf_counter()
+            rgb_batch = preprocessor.prepare(views) if views else []
+            if views:
+                timings.append(("preprocess_batch", time.perf_counter() - started))
+
+            # The batch buffer holds a copy now, hand the slots back early
+            del views, view
+            for _, _, slot, _, _, _, _ in frames:
+                ring.release(slot)
+
+            for rgb, (monitor, session_id, timestamp) in zip(rgb_batch, batch):
+                started = time.perf_counter()
+                face_count = monitor.count_faces(rgb)
+                timings.append(("detect", time.perf_counter() - started))
+                events = monitor.evaluate(face_count, timestamp)
+                if events:
+                    result_queue.put(("events", session_id, events, timestamp))
+
+            processed += len(batch)
+            window_frames += len(frames)
+
+        elapsed = time.monotonic() - window_started
+        if elapsed >= stats_interval_sec:
+            result_queue.put((
+                "stats",
+                worker_id,
+                {
+                    "processed": processed,
+                    "skipped": skipped,
+                    "fps": round(window_frames / elapsed, 2),
+                    "sessions": len(monitors),
+                },
+                timings,
+            ))
+            timings = []
+            window_frames = 0
+            window_started = time.monotonic()
+
+    ring.close()
+
+
+class FaceWorkerPool:
+    def __init__(
+        self,
+        num_workers=None,
+        queue_size=8,
+        drop_policy="drop_oldest",
+        max_frame_shape=(720, 1280, 3),
+        missing_threshold_sec=2.0,
+        stats_interval_sec=5.0,
+        batch_size=8,
+        adaptive_sampling=True,
+        on_events=None,
+        on_timings=None,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}")
+
+        self.num_workers = num_workers or mp.cpu_count()
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.max_frame_shape = tuple(max_frame_shape)
+        self.missing_threshold_sec = missing_threshold_sec
+        self.stats_interval_sec = stats_interval_sec
+        self.batch_size = batch_size
+        self.adaptive_sampling = adaptive_sampling
+
+        # Called from the collector thread as on_events(session_id, events, timestamp)
+        self.on_events = on_events
+        # Called from the collector thread as on_timings(stage, seconds)
+        self.on_timings = on_timings
+
+        # MediaPipe is not fork-safe
+        self._ctx = mp.get_context("spawn")
+        self._processes = []
+        self._frame_queues = []
+        self._control_queues = []
+        self._rings = []
+        self._result_queue = None
+        self._collector = None
+
+        self._seq = [-1] * self.num_workers
+        self._submitted = [0] * self.num_workers
+        self._dropped = [0] * self.num_workers
+        self._worker_stats = [{} for _ in range(self.num_workers)]
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._result_queue = self._ctx.Queue()
+
+        for worker_id in range(self.num_workers):
+            frame_queue = self._ctx.Queue()
+            control_queue = self._ctx.Queue()
+            ring = SharedFrameRing(self.queue_size, self.max_frame_shape, self._ctx)
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    worker_id,
+                    frame_queue,
+                    control_queue,
+                    self._result_queue,
+                    ring.attach_args(),
+                    self.missing_threshold_sec,
+                    self.stats_interval_sec,
+                    self.batch_size,
+                    self.adaptive_sampling,
+                ),
+                name=f"face-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self._frame_queues.append(frame_queue)
+            self._control_queues.append(control_queue)
+            self._rings.append(ring)
+            self._processes.append(process)
+
+        self._collector = threading.Thread(
+            target=self._collect, name="face-pool-collector", daemon=True
+        )
+        self._collector.start()
+
+    def worker_for(self, session_id: str) -> int:
+        # Stable across processes and restarts, unlike hash()
+        return zlib.crc32(session_id.encode()) % self.num_workers
+
+    def submit(self, session_id: str, frame, timestamp=None) -> bool:
+        """Hand a BGR uint8 frame to its worker; False when it was dropped."""
+        worker_id = self.worker_for(session_id)
+        ring = self._rings[worker_id]
+
+        if not ring.fits(frame):
+            raise ValueError(f"Frame must be uint8 and fit in {self.max_frame_shape}")
+
+        with self._lock:
+            self._submitted[worker_id] += 1
+
+        slot = self._acquire_slot(worker_id)
+        if slot is None:
+            return False
+
+        ring.write(slot, frame)
+        now = time.time()
+        with self._lock:
+            self._seq[worker_id] += 1
+            seq = self._seq[worker_id]
+        self._frame_queues[worker_id].put(
+            ("frame", session_id, slot, frame.shape, timestamp or now, now, seq)
+        )
+        return True
+
+    def _acquire_slot(self, worker_id: int):
+        ring = self._rings[worker_id]
+
+        try:
+            return ring.free_slots.get_nowait()
+        except queue.Empty:
+            pass
+
+        if self.drop_policy == "block":
+            return ring.free_slots.get()
+
+        with self._lock:
+            self._dropped[worker_id] += 1
+
+        if self.drop_policy == "drop_newest":
+            return None
+
+        # drop_oldest: take over the slot of the stalest queued frame
+        frame_queue = self._frame_queues[worker_id]
+        while True:
+            try:
+                item = frame_queue.get_nowait()
+            except queue.Empty:
+                # Everything is in flight inside the worker
+                return None
+
+            # Wake-ups carry nothing: the worker wakes for the frames left
+            if item[0] == "frame":
+                return item[2]
+
+    def close_session(self, session_id: str):
+        worker_id = self.worker_for(session_id)
+        with self._lock:
+            seq = self._seq[worker_id]
+        self._control(worker_id, ("close", session_id, seq))
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "worker_id": worker_id,
+                    "alive": process.is_alive(),
+                    "submitted": self._submitted[worker_id],
+                    "dropped": self._dropped[worker_id],
+                    "queue_depth": _qsize(self._frame_queues[worker_id]),
+                    **self._worker_stats[worker_id],
+                }
+                for worker_id, process in enumerate(self._processes)
+            ]
+
+    def stop(self, timeout=5.0):
+        for worker_id in range(len(self._processes)):
+            self._control(worker_id, None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for ring in self._rings:
+            ring.close()
+
+        if self._result_queue is not None:
+            self._result_queue.put(None)
+        if self._collector is not None:
+            self._collector.join(timeout)
+
+    def _control(self, worker_id: int, message):
+        self._control_queues[worker_id].put(message)
+        # The control queue is only read between frame batches
+        self._frame_queues[worker_id].put(WAKE)
+
+    def _collect(self):
+        while True:
+            item = self._result_queue.get()
+            if item is None:
+                return
+
+            # A failing callback must not stop event delivery for every session
+            try:
+                if item[0] == "stats":
+                    _, worker_id, worker_stats, timings = item
+                    with self._lock:
+                        self._worker_stats[worker_id] = worker_stats
+                    if self.on_timings is not None:
+                        for stage, seconds in timings:
+                            self.on_timings(stage, seconds)
+                elif self.on_events is not None:
+                    _, session_id, events, timestamp = item
+                    self.on_events(session_id, events, timestamp)
+            except Exception:
+                logger.exception("Face pool callback failed for %s", item[0])
+
+
+def _qsize(frame_queue) -> int | None:
+    try:
+        return frame_queue.qsize()
+    except NotImplementedError:
+        # macOS does not implement sem_getvalue
+        return None
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from app.models.event import EventCreate
-from app.core.database import get_db
-from app.services.event_service import create_event
+from app.core.config import settings
+from app.models.event import EventCreate, EventBatchCreate
+from app.core.database import get_async_db
+from app.services import session_cache
+from app.services.event_service import create_event, create_events_batch
 
 router = APIRouter()
 
@@ -11,15 +14,96 @@ router = APIRouter()
 @router.post("/events")
 async def ingest_event(
     event: EventCreate,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
+    event_queue = getattr(request.app.state, "event_queue", None)
+    if event_queue is not None and settings.EVENT_GROUP_COMMIT:
+        committed = await event_queue.submit([event])
+        if committed is not None:
+            [(result, risk_result)] = committed
+            if result["status"] == "rejected":
+                raise HTTPException(status_code=400, detail=result["detail"])
+            return {
+                "event_id": result["event_id"],
+                "coalesced": result["status"] == "coalesced",
+                "duplicate": result["status"] == "duplicate",
+                "session_id": event.session_id,
+                "current_risk_score": risk_result["risk_score"],
+                "risk_level": risk_result["risk_level"],
+            }
+        _check_full_policy(event_queue, [event])
+    elif event_queue is not None:
+        # Reject what the writer would reject while the client can still react
+        status = await session_cache.get_status(db, event.session_id)
+        if status is None:
+            raise HTTPException(status_code=400, detail="Invalid session_id")
+        if status != "ACTIVE":
+            raise HTTPException(status_code=400, detail="Events are not allowed for this session state")
+
+        if event_queue.enqueue(event):
+            return JSONResponse(
+                status_code=202,
+                content={"status": "queued", "session_id": event.session_id},
+            )
+        _check_full_policy(event_queue, [event])
+
     try:
-        saved_event, risk_result = create_event(db, event)
+        stored, risk_result = await create_event(db, event)
         return {
-            "event_id": saved_event.id,
+            "event_id": stored["event_id"],
+            "coalesced": stored["coalesced"],
+            "duplicate": stored["duplicate"],
             "session_id": event.session_id,
             "current_risk_score": risk_result["risk_score"],
             "risk_level": risk_result["risk_level"],
         }
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/events/batch")
+async def ingest_event_batch(
+    batch: EventBatchCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    event_queue = getattr(request.app.state, "event_queue", None)
+    committed = None
+    if event_queue is not None and settings.EVENT_GROUP_COMMIT:
+        committed = await event_queue.submit(batch.events)
+        if committed is None:
+            _check_full_policy(event_queue, batch.events)
+
+    if committed is not None:
+        results = [result for result, _ in committed]
+        risk_results = {
+            risk_result["session_id"]: risk_result
+            for _, risk_result in committed
+            if risk_result is not None
+        }
+    else:
+        results, risk_results = await create_events_batch(db, batch.events)
+    return {
+        "results": results,
+        "sessions": {
+            session_id: {
+                "current_risk_score": risk_result["risk_score"],
+                "risk_level": risk_result["risk_level"],
+            }
+            for session_id, risk_result in risk_results.items()
+        },
+    }
+
+
+def _check_full_policy(event_queue, events):
+    """With the queue full, answer 503 unless falling back to a synchronous write."""
+    if event_queue.ending(*(event.session_id for event in events)):
+        # Not full: the session is being ended, write after its queued events
+        return
+    if settings.EVENT_QUEUE_FULL_POLICY != "sync":
+        raise HTTPException(
+            status_code=503,
+            detail="Event queue is full",
+            headers={"Retry-After": "1"},
+        )
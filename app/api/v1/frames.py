@@ -0,0 +1,44 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Request, status
+
+from app.core.database import AsyncSessionLocal
+from app.services import session_cache
+
+router = APIRouter()
+
+
+@router.websocket("/sessions/{session_id}/frames")
+async def stream_frames(websocket: WebSocket, session_id: str):
+    """Binary WebSocket: every message is one JPEG frame of the candidate camera."""
+    frame_ingest = getattr(websocket.app.state, "frame_ingest", None)
+    if frame_ingest is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Frame ingest is disabled")
+        return
+
+    # Short-lived DB session: the socket may stay open for the whole interview
+    async with AsyncSessionLocal() as db:
+        session_status = await session_cache.get_status(db, session_id)
+
+    if session_status != "ACTIVE":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Session is not active")
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_bytes()
+            try:
+                await frame_ingest.submit(session_id, data)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        frame_ingest.close_session(session_id)
+
+
+@router.get("/frames/stats")
+async def frame_ingest_stats(request: Request):
+    frame_ingest = getattr(request.app.state, "frame_ingest", None)
+    if frame_ingest is None:
+        raise HTTPException(status_code=404, detail="Frame ingest is disabled")
+    return frame_ingest.stats()
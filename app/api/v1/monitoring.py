@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Request
+
+from app.services import session_cache
+
+router = APIRouter()
+
+
+@router.get("/monitoring/stats")
+async def component_stats(request: Request):
+    state = request.app.state
+    event_queue = getattr(state, "event_queue", None)
+    frame_ingest = getattr(state, "frame_ingest", None)
+
+    return {
+        "event_queue": event_queue.stats() if event_queue else None,
+        "frame_ingest": frame_ingest.stats() if frame_ingest else None,
+        "session_cache": session_cache.stats(),
+    }
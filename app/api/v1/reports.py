@@ -1,33 +1,135 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.services.final_report_builder import build_final_report
-from app.services.risk_engine import calculate_risk_for_session
-from app.core.database import get_db
-from app.services.risk_engine import calculate_risk_for_session
-from app.models.risk_score import RiskScore
+import asyncio
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db, AsyncSessionLocal
+from app.services.report_cache import get_reports
+from app.services.report_export import EXPORT_FORMATS, export_reports, to_csv, to_ndjson
+from app.models.session_risk import SessionRisk
+from app.services.risk_stream import risk_hub
 
 router = APIRouter()
 
+SSE_KEEPALIVE_SEC = 15
+
+
+# Declared before /reports/{session_id} so "stream" is not taken as an id
+@router.get("/reports/stream")
+async def stream_risk_updates(
+    request: Request,
+    session_id: list[str] = Query(..., max_length=500),
+):
+    """
+    Server-Sent Events feed of risk score changes for one or many sessions.
+
+    Starts with the current score of every watched session, then pushes an
+    ``event: risk`` message whenever one of them changes.
+    """
+    session_ids = set(session_id)
+    if not session_ids:
+        raise HTTPException(status_code=400, detail="No session_id given")
+
+    # Subscribe before reading the snapshot so no change is missed in between
+    subscription = risk_hub.subscribe(session_ids)
+
+    async def events():
+        try:
+            async with AsyncSessionLocal() as db:
+                current = await db.scalars(
+                    select(SessionRisk).where(SessionRisk.session_id.in_(session_ids))
+                )
+                for risk in current:
+                    yield _sse({
+                        "session_id": risk.session_id,
+                        "risk_score": risk.score,
+                        "risk_level": risk.level,
+                        "updated_at": risk.updated_at.isoformat(),
+                    })
+
+            while not await request.is_disconnected():
+                try:
+                    update = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=SSE_KEEPALIVE_SEC
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(update)
+        finally:
+            risk_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(update: dict) -> str:
+    return f"event: risk\ndata: {json.dumps(update)}\n\n"
+
+
+# Declared before /reports/{session_id} so "export" is not taken as an id
+@router.get("/reports/export")
+async def export_session_reports(
+    format: str = Query("ndjson"),
+    session_id: list[str] | None = Query(None, max_length=10000),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    """
+    Reports of many sessions, streamed as NDJSON (raw and final report per
+    line) or CSV (final report summary per row).
+
+    Sessions are selected by ``session_id`` and/or a ``created_at`` range
+    (``created_from`` inclusive, ``created_to`` exclusive).
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {EXPORT_FORMATS}")
+    if not session_id and created_from is None and created_to is None:
+        raise HTTPException(status_code=400, detail="Give session_id or a created_from/created_to range")
+
+    async def rows():
+        # Own DB session: it must outlive the request handler while streaming
+        async with AsyncSessionLocal() as db:
+            reports = export_reports(db, session_id, created_from, created_to)
+            encode = to_csv if format == "csv" else to_ndjson
+            async for chunk in encode(reports):
+                yield chunk
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reports.{format}"'},
+    )
+
 
 @router.get("/reports/{session_id}")
 async def get_full_report(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return calculate_risk_for_session(db, session_id)
+    """
+    Raw risk report: score, level, event counts and the scoring reasons.
+
+    Reasons are ordered by timestamp. A hit from a repeat merged into an
+    event episode carries the episode's start time (see
+    EVENT_COALESCE_WINDOW_SEC).
+    """
+    raw_report, _ = await get_reports(db, session_id)
+    return raw_report
 
 
 @router.get("/reports/{session_id}/latest")
 async def get_latest_risk(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    latest = (
-        db.query(RiskScore)
-        .filter(RiskScore.session_id == session_id)
-        .order_by(RiskScore.created_at.desc())
-        .first()
-    )
+    latest = await db.get(SessionRisk, session_id)
 
     if not latest:
         return {"message": "No risk score found"}
@@ -36,7 +138,7 @@ async def get_latest_risk(
         "session_id": session_id,
         "risk_score": latest.score,
         "risk_level": latest.level,
-        "updated_at": latest.created_at.isoformat(),
+        "updated_at": latest.updated_at.isoformat(),
     }
 
 
@@ -44,7 +146,7 @@ async def get_latest_risk(
 @router.get("/reports/{session_id}/final")
 async def get_final_report(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    raw_report = calculate_risk_for_session(db, session_id)
-    return build_final_report(raw_report)
+    _, final_report = await get_reports(db, session_id)
+    return final_report
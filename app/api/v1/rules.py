@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+
+from app.core.config import settings
+from app.services import risk_rules
+
+router = APIRouter()
+
+
+@router.get("/rules")
+async def get_rules():
+    return _describe(risk_rules.current())
+
+
+@router.post("/rules/reload")
+async def reload_rules():
+    """Recompile the rules file now, on this and every other worker."""
+    try:
+        rules = await risk_rules.reload()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Rules not reloaded: {e}")
+    return _describe(rules)
+
+
+def _describe(rules: risk_rules.CompiledRules) -> dict:
+    return {
+        "version": rules.version,
+        "source": settings.RISK_RULES_PATH or "builtin",
+        **rules.to_dict(),
+    }
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 import base64
-import os
-import shutil
+import binascii
+import re
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.services import session_cache
+from app.services.auth_snapshots import SnapshotTooLarge, save_snapshot
+from app.services.blob_storage import iter_bytes, storage
+from app.services.recording_upload import (
+    ChunkTooLarge,
+    UploadOffsetMismatch,
+    recording_uploads,
+)
 from app.services.session_service import (
     create_session,
     start_session,
@@ -16,8 +25,8 @@ router = APIRouter()
 
 # Session APIs
 @router.post("/sessions")
-async def create_interview_session(db: Session = Depends(get_db)):
-    session = create_session(db)
+async def create_interview_session(db: AsyncSession = Depends(get_async_db)):
+    session = await create_session(db)
     return {
         "session_id": session.id,
         "status": session.status,
@@ -28,10 +37,10 @@ async def create_interview_session(db: Session = Depends(get_db)):
 @router.post("/sessions/{session_id}/start")
 async def start_interview_session(
     session_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        session = start_session(db, session_id)
+        session = await start_session(db, session_id)
         return {
             "session_id": session.id,
             "status": session.status,
@@ -44,10 +53,13 @@ async def start_interview_session(
 @router.post("/sessions/{session_id}/end")
 async def end_interview_session(
     session_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        session = end_session(db, session_id)
+        session = await end_session(
+            db, session_id, getattr(request.app.state, "event_queue", None)
+        )
         return {
             "session_id": session.id,
             "status": session.status,
@@ -58,36 +70,83 @@ async def end_interview_session(
 
 
 # Auth Snapshot (Face Gate)
+@router.post("/sessions/{session_id}/auth-snapshot/image")
+async def upload_auth_snapshot(
+    session_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Raw ``image/jpeg`` body, or multipart with the image in ``file``."""
+    await _require_session(db, session_id)
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, StarletteUploadFile):
+            raise HTTPException(status_code=400, detail="Missing file")
+        chunks = _read_upload(upload)
+    elif content_type.startswith("image/jpeg"):
+        chunks = request.stream()
+    else:
+        raise HTTPException(status_code=415, detail="Expected image/jpeg or multipart/form-data")
+
+    return await _save_auth_snapshot(db, session_id, chunks)
+
+
+# Compatibility shim for clients that still send a base64 data URL
 @router.post("/sessions/{session_id}/auth-snapshot")
-def save_auth_snapshot(session_id: str, payload: dict):
-    image_base64 = payload["image_base64"]
+async def save_auth_snapshot(
+    session_id: str,
+    payload: dict,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await _require_session(db, session_id)
 
-    # Remove base64 header
-    image_data = image_base64.split(",")[1]
-    image_bytes = base64.b64decode(image_data)
+    try:
+        # Remove base64 header
+        image_data = payload["image_base64"].split(",")[-1]
+        image_bytes = base64.b64decode(image_data, validate=True)
+    except (KeyError, AttributeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid image_base64")
 
-    dir_path = "virtual/auth_snapshots"
-    os.makedirs(dir_path, exist_ok=True)
+    return await _save_auth_snapshot(db, session_id, iter_bytes(image_bytes))
 
-    path = f"{dir_path}/{session_id}.jpg"
 
-    with open(path, "wb") as f:
-        f.write(image_bytes)
+async def _save_auth_snapshot(db: AsyncSession, session_id: str, chunks):
+    try:
+        snapshot, created = await save_snapshot(db, session_id, chunks)
+    except SnapshotTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "status": "saved",
-        "path": path
+        "status": "saved" if created else "unchanged",
+        "snapshot_id": snapshot.id,
+        "sha256": snapshot.sha256,
+        # Rows store storage keys; "path" keeps its pre-storage meaning
+        "key": snapshot.path,
+        "path": storage.location(snapshot.path),
+        "thumbnail_key": snapshot.thumbnail_path,
+        "thumbnail_path": storage.location(snapshot.thumbnail_path),
+        "width": snapshot.width,
+        "height": snapshot.height,
     }
 
 
+async def _read_upload(upload: StarletteUploadFile, size: int = 64 * 1024):
+    try:
+        while chunk := await upload.read(size):
+            yield chunk
+    finally:
+        await upload.close()
+
+
 # ==============================
 # Screen Recording Upload
 # ==============================
 
-UPLOAD_DIR = Path("virtual/screen_recordings")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-
 @router.post("/sessions/{session_id}/screen-recording")
 async def upload_screen_recording(
     session_id: str,
@@ -96,11 +155,8 @@ async def upload_screen_recording(
     if not file.filename.endswith(".webm"):
         raise HTTPException(status_code=400, detail="Invalid file type")
 
-    file_path = UPLOAD_DIR / f"{session_id}.webm"
-
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        saved = await recording_uploads.save(session_id, file.file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -109,5 +165,156 @@ async def upload_screen_recording(
     return {
         "status": "saved",
         "session_id": session_id,
-        "path": str(file_path)
+        "key": saved["key"],
+        "path": saved["path"],
+    }
+
+
+# Chunked upload: PUT chunks in order, resume from GET .../upload, then complete
+@router.get("/sessions/{session_id}/screen-recording/upload")
+async def screen_recording_upload_status(
+    session_id: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await _require_session(db, session_id)
+    status = await recording_uploads.status(session_id)
+    return {"session_id": session_id, **status}
+
+
+@router.put("/sessions/{session_id}/screen-recording/chunks")
+async def upload_screen_recording_chunk(
+    session_id: str,
+    offset: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await _require_session(db, session_id)
+
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > recording_uploads.max_chunk_bytes:
+        return await _chunk_too_large(session_id, "Chunk too large")
+
+    try:
+        new_offset = await recording_uploads.append(session_id, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        return _offset_mismatch(e)
+    except ChunkTooLarge as e:
+        return await _chunk_too_large(session_id, str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return JSONResponse(
+        content={"session_id": session_id, "offset": new_offset},
+        headers={"Upload-Offset": str(new_offset)},
+    )
+
+
+@router.post("/sessions/{session_id}/screen-recording/complete")
+async def complete_screen_recording(
+    session_id: str,
+    size: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await _require_session(db, session_id)
+
+    try:
+        saved = await recording_uploads.complete(session_id, size)
+    except UploadOffsetMismatch as e:
+        return _offset_mismatch(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "saved",
+        "session_id": session_id,
+        "key": saved["key"],
+        "path": saved["path"],
+        "size": saved["size"],
     }
+
+
+# Playback for reviewers: streamed from storage, with HTTP Range support
+@router.get("/sessions/{session_id}/screen-recording")
+async def get_screen_recording(
+    session_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await _require_session(db, session_id)
+
+    status = await recording_uploads.status(session_id)
+    if not status["complete"]:
+        raise HTTPException(status_code=404, detail="Recording not available")
+
+    size = status["offset"]
+    key = recording_uploads.final_key(session_id)
+    headers = {"Accept-Ranges": "bytes"}
+
+    range_header = request.headers.get("range")
+    if range_header is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            recording_uploads.storage.read(key), media_type="video/webm", headers=headers
+        )
+
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        recording_uploads.storage.read(key, start, end - start + 1),
+        status_code=206,
+        media_type="video/webm",
+        headers=headers,
+    )
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Single ``bytes=`` range as inclusive ``(start, end)``, None if unsatisfiable."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+async def _require_session(db: AsyncSession, session_id: str):
+    if await session_cache.get_status(db, session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+
+def _offset_mismatch(e: UploadOffsetMismatch) -> JSONResponse:
+    return JSONResponse(
+        status_code=409,
+        content={"detail": str(e), "offset": e.offset},
+        headers={"Upload-Offset": str(e.offset)},
+    )
+
+
+async def _chunk_too_large(session_id: str, detail: str) -> JSONResponse:
+    # Nothing of the chunk was kept: resend it, split, from this offset
+    offset = (await recording_uploads.status(session_id))["offset"]
+    return JSONResponse(
+        status_code=413,
+        content={"detail": detail, "offset": offset},
+        headers={"Upload-Offset": str(offset)},
+    )
@@ -1,10 +1,31 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.core.config import settings
-from sqlalchemy.orm import Session
-from fastapi import Depends
 
+
+
+def configure_sqlite(engine):
+    """Put every SQLite connection of ``engine`` in WAL mode with tuned pragmas."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Readers no longer block the writer, and commits only append to the WAL
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+# Sync engine: Alembic, offline jobs and scripts
 engine = create_engine(settings.DATABASE_URL, future=True)
+configure_sqlite(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -12,6 +33,31 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def _async_engine_options() -> dict:
+    if settings.async_database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SEC,
+        "pool_pre_ping": True,
+    }
+
+
+# Async engine: API routes
+async_engine = create_async_engine(
+    settings.async_database_url,
+    **_async_engine_options(),
+)
+configure_sqlite(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -22,3 +68,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,216 @@
+"""
+Prometheus metrics and slow-request profiling.
+
+Enabled with METRICS_ENABLED (requires the optional ``prometheus_client``
+package). `setup` registers, and ``/metrics`` exposes:
+
+- ``http_request_duration_seconds``: latency per method, route template
+  and status, recorded by `MetricsMiddleware`
+- ``interview_stage_duration_seconds``: named stages of event ingest and
+  report building, timed with `span`
+- ``interview_frame_stage_seconds``: server-side face detection (decode,
+  queue wait, batch preprocessing, detection), fed by `observe_frame`
+- ``interview_db_pool_connections``: async engine pool, read at scrape time
+
+While metrics are disabled `span` and `observe_frame` do nothing, so the
+instrumented code never checks.
+
+With PROFILE_SLOW_REQUEST_MS set, `ProfilingMiddleware` runs requests
+under cProfile, one at a time, and writes the profile of every request
+slower than that to PROFILE_DIR. The profiler sees the whole event loop
+thread, so requests interleaved with the profiled one show up in it too.
+``/metrics`` scrapes and Server-Sent Events streams are not profiled:
+a stream stays open for as long as its client watches, which would say
+nothing about its speed and keep every other request from being profiled.
+"""
+import cProfile
+import logging
+import os
+import re
+import time
+from contextlib import nullcontext
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_NO_SPAN = nullcontext()
+
+_request_seconds = None
+_stage_seconds = None
+_frame_seconds = None
+# stage name -> labelled histogram
+_stages = {}
+
+
+def setup(engine):
+    """Register the metrics; ``engine`` is the async engine whose pool is reported."""
+    global _request_seconds, _stage_seconds, _frame_seconds
+    if _request_seconds is not None:
+        return
+
+    from prometheus_client import REGISTRY, Histogram
+
+    _request_seconds = Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency",
+        ["method", "route", "status"],
+    )
+    _stage_seconds = Histogram(
+        "interview_stage_duration_seconds",
+        "Duration of named stages of event ingest and report building",
+        ["stage"],
+        buckets=STAGE_BUCKETS,
+    )
+    _frame_seconds = Histogram(
+        "interview_frame_stage_seconds",
+        "Server-side face detection timings",
+        ["stage"],
+        buckets=STAGE_BUCKETS,
+    )
+    REGISTRY.register(_PoolCollector(engine))
+
+
+def span(name: str):
+    """Context manager timing the stage ``name``."""
+    if _stage_seconds is None:
+        return _NO_SPAN
+    stage = _stages.get(name)
+    if stage is None:
+        stage = _stages[name] = _stage_seconds.labels(name)
+    return stage.time()
+
+
+def observe_frame(stage: str, seconds: float):
+    if _frame_seconds is not None:
+        _frame_seconds.labels(stage).observe(seconds)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            _request_seconds.labels(scope["method"], route_name(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, threshold_ms: float, directory: str, exclude_paths=("/metrics",)):
+        self.app = app
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.exclude_paths = set(exclude_paths)
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        # cProfile hooks the whole thread: profile one request at a time
+        if scope["type"] != "http" or self._active or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        streaming = False
+
+        def stop():
+            profiler.disable()
+            self._active = False
+
+        async def send_unless_streaming(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start" and _is_event_stream(message):
+                # Give up on this one at once and free the profiler
+                streaming = True
+                stop()
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_unless_streaming)
+        finally:
+            if not streaming:
+                stop()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if elapsed_ms >= self.threshold_ms:
+                    await run_in_threadpool(self._dump, profiler, scope, elapsed_ms)
+
+    def _dump(self, profiler: cProfile.Profile, scope, elapsed_ms: float):
+        route = re.sub(r"[^A-Za-z0-9]+", "_", route_name(scope)).strip("_")
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}_{scope['method']}_{route}_{elapsed_ms:.0f}ms.prof"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        profiler.dump_stats(path)
+        logger.info("Slow request %s %s (%.0f ms) profiled to %s", scope["method"], scope["path"], elapsed_ms, path)
+
+
+def route_name(scope) -> str:
+    """Full route template, e.g. ``/api/v1/reports/{session_id}``."""
+    # Template, not the raw path, to keep label cardinality bounded
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # Routes of included routers may not carry the include prefix: take it
+    # from the part of the request path in front of what the route matched
+    match = re.search(route.path_regex.pattern.lstrip("^"), scope["path"])
+    prefix = scope["path"][:match.start()] if match else ""
+    return prefix + path_format
+
+
+def _is_event_stream(message) -> bool:
+    return any(
+        name == b"content-type" and value.startswith(b"text/event-stream")
+        for name, value in message.get("headers", ())
+    )
+
+
+class _PoolCollector:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        gauge = GaugeMetricFamily(
+            "interview_db_pool_connections",
+            "Async database connection pool",
+            labels=["state"],
+        )
+        pool = self.engine.pool
+        # Not every pool class (e.g. NullPool) keeps these counts
+        if hasattr(pool, "checkedout"):
+            gauge.add_metric(["size"], pool.size())
+            gauge.add_metric(["checked_in"], pool.checkedin())
+            gauge.add_metric(["checked_out"], pool.checkedout())
+            # SQLAlchemy reports unused pool capacity as negative overflow
+            gauge.add_metric(["overflow"], max(pool.overflow(), 0))
+        yield gauge
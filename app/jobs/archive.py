@@ -0,0 +1,130 @@
+"""
+Archive ENDED sessions out of the hot tables.
+
+Every session ENDED more than ``--older-than-days`` ago is written to a
+compressed NDJSON file in blob storage and its events, risk history and
+frozen reports are deleted (see `app.services.session_archive`). The
+session and its latest score stay, and report endpoints read archived
+sessions from their file. On Postgres the job then creates the upcoming
+monthly partitions and drops the old ones archival emptied, so the hot
+tables only hold recent and ACTIVE sessions. Run it at least daily::
+
+    python -m app.jobs.archive --older-than-days 30
+    python -m app.jobs.archive --dry-run
+
+Each session is archived in its own transaction; a failure is logged
+and the session is retried on the next run.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.session import InterviewSession
+from app.models.session_archive import SessionArchive
+from app.services import partitions, session_archive
+from app.services.report_cache import get_reports
+
+logger = logging.getLogger(__name__)
+
+
+async def archive(
+    db: AsyncSession,
+    older_than_days: int = 30,
+    limit: int | None = None,
+    compression: str | None = None,
+    dry_run: bool = False,
+    months_ahead: int = 2,
+) -> dict:
+    started = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    compression = compression or session_archive.default_compression()
+
+    # 1. ENDED sessions past the cutoff that are not archived yet
+    query = (
+        select(InterviewSession.id)
+        .outerjoin(SessionArchive, SessionArchive.session_id == InterviewSession.id)
+        .where(
+            InterviewSession.status == "ENDED",
+            InterviewSession.ended_at < cutoff,
+            SessionArchive.session_id.is_(None),
+        )
+        .order_by(InterviewSession.ended_at)
+        .limit(limit)
+    )
+    session_ids = (await db.scalars(query)).all()
+
+    stats = {"archived": 0, "failed": 0, "events": 0, "bytes": 0}
+    if not dry_run:
+        # 2. One session at a time, each in its own transaction
+        for session_id in session_ids:
+            try:
+                session = await db.get(InterviewSession, session_id)
+                raw_report, final_report = await get_reports(db, session_id)
+                record = await session_archive.archive_session(
+                    db, session, raw_report, final_report, compression
+                )
+            except Exception:
+                logger.exception("Archiving session %s failed", session_id)
+                await db.rollback()
+                stats["failed"] += 1
+                continue
+            stats["archived"] += 1
+            stats["events"] += record.event_count
+            stats["bytes"] += record.size_bytes
+
+    # 3. Keep partitions ahead of time and drop the emptied ones
+    created, dropped = [], []
+    if not dry_run:
+        created = await partitions.ensure_partitions(db, months_ahead)
+        dropped = await partitions.drop_empty_partitions(db, cutoff)
+        await db.commit()
+
+    return {
+        "dry_run": dry_run,
+        "cutoff": cutoff.isoformat(),
+        "compression": compression,
+        "candidates": len(session_ids),
+        **stats,
+        "partitions_created": created,
+        "partitions_dropped": dropped,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+    }
+
+
+async def run(args) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await archive(
+            db,
+            args.older_than_days,
+            args.limit,
+            None if args.compression == "auto" else args.compression,
+            args.dry_run,
+            args.months_ahead,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--older-than-days", type=int, default=30)
+    parser.add_argument("--limit", type=int, help="Archive at most this many sessions")
+    parser.add_argument("--compression", choices=["auto", *session_archive.COMPRESSIONS], default="auto")
+    parser.add_argument("--months-ahead", type=int, default=2, help="Partitions to create in advance")
+    parser.add_argument("--dry-run", action="store_true", help="Count candidates, change nothing")
+    args = parser.parse_args()
+
+    if args.compression == "zstd" and session_archive.default_compression() != "zstd":
+        parser.error("--compression zstd requires the zstandard package")
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
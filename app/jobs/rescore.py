@@ -0,0 +1,290 @@
+"""
+Offline re-scoring of every session after the risk rules change.
+
+A session's score only depends on how many events of each type it has:
+every type adds ``score * min(total, max_hits)``. The database therefore
+reduces the events table to one total per session and type, and the job
+walks sessions in keyset-paged chunks so a session is never split
+between chunks. Caps, scores and levels are applied to whole chunks at
+once with NumPy. Changed scores are upserted into ``session_risk`` in
+bulk, with the version of the rules that produced them. The frozen
+reports of those sessions are dropped, so they are rebuilt with the new
+rules on next read, and the API workers are told on the ``report_cache``
+channel to forget their cached copies (with BROKER_URL set).
+
+``--dry-run`` writes nothing and reports how the level distribution
+would shift. Pair it with ``--rules proposal.json`` to try rules before
+changing them::
+
+    python -m app.jobs.rescore --dry-run --rules proposal.json
+    python -m app.jobs.rescore
+
+A proposal file may override any rule or threshold of the rules in force::
+
+    {"rules": {"TAB_SWITCH": {"score": 15, "max_hits": 4}},
+     "thresholds": {"SUSPICIOUS": 50}}
+
+ACTIVE sessions are skipped unless ``--include-active`` is given. Their
+scores are still being written by live ingest, so a rescore could
+overwrite a newer score. Archived sessions are always skipped: their
+events have left the database and their archived report is final.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.event import Event
+from app.models.risk_score import RiskScore
+from app.models.session import InterviewSession
+from app.models.session_archive import SessionArchive
+from app.models.session_report import SessionReport
+from app.models.session_risk import SessionRisk
+from app.services import pubsub, risk_rules
+from app.services.report_cache import REPORT_CHANNEL
+from app.services.risk_persistence import dialect_insert
+from app.services.risk_rules import CompiledRules
+
+logger = logging.getLogger(__name__)
+
+UNSCORED = "UNSCORED"
+
+
+class RuleTables:
+    """Compiled rules as lookup arrays indexed by event-type code."""
+
+    def __init__(self, rules: CompiledRules):
+        self.version = rules.version
+        self.codes = {}
+        caps, scores = [], []
+        for event_type, (score, cap) in rules.lookup.items():
+            self.codes[event_type] = len(caps)
+            caps.append(cap)
+            scores.append(score)
+        # Last code: event types without a rule
+        self.caps = np.array(caps + [0], dtype=np.int64)
+        self.scores = np.array(scores + [0], dtype=np.int64)
+        self.unknown = len(caps)
+
+        self.level_names = np.array(rules.level_names, dtype=object)
+        self.level_bounds = np.array(rules.level_bounds, dtype=np.int64)
+
+    @classmethod
+    def current(cls) -> "RuleTables":
+        return cls(risk_rules.current())
+
+    @classmethod
+    def from_proposal(cls, path: str) -> "RuleTables":
+        with open(path) as f:
+            proposal = json.load(f)
+
+        config = risk_rules.current().to_dict()
+        rules = config["rules"]
+        for event_type, rule in proposal.get("rules", {}).items():
+            rules.setdefault(event_type, {"score": 0, "max_hits": 0}).update(rule)
+        thresholds = {**config["thresholds"], **proposal.get("thresholds", {})}
+        return cls(CompiledRules(rules, thresholds))
+
+    def score(self, session_index: np.ndarray, event_types: list[str], totals: np.ndarray, sessions: int):
+        """Scores of ``sessions`` sessions from per (session, type) totals."""
+        codes = np.fromiter(
+            (self.codes.get(event_type, self.unknown) for event_type in event_types),
+            dtype=np.int64,
+            count=len(event_types),
+        )
+        points = np.minimum(totals, self.caps[codes]) * self.scores[codes]
+        return np.bincount(session_index, weights=points, minlength=sessions).astype(np.int64)
+
+    def levels(self, scores: np.ndarray) -> np.ndarray:
+        index = np.searchsorted(self.level_bounds, scores, side="right") - 1
+        return self.level_names[np.clip(index, 0, None)]
+
+
+def rescore(
+    db: Session,
+    tables: RuleTables,
+    dry_run: bool = False,
+    include_active: bool = False,
+    chunk_size: int = 5000,
+) -> dict:
+    started = time.perf_counter()
+    stats = Counter()
+    transitions = Counter()
+    last_id = None
+
+    while True:
+        # 1. Next chunk of sessions, with their stored score
+        query = (
+            select(InterviewSession.id, SessionRisk.score, SessionRisk.level, SessionRisk.rule_version)
+            .outerjoin(SessionRisk, SessionRisk.session_id == InterviewSession.id)
+            .outerjoin(SessionArchive, SessionArchive.session_id == InterviewSession.id)
+            .where(SessionArchive.session_id.is_(None))
+            .order_by(InterviewSession.id)
+            .limit(chunk_size)
+        )
+        if not include_active:
+            query = query.where(InterviewSession.status != "ACTIVE")
+        if last_id is not None:
+            query = query.where(InterviewSession.id > last_id)
+        sessions = db.execute(query).all()
+        if not sessions:
+            break
+        last_id = sessions[-1][0]
+
+        session_ids = [row[0] for row in sessions]
+        position = {session_id: index for index, session_id in enumerate(session_ids)}
+
+        # 2. One total per (session, event type), reduced in the database
+        totals = db.execute(
+            select(Event.session_id, Event.event_type, func.sum(func.coalesce(Event.count, 1)))
+            .where(Event.session_id.in_(session_ids))
+            .group_by(Event.session_id, Event.event_type)
+        ).all()
+
+        # 3. Vectorized capping, scoring and levels for the whole chunk
+        session_index = np.fromiter((position[row[0]] for row in totals), dtype=np.int64, count=len(totals))
+        counts = np.fromiter((row[2] for row in totals), dtype=np.int64, count=len(totals))
+        scores = tables.score(session_index, [row[1] for row in totals], counts, len(sessions))
+        levels = tables.levels(scores)
+
+        old_scores = np.array([-1 if row[1] is None else row[1] for row in sessions], dtype=np.int64)
+        old_levels = np.array([row[2] or UNSCORED for row in sessions], dtype=object)
+        outdated = np.array([row[3] != tables.version for row in sessions], dtype=bool)
+        # Sessions without events and without a stored score stay unscored
+        unscored = (old_scores == -1) & (scores == 0)
+        levels[unscored] = UNSCORED
+        changed = np.flatnonzero(
+            ((scores != old_scores) | (levels != old_levels) | outdated) & ~unscored
+        )
+
+        stats["sessions"] += len(sessions)
+        stats["events"] += int(counts.sum())
+        stats["changed"] += len(changed)
+        transitions.update(zip(old_levels.tolist(), levels.tolist()))
+
+        # 4. Bulk write of the changed sessions only
+        if not dry_run and len(changed):
+            changed_ids = [session_ids[i] for i in changed]
+            _write(db, changed_ids, scores[changed], levels[changed], tables.version)
+            _announce(changed_ids)
+
+    before, after = Counter(), Counter()
+    for (old_level, new_level), count in transitions.items():
+        before[old_level] += count
+        after[new_level] += count
+
+    return {
+        "dry_run": dry_run,
+        "rule_version": tables.version,
+        "sessions": stats["sessions"],
+        "events": stats["events"],
+        "changed": stats["changed"],
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+        "levels_before": dict(before),
+        "levels_after": dict(after),
+        "transitions": {
+            f"{old_level}->{new_level}": count
+            for (old_level, new_level), count in sorted(transitions.items())
+            if old_level != new_level
+        },
+    }
+
+
+def _write(db: Session, session_ids: list[str], scores: np.ndarray, levels: np.ndarray, rule_version: str):
+    now = datetime.utcnow()
+    rows = [
+        {
+            "session_id": session_id,
+            "score": int(score),
+            "level": level,
+            "rule_version": rule_version,
+            "updated_at": now,
+        }
+        for session_id, score, level in zip(session_ids, scores.tolist(), levels.tolist())
+    ]
+
+    stmt = dialect_insert(db)(SessionRisk)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SessionRisk.session_id],
+            set_={
+                "score": stmt.excluded.score,
+                "level": stmt.excluded.level,
+                "rule_version": stmt.excluded.rule_version,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ),
+        rows,
+    )
+
+    if settings.RISK_HISTORY_ENABLED:
+        db.execute(
+            RiskScore.__table__.insert(),
+            [
+                {
+                    "id": str(uuid4()),
+                    "session_id": row["session_id"],
+                    "score": row["score"],
+                    "level": row["level"],
+                    "rule_version": rule_version,
+                    "created_at": now,
+                }
+                for row in rows
+            ],
+        )
+
+    # Frozen reports were built with the old rules
+    db.execute(delete(SessionReport).where(SessionReport.session_id.in_(session_ids)))
+    db.commit()
+
+
+def _announce(session_ids: list[str]):
+    """Have every API worker drop its cached reports of these sessions."""
+    if not settings.BROKER_URL:
+        # In-process broker: no worker would hear it; they notice the new
+        # rule version instead
+        return
+    try:
+        asyncio.run(_publish({"session_ids": session_ids}))
+    except Exception:
+        logger.exception("Report cache invalidation failed; workers fall back to the rule version check")
+
+
+async def _publish(message: dict):
+    broker = pubsub.create_broker(settings.BROKER_URL)
+    try:
+        await broker.publish(REPORT_CHANNEL, message)
+    finally:
+        await broker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="Report the shift, write nothing")
+    parser.add_argument("--rules", help="JSON rule proposal (requires --dry-run)")
+    parser.add_argument("--include-active", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.rules and not args.dry_run:
+        parser.error("--rules only applies with --dry-run; set RISK_RULES_PATH to apply rules")
+
+    logging.basicConfig(level=logging.INFO)
+    tables = RuleTables.from_proposal(args.rules) if args.rules else RuleTables.current()
+    with SessionLocal() as db:
+        result = rescore(db, tables, args.dry_run, args.include_active, args.chunk_size)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import sessions, events, reports
+from app.api.v1 import sessions, events, reports, frames, monitoring, rules
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import async_engine
+from app.services.event_queue import EventWriteQueue
+from app.services import pubsub
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pubsub.start(pubsub.create_broker(settings.BROKER_URL))
+
+    event_queue = None
+    if settings.EVENT_WRITE_BEHIND or settings.EVENT_GROUP_COMMIT:
+        event_queue = EventWriteQueue.from_settings()
+        await event_queue.start()
+    app.state.event_queue = event_queue
+
+    frame_ingest = None
+    if settings.FRAME_INGEST_ENABLED:
+        from app.services.frame_ingest import FrameIngestService
+
+        frame_ingest = FrameIngestService.from_settings()
+        await frame_ingest.start()
+    app.state.frame_ingest = frame_ingest
+
+    yield
+
+    if frame_ingest is not None:
+        await frame_ingest.stop()
+
+    if event_queue is not None:
+        await event_queue.stop(settings.EVENT_QUEUE_DRAIN_TIMEOUT_SEC)
+
+    await pubsub.stop()
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Interview Integrity Monitoring API",
         description="Backend for AI-powered interview integrity monitoring",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -21,6 +58,18 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.METRICS_ENABLED:
+        metrics.setup(async_engine)
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
+
+    if settings.PROFILE_SLOW_REQUEST_MS > 0:
+        app.add_middleware(
+            metrics.ProfilingMiddleware,
+            threshold_ms=settings.PROFILE_SLOW_REQUEST_MS,
+            directory=settings.PROFILE_DIR,
+        )
+
     # Health check
     @app.get("/health", tags=["Health"])
     async def health_check():
@@ -30,6 +79,9 @@ def create_app() -> FastAPI:
     app.include_router(sessions.router, prefix="/api/v1", tags=["Sessions"])
     app.include_router(events.router, prefix="/api/v1", tags=["Events"])
     app.include_router(reports.router, prefix="/api/v1", tags=["Reports"])
+    app.include_router(frames.router, prefix="/api/v1", tags=["Frames"])
+    app.include_router(monitoring.router, prefix="/api/v1", tags=["Monitoring"])
+    app.include_router(rules.router, prefix="/api/v1", tags=["Rules"])
 
     return app
 
@@ -1,3 +1,8 @@
 from app.models.session import InterviewSession
 from app.models.event import Event
 from app.models.risk_score import RiskScore
+from app.models.session_risk import SessionRisk
+from app.models.session_report import SessionReport
+from app.models.auth_snapshot import AuthSnapshot
+from app.models.session_archive import SessionArchive
+from app.models.event_receipt import EventReceipt
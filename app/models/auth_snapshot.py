@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, DateTime, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+
+class AuthSnapshot(Base):
+    """Face-gate snapshot of a session, stored once per distinct image."""
+
+    __tablename__ = "auth_snapshots"
+    __table_args__ = (
+        UniqueConstraint("session_id", "sha256", name="uq_auth_snapshots_session_id_sha256"),
+    )
+
+    id = Column(String, primary_key=True)
+    session_id = Column(String, nullable=False)
+
+    sha256 = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    width = Column(Integer)
+    height = Column(Integer)
+
+    path = Column(String, nullable=False)
+    thumbnail_path = Column(String)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
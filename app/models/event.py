@@ -1,23 +1,33 @@
-from sqlalchemy import Column, String, DateTime, Float
+from sqlalchemy import Column, String, DateTime, Float, Integer, Index
 from app.core.database import Base
 from datetime import datetime
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
 from app.utils.enums import EventType, SeverityLevel
 
 
 class Event(Base):
     __tablename__ = "events"
 
-    id = Column(String, primary_key=True, index=True)
-    session_id = Column(String, index=True)
+    id = Column(String, primary_key=True)
+    session_id = Column(String)
 
     event_type = Column(String, index=True)
     severity = Column(String)
     confidence = Column(Float, nullable=True)
 
+    # Repeats of the same event type are coalesced into one episode row:
+    # timestamp is its first occurrence, ended_at its last
     timestamp = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    ended_at = Column(DateTime, nullable=True)
+    count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Monthly range partition key on Postgres, which requires it in the
+    # primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_events_session_id_timestamp", "session_id", "timestamp"),
+    )
 
 
 class EventCreate(BaseModel):
@@ -26,6 +36,13 @@ class EventCreate(BaseModel):
     severity: SeverityLevel
     confidence: float | None = None
     timestamp: datetime
+    # Set by clients that retry: a repeat of a stored key is not stored again
+    idempotency_key: str | None = Field(None, min_length=1, max_length=64)
+
+
+class EventBatchCreate(BaseModel):
+    events: list[EventCreate] = Field(..., min_length=1, max_length=1000)
+
 
 class EventResponse(BaseModel):
     id: str
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class EventReceipt(Base):
+    """Idempotency key of an event already stored, and the event row it went to."""
+
+    __tablename__ = "event_receipts"
+
+    session_id = Column(String, primary_key=True)
+    idempotency_key = Column(String(64), primary_key=True)
+
+    # The event's own row, or the episode it was coalesced into
+    event_id = Column(String, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy import Column, String, Integer, DateTime, Index
 from datetime import datetime
 from app.core.database import Base
 
@@ -6,10 +6,20 @@ from app.core.database import Base
 class RiskScore(Base):
     __tablename__ = "risk_scores"
 
-    id = Column(String, primary_key=True, index=True)
-    session_id = Column(String, index=True)
+    id = Column(String, primary_key=True)
+    session_id = Column(String)
 
     score = Column(Integer)
     level = Column(String)
+    rule_version = Column(String)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Monthly range partition key on Postgres, which requires it in the
+    # primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+
+Index(
+    "ix_risk_scores_session_id_created_at",
+    RiskScore.session_id,
+    RiskScore.created_at.desc(),
+)
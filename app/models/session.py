@@ -6,7 +6,7 @@ from app.core.database import Base
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True)
     status = Column(String, default="CREATED")  # CREATED | ACTIVE | ENDED
 
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class SessionArchive(Base):
+    """Compressed file holding the events and reports of an archived session."""
+
+    __tablename__ = "session_archives"
+
+    session_id = Column(String, primary_key=True)
+
+    path = Column(String, nullable=False)
+    compression = Column(String, nullable=False)  # zstd | gzip
+    sha256 = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    event_count = Column(Integer, nullable=False)
+
+    archived_at = Column(DateTime, default=datetime.utcnow)
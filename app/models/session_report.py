@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from datetime import datetime
+from app.core.database import Base
+
+
+class SessionReport(Base):
+    """Reports of an ENDED session, computed once since its events are frozen."""
+
+    __tablename__ = "session_reports"
+
+    session_id = Column(String, primary_key=True)
+
+    raw_report = Column(JSON, nullable=False)
+    final_report = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class SessionRisk(Base):
+    """Current risk score per session, upserted in place on every event."""
+
+    __tablename__ = "session_risk"
+
+    session_id = Column(String, primary_key=True)
+
+    score = Column(Integer)
+    level = Column(String)
+    # Version of the rule set the score was computed with
+    rule_version = Column(String)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,129 @@
+"""
+Face-gate auth snapshots.
+
+Uploads are spooled to a temporary file in the threadpool and hashed on
+the way. A snapshot whose SHA-256 is already recorded for the session is
+not written again. A new image is decoded once to record its size and
+make a small thumbnail, then both are stored under its hash.
+"""
+import hashlib
+import tempfile
+from typing import AsyncIterator
+from uuid import uuid4
+import cv2
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.auth_snapshot import AuthSnapshot
+from app.services.blob_storage import iter_bytes, storage
+
+SNAPSHOT_PREFIX = "auth_snapshots"
+
+# Snapshots up to this size never touch the disk while spooled
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+
+class SnapshotTooLarge(ValueError):
+    pass
+
+
+async def save_snapshot(
+    db: AsyncSession,
+    session_id: str,
+    chunks: AsyncIterator[bytes],
+) -> tuple[AuthSnapshot, bool]:
+    """Store a JPEG snapshot; returns the record and whether it is new."""
+    spool = await run_in_threadpool(tempfile.SpooledTemporaryFile, SPOOL_MEMORY_BYTES)
+    try:
+        # 1. Spool and hash
+        sha256, size = await _receive(spool, chunks)
+
+        # 2. Same image already stored for this session
+        existing = await _find(db, session_id, sha256)
+        if existing is not None:
+            return existing, False
+
+        # 3. Decode once: dimensions and thumbnail
+        data, width, height, thumbnail = await run_in_threadpool(_decode, spool)
+    finally:
+        await run_in_threadpool(spool.close)
+
+    key = f"{SNAPSHOT_PREFIX}/{session_id}/{sha256}.jpg"
+    thumbnail_key = f"{SNAPSHOT_PREFIX}/{session_id}/{sha256}_thumb.jpg"
+    await storage.put(key, iter_bytes(data))
+    await storage.put(thumbnail_key, iter_bytes(thumbnail))
+
+    snapshot = AuthSnapshot(
+        id=str(uuid4()),
+        session_id=session_id,
+        sha256=sha256,
+        size_bytes=size,
+        width=width,
+        height=height,
+        path=key,
+        thumbnail_path=thumbnail_key,
+    )
+    db.add(snapshot)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same image was recorded first
+        await db.rollback()
+        return await _find(db, session_id, sha256), False
+
+    return snapshot, True
+
+
+async def _receive(spool, chunks: AsyncIterator[bytes]) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if len(head) < len(JPEG_MAGIC):
+            head += chunk[:len(JPEG_MAGIC)]
+            if not JPEG_MAGIC.startswith(head[:len(JPEG_MAGIC)]):
+                raise ValueError("Snapshot must be a JPEG image")
+        size += len(chunk)
+        if size > settings.AUTH_SNAPSHOT_MAX_BYTES:
+            raise SnapshotTooLarge(f"Snapshot exceeds {settings.AUTH_SNAPSHOT_MAX_BYTES} bytes")
+        await run_in_threadpool(_write, spool, digest, chunk)
+
+    if size < len(JPEG_MAGIC):
+        raise ValueError("Snapshot must be a JPEG image")
+    return digest.hexdigest(), size
+
+
+async def _find(db: AsyncSession, session_id: str, sha256: str) -> AuthSnapshot | None:
+    return await db.scalar(
+        select(AuthSnapshot)
+        .where(AuthSnapshot.session_id == session_id, AuthSnapshot.sha256 == sha256)
+    )
+
+
+def _write(handle, digest, chunk: bytes):
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+def _decode(spool):
+    spool.seek(0)
+    data = spool.read()
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Snapshot could not be decoded")
+
+    height, width = image.shape[:2]
+    thumb_width = min(settings.AUTH_SNAPSHOT_THUMB_WIDTH, width)
+    thumb_height = max(1, round(height * thumb_width / width))
+    thumbnail = cv2.resize(image, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+    _, encoded = cv2.imencode(".jpg", thumbnail, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return data, width, height, encoded.tobytes()
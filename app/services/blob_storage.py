@@ -0,0 +1,453 @@
+"""
+Blob storage for recordings and snapshots.
+
+`BlobStorage` hides where uploaded media lives, so API workers do not
+depend on a shared working directory. `LocalBlobStorage` keeps blobs
+under a directory, which is fine for a single node. `S3BlobStorage`
+talks to any S3-compatible service through a boto3-style client (requires
+the optional ``boto3`` package). `InMemoryS3Client` stands in for that
+client in tests and local runs.
+
+Besides whole-object writes and range reads there are appendable blobs
+for resumable uploads. An append either lands whole or not at all.
+Locally they are one growing file. On S3 every append is its own part
+object, and `finalize` assembles them with a
+server-side multipart copy wherever S3's part size rules allow it.
+"""
+import io
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO
+from uuid import uuid4
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+# S3 multipart rules: every part but the last must be at least 5 MiB
+S3_MIN_PART_BYTES = 5 * 1024 * 1024
+S3_PART_BYTES = 8 * 1024 * 1024
+
+
+class BlobStorage(ABC):
+    @abstractmethod
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """Write a whole blob, replacing any previous one; returns its size."""
+
+    @abstractmethod
+    async def size(self, key: str) -> int | None:
+        """Size of a blob, or None if it does not exist."""
+
+    @abstractmethod
+    def read(self, key: str, start: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        """Stream ``length`` bytes of a blob from ``start`` (to the end when None)."""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def append(self, key: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append to an appendable blob whose current size is ``offset``; returns the new size."""
+
+    @abstractmethod
+    async def appended_size(self, key: str) -> int:
+        """Current size of an appendable blob, 0 if nothing was appended."""
+
+    @abstractmethod
+    async def finalize(self, key: str, dest: str) -> int:
+        """Turn an appendable blob into the regular blob ``dest``; returns its size."""
+
+    @abstractmethod
+    def location(self, key: str) -> str:
+        """Where a blob lives, as a file path or URL, for clients that show it."""
+
+
+class LocalBlobStorage(BlobStorage):
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        path = self.path(key)
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+
+        try:
+            size = await self._write(tmp_path, "wb", chunks)
+            # Readers never see a half-written blob
+            await run_in_threadpool(os.replace, tmp_path, path)
+        finally:
+            await run_in_threadpool(tmp_path.unlink, missing_ok=True)
+        return size
+
+    async def size(self, key: str) -> int | None:
+        return await run_in_threadpool(_file_size, self.path(key))
+
+    async def read(self, key: str, start: int = 0, length: int | None = None):
+        handle = await run_in_threadpool(open, self.path(key), "rb")
+        try:
+            await run_in_threadpool(handle.seek, start)
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = READ_CHUNK_BYTES if remaining is None else min(READ_CHUNK_BYTES, remaining)
+                chunk = await run_in_threadpool(handle.read, size)
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(handle.close)
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self.path(key).unlink, missing_ok=True)
+
+    async def append(self, key: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        path = self.path(key)
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        try:
+            return offset + await self._write(path, "ab", chunks)
+        except BaseException:
+            # As on S3, a failed append leaves nothing behind: the uploader
+            # resends the whole chunk from the offset it started at
+            await run_in_threadpool(os.truncate, path, offset)
+            raise
+
+    async def appended_size(self, key: str) -> int:
+        return await self.size(key) or 0
+
+    async def finalize(self, key: str, dest: str) -> int:
+        # A rename: no bytes are copied
+        source, target = self.path(key), self.path(dest)
+        await run_in_threadpool(target.parent.mkdir, parents=True, exist_ok=True)
+        await run_in_threadpool(os.replace, source, target)
+        return await self.size(dest)
+
+    def location(self, key: str) -> str:
+        # The file path the API returned before blob storage
+        return str(self.root / key)
+
+    async def _write(self, path: Path, mode: str, chunks: AsyncIterator[bytes]) -> int:
+        handle = await run_in_threadpool(open, path, mode)
+        written = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                # Request bodies arrive in small pieces, write them in larger ones
+                if len(buffer) >= READ_CHUNK_BYTES:
+                    await run_in_threadpool(handle.write, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await run_in_threadpool(handle.write, bytes(buffer))
+                written += len(buffer)
+        finally:
+            await run_in_threadpool(handle.close)
+        return written
+
+
+class S3BlobStorage(BlobStorage):
+    def __init__(self, bucket: str, client=None, prefix: str = "", **client_options):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self._client = client
+        self._client_options = client_options
+
+    @property
+    def client(self):
+        # Created on first use so the module imports without boto3
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("s3", **self._client_options)
+        return self._client
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        return await self._upload(self._key(key), chunks)
+
+    async def size(self, key: str) -> int | None:
+        try:
+            head = await self._call("head_object", Key=self._key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+        return head["ContentLength"]
+
+    async def read(self, key: str, start: int = 0, length: int | None = None):
+        if length == 0:
+            return
+        end = "" if length is None else start + length - 1
+        response = await self._call("get_object", Key=self._key(key), Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            while chunk := await run_in_threadpool(body.read, READ_CHUNK_BYTES):
+                yield chunk
+        finally:
+            await run_in_threadpool(body.close)
+
+    async def delete(self, key: str):
+        await self._call("delete_object", Key=self._key(key))
+
+    async def append(self, key: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        # One object per append, named by its offset so parts list in order.
+        # An interrupted append leaves nothing behind.
+        written = await self._upload(self._part_key(key, offset), chunks)
+        return offset + written
+
+    async def appended_size(self, key: str) -> int:
+        return sum(size for _, size in await self._parts(key))
+
+    async def finalize(self, key: str, dest: str) -> int:
+        parts = await self._parts(key)
+        if not parts:
+            raise ValueError(f"Nothing appended to {key}")
+
+        dest_key = self._key(dest)
+        upload = await self._call("create_multipart_upload", Key=dest_key)
+        upload_id = upload["UploadId"]
+        uploaded = []
+        buffer = bytearray()
+
+        async def flush():
+            response = await self._call(
+                "upload_part", Key=dest_key, UploadId=upload_id,
+                PartNumber=len(uploaded) + 1, Body=bytes(buffer),
+            )
+            uploaded.append({"ETag": response["ETag"], "PartNumber": len(uploaded) + 1})
+            buffer.clear()
+
+        try:
+            for part_key, size in parts:
+                if not buffer and size >= S3_MIN_PART_BYTES:
+                    # Server-side copy, the bytes never pass through this node
+                    response = await self._call(
+                        "upload_part_copy", Key=dest_key, UploadId=upload_id,
+                        PartNumber=len(uploaded) + 1,
+                        CopySource={"Bucket": self.bucket, "Key": part_key},
+                    )
+                    uploaded.append({
+                        "ETag": response["CopyPartResult"]["ETag"],
+                        "PartNumber": len(uploaded) + 1,
+                    })
+                    continue
+
+                # Too small to be a part on its own: merge with its neighbours
+                response = await self._call("get_object", Key=part_key)
+                buffer += await run_in_threadpool(response["Body"].read)
+                if len(buffer) >= S3_MIN_PART_BYTES:
+                    await flush()
+
+            if buffer:
+                await flush()
+
+            await self._call(
+                "complete_multipart_upload", Key=dest_key, UploadId=upload_id,
+                MultipartUpload={"Parts": uploaded},
+            )
+        except BaseException:
+            await self._call("abort_multipart_upload", Key=dest_key, UploadId=upload_id)
+            raise
+
+        await self._call(
+            "delete_objects",
+            Delete={"Objects": [{"Key": part_key} for part_key, _ in parts]},
+        )
+        return sum(size for _, size in parts)
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._key(key)}"
+
+    async def _upload(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """Single PUT for small bodies, multipart once a body outgrows one part."""
+        buffer = bytearray()
+        upload_id = None
+        uploaded = []
+        written = 0
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                written += len(chunk)
+                if len(buffer) < S3_PART_BYTES:
+                    continue
+                if upload_id is None:
+                    upload_id = (await self._call("create_multipart_upload", Key=key))["UploadId"]
+                response = await self._call(
+                    "upload_part", Key=key, UploadId=upload_id,
+                    PartNumber=len(uploaded) + 1, Body=bytes(buffer),
+                )
+                uploaded.append({"ETag": response["ETag"], "PartNumber": len(uploaded) + 1})
+                buffer.clear()
+
+            if upload_id is None:
+                await self._call("put_object", Key=key, Body=bytes(buffer))
+                return written
+
+            if buffer:
+                response = await self._call(
+                    "upload_part", Key=key, UploadId=upload_id,
+                    PartNumber=len(uploaded) + 1, Body=bytes(buffer),
+                )
+                uploaded.append({"ETag": response["ETag"], "PartNumber": len(uploaded) + 1})
+            await self._call(
+                "complete_multipart_upload", Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": uploaded},
+            )
+        except BaseException:
+            if upload_id is not None:
+                await self._call("abort_multipart_upload", Key=key, UploadId=upload_id)
+            raise
+
+        return written
+
+    async def _parts(self, key: str) -> list[tuple[str, int]]:
+        prefix = self._part_key(key, None)
+        parts = []
+        token = None
+        while True:
+            options = {"Prefix": prefix}
+            if token:
+                options["ContinuationToken"] = token
+            response = await self._call("list_objects_v2", **options)
+            parts.extend((item["Key"], item["Size"]) for item in response.get("Contents", ()))
+            if not response.get("IsTruncated"):
+                break
+            token = response["NextContinuationToken"]
+        return sorted(parts)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _part_key(self, key: str, offset: int | None) -> str:
+        prefix = self._key(key) + ".parts/"
+        return prefix if offset is None else f"{prefix}{offset:016d}"
+
+    async def _call(self, method: str, **kwargs):
+        return await run_in_threadpool(getattr(self.client, method), Bucket=self.bucket, **kwargs)
+
+
+class InMemoryS3Client:
+    """The subset of the boto3 S3 client used by `S3BlobStorage`, kept in a dict."""
+
+    class NotFound(Exception):
+        response = {"Error": {"Code": "404"}}
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Bucket, Key] = bytes(Body)
+        return {"ETag": _etag()}
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self._get(Bucket, Key))}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self._get(Bucket, Key)
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = data[int(start):int(end) + 1 if end else None]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        for item in Delete["Objects"]:
+            self.objects.pop((Bucket, item["Key"]), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+        contents = [
+            {"Key": key, "Size": len(data)}
+            for (bucket, key), data in sorted(self.objects.items())
+            if bucket == Bucket and key.startswith(Prefix)
+        ]
+        return {"Contents": contents, "IsTruncated": False}
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = uuid4().hex
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": _etag()}
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource):
+        data = self._get(CopySource["Bucket"], CopySource["Key"])
+        self.uploads[UploadId][PartNumber] = data
+        return {"CopyPartResult": {"ETag": _etag()}}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        for number in numbers[:-1]:
+            if len(parts[number]) < S3_MIN_PART_BYTES:
+                raise ValueError("EntityTooSmall")
+        self.objects[Bucket, Key] = b"".join(parts[number] for number in numbers)
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        return {}
+
+    def _get(self, bucket, key) -> bytes:
+        try:
+            return self.objects[bucket, key]
+        except KeyError:
+            raise self.NotFound(key) from None
+
+
+def create_storage() -> BlobStorage:
+    if settings.STORAGE_BACKEND == "s3":
+        options = {}
+        if settings.S3_ENDPOINT_URL:
+            options["endpoint_url"] = settings.S3_ENDPOINT_URL
+        if settings.S3_REGION:
+            options["region_name"] = settings.S3_REGION
+        return S3BlobStorage(settings.S3_BUCKET, prefix=settings.S3_PREFIX, **options)
+    if settings.STORAGE_BACKEND == "memory":
+        return S3BlobStorage("local", client=InMemoryS3Client())
+    return LocalBlobStorage(settings.STORAGE_LOCAL_ROOT)
+
+
+async def iter_file(source: BinaryIO, size: int = READ_CHUNK_BYTES):
+    """Stream a blocking file object without blocking the event loop."""
+    while chunk := await run_in_threadpool(source.read, size):
+        yield chunk
+
+
+async def iter_bytes(data: bytes):
+    yield data
+
+
+def _file_size(path: Path) -> int | None:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+def _etag() -> str:
+    return f'"{uuid4().hex}"'
+
+
+storage = create_storage()
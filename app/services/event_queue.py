@@ -0,0 +1,254 @@
+"""
+Optional write-behind and group-commit queue for event ingestion.
+
+A background task drains the queue in micro-batches through
+`create_events_batch`: one transaction, one risk update and one RiskScore
+row per session per flush.
+
+With EVENT_WRITE_BEHIND enabled, POST /events acknowledges as soon as a
+validated event is queued (`enqueue`). With EVENT_GROUP_COMMIT, requests
+`submit` their events and wait until the flush that stores them has
+committed, so responses are unchanged and nothing acknowledged can be
+lost. Concurrent requests then share one commit every
+EVENT_GROUP_COMMIT_WINDOW_SEC instead of paying for one each, which
+matters most on SQLite where every commit is serialized.
+
+Durability trade-off: queued events are lost if the process dies before
+they are flushed. EVENT_QUEUE_FULL_POLICY decides what happens under
+pressure. ``reject`` answers 503 so the client retries. ``sync`` writes
+the event synchronously, as if the queue were off. On shutdown the
+lifespan drains the queue for at most EVENT_QUEUE_DRAIN_TIMEOUT_SEC.
+
+Ending a session goes through `flush_session`, which writes the
+session's queued events first, so an acknowledged event is never
+rejected for arriving at an ENDED session.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.event import EventCreate
+from app.services.event_service import create_events_batch
+
+logger = logging.getLogger(__name__)
+
+
+class EventWriteQueue:
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        flush_size: int = 200,
+        flush_interval_sec: float = 0.05,
+        max_retries: int = 3,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_sec = flush_interval_sec
+        self.max_retries = max_retries
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task = None
+        self._closing = False
+        # session_id -> events queued or being flushed
+        self._pending: Counter = Counter()
+        self._drained = asyncio.Condition()
+        self._ending: set[str] = set()
+
+        self.enqueued = 0
+        self.full = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "EventWriteQueue":
+        return cls(
+            maxsize=settings.EVENT_QUEUE_MAXSIZE,
+            flush_size=settings.EVENT_QUEUE_FLUSH_SIZE,
+            flush_interval_sec=(
+                settings.EVENT_GROUP_COMMIT_WINDOW_SEC if settings.EVENT_GROUP_COMMIT
+                else settings.EVENT_QUEUE_FLUSH_INTERVAL_SEC
+            ),
+            max_retries=settings.EVENT_QUEUE_MAX_RETRIES,
+        )
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, event: EventCreate) -> bool:
+        """Queue an event; False when the queue is full, shutting down or its session is ending."""
+        if self._closing or self.ending(event.session_id):
+            return False
+        try:
+            self._queue.put_nowait(([event], None))
+        except asyncio.QueueFull:
+            self.full += 1
+            return False
+        self._pending[event.session_id] += 1
+        self.enqueued += 1
+        return True
+
+    async def submit(self, events: list[EventCreate]) -> list[tuple[dict, dict | None]] | None:
+        """
+        Queue events and wait until they are committed, all in the same flush.
+
+        Returns, per event, its `create_events_batch` result and its
+        session's risk result (None when rejected). Returns None when the
+        queue is full, shutting down or one of the sessions is ending.
+        """
+        if self.ending(*(event.session_id for event in events)):
+            return None
+        if self._closing or self._queue.full():
+            self.full += 1
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((events, future))
+        self._pending.update(event.session_id for event in events)
+        self.enqueued += len(events)
+        return await future
+
+    def ending(self, *session_ids: str) -> bool:
+        """True if one of the sessions is being ended; its events are not queued meanwhile."""
+        return not self._ending.isdisjoint(session_ids)
+
+    @asynccontextmanager
+    async def flush_session(self, session_id: str):
+        """
+        Wait until a session's queued events are written before the block
+        runs, and keep new ones out of the queue until it exits.
+
+        Wraps ending a session so every event acknowledged before the end
+        is in its frozen report. The caller must not hold the session's
+        lock while entering: the flush takes it.
+        """
+        self._ending.add(session_id)
+        try:
+            # Move the session's own events to the front of the queue; the
+            # order of every other session's events is kept
+            mine, others = [], []
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                only_mine = all(event.session_id == session_id for event in item[0])
+                (mine if only_mine else others).append(item)
+            for item in mine + others:
+                self._queue.put_nowait(item)
+
+            async with self._drained:
+                await self._drained.wait_for(lambda: not self._pending[session_id])
+            yield
+        finally:
+            self._ending.discard(session_id)
+
+    async def stop(self, timeout: float):
+        """Stop accepting events and flush what is queued."""
+        self._closing = True
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error("Event queue drain timed out, %d events lost", self._queue.qsize())
+            self.failed += self._queue.qsize()
+            while not self._queue.empty():
+                events, future = self._queue.get_nowait()
+                if future is not None:
+                    future.cancel()
+                await self._done(events)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "full": self.full,
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    async def _run(self):
+        while not (self._closing and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> list[tuple[list[EventCreate], asyncio.Future | None]]:
+        try:
+            first = await asyncio.wait_for(self._queue.get(), self.flush_interval_sec)
+        except asyncio.TimeoutError:
+            return []
+
+        # A request's events are never split between flushes
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.flush_interval_sec
+        while size < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and self._queue.empty():
+                break
+            try:
+                item = (
+                    self._queue.get_nowait() if remaining <= 0
+                    else await asyncio.wait_for(self._queue.get(), remaining)
+                )
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _flush(self, batch: list[tuple[list[EventCreate], asyncio.Future | None]]):
+        events = [event for items, _ in batch for event in items]
+        try:
+            await self._write(batch, events)
+        finally:
+            await self._done(events)
+
+    async def _write(self, batch, events: list[EventCreate]):
+        started = time.perf_counter()
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with AsyncSessionLocal() as db:
+                    results, risk_results = await create_events_batch(db, events)
+                break
+            except Exception as e:
+                logger.exception("Event flush failed (attempt %d/%d)", attempt, self.max_retries)
+                if attempt == self.max_retries:
+                    self.failed += len(events)
+                    for _, future in batch:
+                        if future is not None and not future.done():
+                            future.set_exception(e)
+                    return
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+        # Hand each waiting request its own events' results
+        offset = 0
+        for items, future in batch:
+            if future is not None and not future.done():
+                future.set_result([
+                    ({**results[offset + index], "index": index}, risk_results.get(event.session_id))
+                    for index, event in enumerate(items)
+                ])
+            offset += len(items)
+
+        rejected = sum(1 for result in results if result["status"] == "rejected")
+        self.rejected += rejected
+        self.flushed += len(events) - rejected
+        self.batches += 1
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _done(self, events: list[EventCreate]):
+        """Count events as no longer pending and wake `flush_session` waiters."""
+        self._pending.subtract(event.session_id for event in events)
+        for session_id in {event.session_id for event in events}:
+            if self._pending[session_id] <= 0:
+                del self._pending[session_id]
+        async with self._drained:
+            self._drained.notify_all()
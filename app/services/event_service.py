@@ -1,46 +1,305 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import datetime
 from uuid import uuid4
 
+from app.core import metrics
+from app.core.config import settings
 from app.models.event import Event, EventCreate
-from app.services.risk_engine import calculate_risk_for_session
-from app.services.risk_persistence import save_risk_score
+from app.models.event_receipt import EventReceipt
 from app.models.session import InterviewSession
-def create_event(db: Session, event: EventCreate):
-    session = (
-        db.query(InterviewSession)
-        .filter(InterviewSession.id == event.session_id)
-        .first()
-    )
+from app.services.risk_engine import to_naive_utc
+from app.services.risk_persistence import save_risk_score
+from app.services import risk_state, session_cache
+from app.services.risk_stream import risk_hub, risk_update
 
-    if not session:
-        raise ValueError("Invalid session_id")
 
-    if session.status != "ACTIVE":
-        raise ValueError("Events are not allowed for this session state")
+async def create_event(db: AsyncSession, event: EventCreate):
+    # Status is checked under the session lock so end_session cannot
+    # freeze the report while this event is being written
+    async with risk_state.session_lock(event.session_id):
+        with metrics.span("event.session_lookup"):
+            status = await session_cache.get_status(db, event.session_id)
 
-    # 1. Save event
-    db_event = Event(
-        id=str(uuid4()),
-        session_id=event.session_id,
-        event_type=event.event_type.value,
-        severity=event.severity.value,
-        confidence=event.confidence,
-        timestamp=event.timestamp,
-    )
+        if status is None:
+            raise ValueError("Invalid session_id")
+
+        if status != "ACTIVE":
+            raise ValueError("Events are not allowed for this session state")
+
+        try:
+            # 0. Confirm ACTIVE under the row lock: another worker may have ended it
+            with metrics.span("event.session_lock"):
+                if not await _lock_active(db, {event.session_id}):
+                    raise ValueError("Events are not allowed for this session state")
+
+            # 1. Save (or coalesce) event and update running risk state
+            with metrics.span("event.store"):
+                (stored,), risk_result, previous_score = await _store_session_events(
+                    db, event.session_id, [event]
+                )
+
+            # 2. Persist latest risk score in the same transaction
+            changed = risk_result["risk_score"] != previous_score
+            with metrics.span("event.risk_upsert"):
+                await _save_risk(db, event.session_id, risk_result, changed)
+            with metrics.span("event.commit"):
+                await db.commit()
+        except Exception:
+            await db.rollback()
+            risk_state.discard(event.session_id)
+            raise
+
+    # 3. Push score changes to live subscribers
+    if changed:
+        with metrics.span("event.publish"):
+            await risk_hub.publish(risk_update(risk_result, datetime.utcnow()))
+
+    return stored, risk_result
+
+
+async def create_events_batch(db: AsyncSession, events: list[EventCreate]):
+    session_ids = {event.session_id for event in events}
+
+    async with risk_state.session_lock(*session_ids):
+        results, risk_results, changed = await _create_events_batch(db, events, session_ids)
+
+    # Push score changes to live subscribers
+    now = datetime.utcnow()
+    for session_id in changed:
+        await risk_hub.publish(risk_update(risk_results[session_id], now))
+
+    return results, risk_results
+
+
+async def _create_events_batch(db: AsyncSession, events: list[EventCreate], session_ids: set[str]):
+    # 1. Validate every referenced session, one lookup for cache misses
+    with metrics.span("event_batch.session_lookup"):
+        statuses = await session_cache.get_statuses(db, session_ids)
+
+    results = [None] * len(events)
+    accepted = defaultdict(list)
+
+    for index, event in enumerate(events):
+        status = statuses.get(event.session_id)
+
+        if status is None:
+            results[index] = {
+                "index": index,
+                "status": "rejected",
+                "detail": "Invalid session_id",
+            }
+        elif status != "ACTIVE":
+            results[index] = {
+                "index": index,
+                "status": "rejected",
+                "detail": "Events are not allowed for this session state",
+            }
+        else:
+            accepted[event.session_id].append(index)
+
+    risk_results = {}
+    changed = []
+    if not accepted:
+        return results, risk_results, changed
 
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    try:
+        # Confirm ACTIVE under the row locks: another worker may have ended them
+        with metrics.span("event_batch.session_lock"):
+            active = await _lock_active(db, set(accepted))
+        for session_id in set(accepted) - active:
+            for index in accepted.pop(session_id):
+                results[index] = {
+                    "index": index,
+                    "status": "rejected",
+                    "detail": "Events are not allowed for this session state",
+                }
+        if not accepted:
+            await db.rollback()
+            return results, risk_results, changed
 
-    # 2. Recalculate risk
-    risk_result = calculate_risk_for_session(db, event.session_id)
+        # 2. Insert/coalesce and one risk update + RiskScore row per session
+        for session_id, indexes in accepted.items():
+            with metrics.span("event_batch.store"):
+                stored, risk_result, previous_score = await _store_session_events(
+                    db, session_id, [events[index] for index in indexes]
+                )
+            for index, item in zip(indexes, stored):
+                results[index] = {
+                    "index": index,
+                    "status": (
+                        "duplicate" if item["duplicate"]
+                        else "coalesced" if item["coalesced"]
+                        else "accepted"
+                    ),
+                    "event_id": item["event_id"],
+                }
 
-    # 3. Persist latest risk score
-    save_risk_score(
+            with metrics.span("event_batch.risk_upsert"):
+                await _save_risk(db, session_id, risk_result, risk_result["risk_score"] != previous_score)
+            risk_results[session_id] = risk_result
+            if risk_result["risk_score"] != previous_score:
+                changed.append(session_id)
+
+        with metrics.span("event_batch.commit"):
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        # Accumulators may already include the rolled back events
+        for session_id in accepted:
+            risk_state.discard(session_id)
+        raise
+
+    return results, risk_results, changed
+
+
+async def _lock_active(db: AsyncSession, session_ids: set[str]) -> set[str]:
+    """
+    The sessions that are still ACTIVE, row-locked until commit.
+
+    The cached status can be stale when another worker ended a session.
+    `end_session` flips the status with an UPDATE, which holds the row
+    lock until its report is committed, so events either commit before
+    the end (and are in the frozen report) or see ENDED. The lock is
+    exclusive so that ingest on other workers also waits: each one then
+    checks its accumulator against the score written before it. Rows
+    are locked in id order to avoid deadlocks between batches. SQLite
+    has no row locks, but its single writer gives the same order.
+    """
+    active = set(await db.scalars(
+        select(InterviewSession.id)
+        .where(InterviewSession.id.in_(session_ids), InterviewSession.status == "ACTIVE")
+        .order_by(InterviewSession.id)
+        .with_for_update()
+    ))
+    for session_id in session_ids - active:
+        session_cache.invalidate(session_id)
+    return active
+
+
+async def _save_risk(db: AsyncSession, session_id: str, risk_result: dict, changed: bool):
+    """Upsert the session's score and note it as the accumulator's last write."""
+    now = datetime.utcnow()
+    await save_risk_score(
         db=db,
-        session_id=event.session_id,
+        session_id=session_id,
         score=risk_result["risk_score"],
         level=risk_result["risk_level"],
+        rule_version=risk_result["rule_version"],
+        changed=changed,
+        commit=False,
+        updated_at=now,
     )
+    risk_state.written(session_id, risk_result["risk_score"], risk_result["rule_version"], now)
+
+
+async def _store_session_events(
+    db: AsyncSession,
+    session_id: str,
+    events: list[EventCreate],
+):
+    """
+    Write one session's events and advance its risk accumulator.
+
+    A repeat of the same event type within EVENT_COALESCE_WINDOW_SEC of
+    the latest episode of that type extends the episode row (count and
+    ended_at) instead of inserting a new one. An event whose idempotency
+    key was already stored for the session is skipped and reported as a
+    duplicate of the row it went to. Must run under
+    `risk_state.session_lock`; the caller commits.
+
+    Returns per-event results, the new risk result and the score before
+    these events.
+    """
+    with metrics.span("event.accumulator_load"):
+        accumulator, stored_score = await risk_state.get_accumulator(db, session_id)
+    # After a rule change or another worker's write, report the jump from
+    # the score subscribers last saw
+    previous_score = accumulator.score if stored_score is None else stored_score
+    window = settings.EVENT_COALESCE_WINDOW_SEC
+
+    # Retried events: keys already stored map to their event row
+    keys = {event.idempotency_key for event in events if event.idempotency_key}
+    seen = {}
+    if keys:
+        with metrics.span("event.receipt_lookup"):
+            seen = dict((await db.execute(
+                select(EventReceipt.idempotency_key, EventReceipt.event_id).where(
+                    EventReceipt.session_id == session_id,
+                    EventReceipt.idempotency_key.in_(keys),
+                )
+            )).all())
+
+    stored = [None] * len(events)
+    new_rows = {}
+    extended = {}
+    receipts = []
+    needs_rebuild = False
+
+    order = sorted(range(len(events)), key=lambda index: to_naive_utc(events[index].timestamp))
+    for index in order:
+        event = events[index]
+        event_type = event.event_type.value
+        timestamp = to_naive_utc(event.timestamp)
+
+        key = event.idempotency_key
+        if key in seen:
+            stored[index] = {"event_id": seen[key], "coalesced": False, "duplicate": True}
+            continue
+
+        episode_id = None
+        if accumulator.last_timestamp is not None and timestamp < accumulator.last_timestamp:
+            # Out of order: store as its own row and rescan afterwards
+            needs_rebuild = True
+        else:
+            episode_id = accumulator.open_episode(event_type, timestamp, window)
+
+        if episode_id is not None:
+            accumulator.extend(event_type, timestamp)
+            if episode_id in new_rows:
+                new_rows[episode_id].count += 1
+                new_rows[episode_id].ended_at = timestamp
+            else:
+                increment, _ = extended.get(episode_id, (0, None))
+                extended[episode_id] = (increment + 1, timestamp)
+            stored[index] = {"event_id": episode_id, "coalesced": True, "duplicate": False}
+            if key:
+                seen[key] = episode_id
+                receipts.append({"session_id": session_id, "idempotency_key": key, "event_id": episode_id})
+            continue
+
+        db_event = Event(
+            id=str(uuid4()),
+            session_id=session_id,
+            event_type=event_type,
+            severity=event.severity.value,
+            confidence=event.confidence,
+            timestamp=timestamp,
+            ended_at=timestamp,
+            count=1,
+        )
+        db.add(db_event)
+        new_rows[db_event.id] = db_event
+        accumulator.apply(event_type, timestamp, event_id=db_event.id)
+        stored[index] = {"event_id": db_event.id, "coalesced": False, "duplicate": False}
+        if key:
+            seen[key] = db_event.id
+            receipts.append({"session_id": session_id, "idempotency_key": key, "event_id": db_event.id})
+
+    with metrics.span("event.write"):
+        for episode_id, (increment, ended_at) in extended.items():
+            await db.execute(
+                update(Event)
+                .where(Event.id == episode_id)
+                .values(count=Event.count + increment, ended_at=ended_at)
+            )
+        if receipts:
+            await db.execute(insert(EventReceipt), receipts)
+        await db.flush()
+
+    if needs_rebuild:
+        with metrics.span("event.out_of_order_rebuild"):
+            accumulator = await risk_state.rebuild(db, session_id)
 
-    return db_event, risk_result
+    return stored, accumulator.to_result(), previous_score
@@ -0,0 +1,116 @@
+"""
+Central face detection over frames streamed by the browser.
+
+Frames arrive as JPEG bytes, are decoded once into NumPy arrays in a
+thread pool and handed to `FaceWorkerPool` through shared memory. Events
+emitted by the detectors are persisted through the regular ingest path.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.ai.worker_pool import FaceWorkerPool
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.event import EventCreate
+from app.services.event_service import create_events_batch
+from app.utils.enums import EventType, SeverityLevel
+
+logger = logging.getLogger(__name__)
+
+
+class FrameIngestService:
+    def __init__(self, pool: FaceWorkerPool):
+        self.pool = pool
+        self.pool.on_events = self._on_events
+        self.pool.on_timings = metrics.observe_frame
+        self.max_width = pool.max_frame_shape[1]
+        self.max_height = pool.max_frame_shape[0]
+        self.invalid_frames = 0
+        self._loop = None
+
+    @classmethod
+    def from_settings(cls) -> "FrameIngestService":
+        return cls(FaceWorkerPool(
+            num_workers=settings.FRAME_WORKERS or None,
+            queue_size=settings.FRAME_QUEUE_SIZE,
+            drop_policy=settings.FRAME_DROP_POLICY,
+            max_frame_shape=(settings.FRAME_MAX_HEIGHT, settings.FRAME_MAX_WIDTH, 3),
+            missing_threshold_sec=settings.FACE_MISSING_THRESHOLD_SEC,
+            adaptive_sampling=settings.FRAME_ADAPTIVE_SAMPLING,
+        ))
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await run_in_threadpool(self.pool.start)
+
+    async def stop(self):
+        await run_in_threadpool(self.pool.stop)
+
+    async def submit(self, session_id: str, data: bytes) -> bool:
+        """Decode a JPEG frame and queue it; False when the pool dropped it."""
+        timestamp = time.time()
+        return await run_in_threadpool(self._decode_and_submit, session_id, data, timestamp)
+
+    def close_session(self, session_id: str):
+        self.pool.close_session(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "invalid_frames": self.invalid_frames,
+            "workers": self.pool.stats(),
+        }
+
+    def decode(self, data: bytes):
+        import cv2
+
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+
+        height, width = frame.shape[:2]
+        if width > self.max_width or height > self.max_height:
+            scale = min(self.max_width / width, self.max_height / height)
+            frame = cv2.resize(
+                frame,
+                (int(width * scale), int(height * scale)),
+                interpolation=cv2.INTER_AREA,
+            )
+        return frame
+
+    def _decode_and_submit(self, session_id: str, data: bytes, timestamp: float) -> bool:
+        started = time.perf_counter()
+        frame = self.decode(data)
+        metrics.observe_frame("decode", time.perf_counter() - started)
+        if frame is None:
+            self.invalid_frames += 1
+            raise ValueError("Invalid JPEG frame")
+        return self.pool.submit(session_id, frame, timestamp)
+
+    def _on_events(self, session_id: str, events: list[str], timestamp: float):
+        # Runs on the pool's collector thread
+        asyncio.run_coroutine_threadsafe(
+            self._persist(session_id, events, timestamp), self._loop
+        )
+
+    async def _persist(self, session_id: str, events: list[str], timestamp: float):
+        batch = [
+            EventCreate(
+                session_id=session_id,
+                event_type=EventType(event),
+                severity=SeverityLevel.HIGH,
+                confidence=0.9,
+                timestamp=datetime.fromtimestamp(timestamp, timezone.utc),
+            )
+            for event in events
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                await create_events_batch(db, batch)
+        except Exception:
+            logger.exception("Failed to persist face events for session %s", session_id)
@@ -0,0 +1,109 @@
+"""
+Monthly range partitions of `events` and `risk_scores` on Postgres.
+
+Rows are routed by ``created_at`` into ``{table}_pYYYYMM`` partitions
+(migration 6d8b2f4a9c13). New rows always land in the current month, so
+upcoming months must exist before they start, or rows fall into the
+``{table}_default`` partition. Postgres refuses to create a month's
+partition while the default one holds rows of that month, so those rows
+are moved into the new partition first (the default partition is
+detached meanwhile, which briefly locks the table). A month that still
+fails is logged and retried on the next run. Once archival has emptied
+an old month, its partition is dropped, so the hot tables only span
+recent months. Both functions do nothing on other databases.
+"""
+import logging
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("events", "risk_scores")
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int = 2) -> list[str]:
+    """Create the partitions of this month and the next ``months_ahead``; caller commits."""
+    if db.bind.dialect.name != "postgresql":
+        return []
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = await _partitions(db, table)
+        for start, end in _months(date.today().replace(day=1), months_ahead + 1):
+            name = f"{table}_p{start:%Y%m}"
+            if name in existing:
+                continue
+            try:
+                # Own savepoint: a failed month leaves the others in place
+                async with db.begin_nested():
+                    await _create_partition(db, table, name, start, end)
+            except Exception:
+                logger.exception("Creating partition %s failed, retrying on the next run", name)
+                continue
+            created.append(name)
+    return created
+
+
+async def _create_partition(db: AsyncSession, table: str, name: str, start: date, end: date):
+    default = f"{table}_default"
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_range = f"created_at >= '{start}' AND created_at < '{end}'"
+
+    if not await db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")):
+        await db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+        return
+
+    # Rows of this month already fell into the default partition: move them
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+    moved = await db.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"))
+    await db.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.info("Moved %d rows from %s into %s", moved.rowcount, default, name)
+
+
+async def drop_empty_partitions(db: AsyncSession, before: datetime) -> list[str]:
+    """Drop monthly partitions that end before ``before`` and hold no rows; caller commits."""
+    if db.bind.dialect.name != "postgresql":
+        return []
+
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name, (start, end) in sorted((await _partitions(db, table)).items()):
+            if datetime(end.year, end.month, 1) > before:
+                continue
+            if await db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name})")):
+                continue
+            await db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+async def _partitions(db: AsyncSession, table: str) -> dict[str, tuple[date, date]]:
+    """Monthly partitions of ``table`` with their ``[start, end)`` range."""
+    rows = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    prefix = f"{table}_p"
+    partitions = {}
+    for (name,) in rows:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            start = date(int(suffix[:4]), int(suffix[4:]), 1)
+            partitions[name] = next(_months(start, 1))
+    return partitions
+
+
+def _months(first: date, count: int):
+    index = first.year * 12 + first.month - 1
+    for _ in range(count):
+        start = date(index // 12, index % 12 + 1, 1)
+        index += 1
+        yield start, date(index // 12, index % 12 + 1, 1)
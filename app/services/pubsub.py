@@ -0,0 +1,153 @@
+"""
+Pub/sub used to push live updates and invalidations between workers.
+
+`Broker` is the cross-process transport. Every API worker publishes
+through it and receives every message back. This is how an update
+produced on one worker reaches a subscriber or cache on another.
+`InMemoryBroker` loops messages straight back and is enough for a single
+process and for tests. `RedisBroker` uses Redis pub/sub for multi-worker
+deployments (requires the optional ``redis`` package). When its
+connection drops it resubscribes with exponential backoff. Messages
+published in the meantime are lost, so receivers must tolerate gaps: the
+caches fall back on their TTLs and version checks.
+
+Components register per-channel handlers with `subscribe`, and the
+module-level `publish`, `start` and `stop` drive the configured broker.
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, dict], Awaitable[None]]
+
+RECONNECT_MIN_SEC = 0.5
+RECONNECT_MAX_SEC = 30.0
+
+
+class Broker(ABC):
+    @abstractmethod
+    async def start(self, handler: Handler):
+        """Begin delivering every published message to ``handler(channel, message)``."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict):
+        ...
+
+    async def stop(self):
+        pass
+
+
+class InMemoryBroker(Broker):
+    def __init__(self):
+        self._handler = None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    async def publish(self, channel: str, message: dict):
+        if self._handler is not None:
+            await self._handler(channel, message)
+
+
+class RedisBroker(Broker):
+    def __init__(self, url: str, prefix: str = "interview:", client=None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self._redis = client
+        self._prefix = prefix
+        self._task = None
+
+    async def start(self, handler: Handler):
+        # The first subscription fails loudly: a worker without its broker
+        # should not start
+        pubsub = await self._subscribe()
+        self._task = asyncio.create_task(self._listen(pubsub, handler))
+
+    async def publish(self, channel: str, message: dict):
+        await self._redis.publish(self._prefix + channel, json.dumps(message))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        await self._redis.aclose()
+
+    async def _subscribe(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(f"{self._prefix}*")
+        return pubsub
+
+    async def _listen(self, pubsub, handler: Handler):
+        delay = RECONNECT_MIN_SEC
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._subscribe()
+                    logger.info("Broker subscription restored")
+                    delay = RECONNECT_MIN_SEC
+                async for item in pubsub.listen():
+                    if item["type"] != "pmessage":
+                        continue
+                    channel = item["channel"].decode()[len(self._prefix):]
+                    try:
+                        await handler(channel, json.loads(item["data"]))
+                    except Exception:
+                        logger.exception("Broker handler failed for %s", channel)
+                logger.warning("Broker subscription ended, resubscribing in %.1fs", delay)
+            except Exception:
+                logger.warning("Broker connection lost, resubscribing in %.1fs", delay, exc_info=True)
+
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+                pubsub = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SEC)
+
+
+def create_broker(url: str | None) -> Broker:
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    return InMemoryBroker()
+
+
+_broker: Broker = InMemoryBroker()
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+
+
+def subscribe(channel: str, handler: Handler):
+    _handlers[channel].append(handler)
+
+
+async def publish(channel: str, message: dict):
+    """Best effort: a broker failure must not fail the calling request."""
+    try:
+        await _broker.publish(channel, message)
+    except Exception:
+        logger.exception("Failed to publish to %s", channel)
+
+
+async def start(broker: Broker):
+    global _broker
+    _broker = broker
+    await _broker.start(_dispatch)
+
+
+async def stop():
+    await _broker.stop()
+
+
+async def _dispatch(channel: str, message: dict):
+    for handler in _handlers.get(channel, ()):
+        try:
+            await handler(channel, message)
+        except Exception:
+            logger.exception("Handler failed for %s", channel)
@@ -0,0 +1,114 @@
+"""
+Chunked, resumable screen-recording uploads.
+
+The browser appends chunks to an appendable blob while the interview
+runs. Every chunk names the offset it starts at. A client that lost a
+response asks for the current offset and resumes from there instead of
+from zero. Completing the upload finalizes the blob into
+``screen_recordings/{session_id}.webm``. On local disk that is a rename,
+and on S3 a server-side multipart copy, so the recording is not copied
+through the API.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO
+
+from app.core.config import settings
+from app.services.blob_storage import BlobStorage, iter_file, storage
+
+RECORDING_PREFIX = "screen_recordings"
+
+
+class UploadOffsetMismatch(ValueError):
+    def __init__(self, offset: int):
+        super().__init__("Upload offset mismatch")
+        self.offset = offset
+
+
+class ChunkTooLarge(ValueError):
+    pass
+
+
+class RecordingUploads:
+    def __init__(self, storage: BlobStorage, max_chunk_bytes: int):
+        self.storage = storage
+        self.max_chunk_bytes = max_chunk_bytes
+        # session_id -> [lock, number of holders and waiters]
+        self._locks: dict[str, list] = {}
+
+    @classmethod
+    def from_settings(cls) -> "RecordingUploads":
+        return cls(storage, settings.RECORDING_CHUNK_MAX_BYTES)
+
+    def part_key(self, session_id: str) -> str:
+        return f"{RECORDING_PREFIX}/{session_id}.part"
+
+    def final_key(self, session_id: str) -> str:
+        return f"{RECORDING_PREFIX}/{session_id}.webm"
+
+    async def status(self, session_id: str) -> dict:
+        size = await self.storage.size(self.final_key(session_id))
+        if size is not None:
+            return {"offset": size, "complete": True}
+        offset = await self.storage.appended_size(self.part_key(session_id))
+        return {"offset": offset, "complete": False}
+
+    async def append(self, session_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append a request body at ``offset``; returns the new offset."""
+        async with self._session_lock(session_id):
+            status = await self.status(session_id)
+            if status["complete"]:
+                raise ValueError("Upload already completed")
+            if offset != status["offset"]:
+                raise UploadOffsetMismatch(status["offset"])
+
+            return await self.storage.append(
+                self.part_key(session_id), offset, self._limit(chunks)
+            )
+
+    async def complete(self, session_id: str, size: int | None = None) -> dict:
+        """Promote the appended chunks to the final recording."""
+        async with self._session_lock(session_id):
+            status = await self.status(session_id)
+            if status["complete"]:
+                return self._result(session_id, status["offset"])
+            if status["offset"] == 0:
+                raise ValueError("Nothing has been uploaded")
+            if size is not None and size != status["offset"]:
+                raise UploadOffsetMismatch(status["offset"])
+
+            size = await self.storage.finalize(self.part_key(session_id), self.final_key(session_id))
+            return self._result(session_id, size)
+
+    async def save(self, session_id: str, source: BinaryIO) -> dict:
+        """Single-request upload of a whole recording."""
+        async with self._session_lock(session_id):
+            size = await self.storage.put(self.final_key(session_id), iter_file(source))
+            return self._result(session_id, size)
+
+    async def _limit(self, chunks: AsyncIterator[bytes]):
+        received = 0
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > self.max_chunk_bytes:
+                raise ChunkTooLarge(f"Chunk exceeds {self.max_chunk_bytes} bytes")
+            yield chunk
+
+    def _result(self, session_id: str, size: int) -> dict:
+        key = self.final_key(session_id)
+        return {"key": key, "path": self.storage.location(key), "size": size}
+
+    @asynccontextmanager
+    async def _session_lock(self, session_id: str):
+        entry = self._locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+
+recording_uploads = RecordingUploads.from_settings()
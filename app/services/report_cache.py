@@ -0,0 +1,110 @@
+"""
+Reports for ENDED sessions, computed once and served from cache.
+
+Events are rejected once a session leaves ACTIVE, so an ENDED session's
+report never changes. It is written to `session_reports` when the
+session ends (or on first read for sessions ended before this table
+existed) and served through an in-process LRU in front of that table.
+Once a session is archived its reports are read from the archive file.
+Sessions that are not ENDED are always computed live.
+
+`app.jobs.rescore` deletes the stored reports it outdates and names
+those sessions on the pub/sub ``report_cache`` channel, so every worker
+drops them from its LRU. Cached reports built with other rules than the
+ones in force are also treated as misses, which covers deployments
+without a cross-process broker.
+"""
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.session_report import SessionReport
+from app.services.final_report_builder import build_final_report
+from app.services import pubsub, risk_rules, session_archive
+from app.services.risk_engine import calculate_risk_for_session
+from app.services.session_cache import get_status
+
+REPORT_CHANNEL = "report_cache"
+
+# session_id -> (raw_report, final_report, rule version or None if archived)
+_lru: "OrderedDict[str, tuple[dict, dict, str | None]]" = OrderedDict()
+
+
+async def get_reports(db: AsyncSession, session_id: str) -> tuple[dict, dict]:
+    """Return ``(raw_report, final_report)`` for a session."""
+    cached = _lru_get(session_id)
+    if cached is not None:
+        return cached
+
+    stored = await db.get(SessionReport, session_id)
+    if stored is not None:
+        return _lru_put(session_id, stored.raw_report, stored.final_report)
+
+    status = await get_status(db, session_id)
+    if status == "ENDED":
+        archived = await session_archive.load_reports(db, session_id)
+        if archived is not None:
+            return _lru_put(session_id, *archived, archived=True)
+
+    with metrics.span("report.risk_rescan"):
+        raw_report = await calculate_risk_for_session(db, session_id)
+    with metrics.span("report.final_build"):
+        final_report = build_final_report(raw_report)
+
+    if status == "ENDED":
+        await db.merge(SessionReport(
+            session_id=session_id,
+            raw_report=raw_report,
+            final_report=final_report,
+        ))
+        await db.commit()
+        _lru_put(session_id, raw_report, final_report)
+
+    return raw_report, final_report
+
+
+async def store_reports(db: AsyncSession, session_id: str, raw_report: dict):
+    """Stage the frozen reports of a session that is being ended; caller commits."""
+    with metrics.span("report.final_build"):
+        final_report = build_final_report(raw_report)
+    await db.merge(SessionReport(
+        session_id=session_id,
+        raw_report=raw_report,
+        final_report=final_report,
+    ))
+    _lru.pop(session_id, None)
+
+
+def invalidate(session_id: str):
+    _lru.pop(session_id, None)
+
+
+def _lru_get(session_id: str):
+    cached = _lru.get(session_id)
+    if cached is None:
+        return None
+    raw_report, final_report, rule_version = cached
+    if rule_version is not None and rule_version != risk_rules.current().version:
+        del _lru[session_id]
+        return None
+    _lru.move_to_end(session_id)
+    return raw_report, final_report
+
+
+def _lru_put(session_id: str, raw_report: dict, final_report: dict, archived: bool = False):
+    # Archived reports cannot be rebuilt, whatever rules are in force
+    rule_version = None if archived else raw_report.get("rule_version")
+    _lru[session_id] = (raw_report, final_report, rule_version)
+    _lru.move_to_end(session_id)
+    while len(_lru) > settings.REPORT_CACHE_SIZE:
+        _lru.popitem(last=False)
+    return raw_report, final_report
+
+
+async def _on_message(channel: str, message: dict):
+    for session_id in message.get("session_ids", ()):
+        _lru.pop(session_id, None)
+
+
+pubsub.subscribe(REPORT_CHANNEL, _on_message)
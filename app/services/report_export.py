@@ -0,0 +1,240 @@
+"""
+Bulk export of session reports.
+
+Instead of rebuilding an accumulator per session, one SQL statement
+scores every selected session. Window functions keep a running
+``sum(count)`` per session and event type, from which each episode row's
+capped hits follow (``min(running, cap) - min(running - count, cap)``).
+The caps and scores of the rules in force become ``CASE`` expressions. Only
+rows that add hits, plus the first row of each type for its total,
+leave the database. Rows arrive ordered by session and are streamed, so
+memory stays bounded by one session's report however many are exported.
+
+As in `report_cache.get_reports`, an ENDED session's stored report wins
+over scoring its events, so the export and ``/final`` agree after a rule
+reload without a rescore. Those sessions, and archived ones, come back
+as a single row without events; archived reports are read from the
+archive file.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.event import Event
+from app.models.session import InterviewSession
+from app.models.session_archive import SessionArchive
+from app.models.session_report import SessionReport
+from app.services.final_report_builder import build_final_report
+from app.services import risk_rules, session_archive
+from app.services.risk_engine import build_risk_result
+from app.services.risk_rules import CompiledRules
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+CSV_COLUMNS = [
+    "session_id",
+    "status",
+    "risk_score",
+    "risk_level",
+    "movement_percentage",
+    "face_missing",
+    "tab_switch",
+    "window_blur",
+    "multiple_faces_detected",
+]
+
+
+def export_statement(
+    rules: CompiledRules,
+    session_ids: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    sessions = (
+        select(
+            InterviewSession.id,
+            InterviewSession.status,
+            SessionArchive.path,
+            SessionArchive.compression,
+            SessionReport.raw_report,
+            SessionReport.final_report,
+            SessionReport.session_id.label("stored"),
+        )
+        .outerjoin(SessionArchive, SessionArchive.session_id == InterviewSession.id)
+        .outerjoin(SessionReport, SessionReport.session_id == InterviewSession.id)
+    )
+    if session_ids:
+        sessions = sessions.where(InterviewSession.id.in_(session_ids))
+    if created_from is not None:
+        sessions = sessions.where(InterviewSession.created_at >= created_from)
+    if created_to is not None:
+        sessions = sessions.where(InterviewSession.created_at < created_to)
+    sessions = sessions.subquery("s")
+
+    count = func.coalesce(Event.count, 1)
+    partition = (Event.session_id, Event.event_type)
+    order = (Event.timestamp, Event.id)
+    windowed = (
+        select(
+            Event.session_id,
+            Event.event_type,
+            Event.timestamp,
+            count.label("count"),
+            func.sum(count).over(partition_by=partition, order_by=order, rows=(None, 0)).label("running"),
+            func.sum(count).over(partition_by=partition).label("total"),
+            func.row_number().over(partition_by=partition, order_by=order).label("position"),
+        )
+        .where(Event.session_id.in_(select(sessions.c.id).where(sessions.c.stored.is_(None))))
+        .subquery("e")
+    )
+
+    cap = case(
+        {event_type: cap for event_type, (_, cap) in rules.lookup.items()},
+        value=windowed.c.event_type,
+        else_=0,
+    )
+    score = case(
+        {event_type: score for event_type, (score, _) in rules.lookup.items()},
+        value=windowed.c.event_type,
+        else_=0,
+    )
+    before = windowed.c.running - windowed.c.count
+    hits = case(
+        (before >= cap, 0),
+        (windowed.c.running <= cap, windowed.c.count),
+        else_=cap - before,
+    )
+
+    return (
+        select(
+            sessions.c.id,
+            sessions.c.status,
+            sessions.c.path,
+            sessions.c.compression,
+            sessions.c.raw_report,
+            sessions.c.final_report,
+            windowed.c.event_type,
+            windowed.c.timestamp,
+            windowed.c.total,
+            hits.label("hits"),
+            score.label("score"),
+        )
+        .select_from(
+            sessions.outerjoin(
+                windowed,
+                and_(
+                    windowed.c.session_id == sessions.c.id,
+                    or_(windowed.c.position == 1, before < cap),
+                ),
+            )
+        )
+        .order_by(sessions.c.id, windowed.c.timestamp, windowed.c.event_type)
+    )
+
+
+async def export_reports(
+    db: AsyncSession,
+    session_ids: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> AsyncIterator[tuple[str, dict, dict]]:
+    """Yield ``(status, raw_report, final_report)`` per session."""
+    # One rule set for the whole export, even if rules reload meanwhile
+    rules = risk_rules.current()
+    result = await db.stream(
+        export_statement(rules, session_ids, created_from, created_to)
+        .execution_options(yield_per=1000)
+    )
+
+    current = None
+    async for (
+        session_id, status, path, compression, stored_raw, stored_final,
+        event_type, timestamp, total, hits, score,
+    ) in result:
+        if current is None or current[0] != session_id:
+            if current is not None:
+                yield await _reports(rules, *current)
+            stored = (stored_raw, stored_final) if stored_raw is not None else None
+            current = (session_id, status, path, compression, stored, {}, [])
+
+        if event_type is None:
+            continue
+
+        *_, event_counts, reasons = current
+        event_counts[event_type] = total
+        reasons.extend(
+            {
+                "event_type": event_type,
+                "timestamp": timestamp.isoformat(),
+                "score_added": score,
+            }
+            for _ in range(hits)
+        )
+
+    if current is not None:
+        yield await _reports(rules, *current)
+
+
+async def to_ndjson(reports: AsyncIterator[tuple[str, dict, dict]]):
+    async for status, raw_report, final_report in reports:
+        line = {
+            "session_id": raw_report["session_id"],
+            "status": status,
+            "raw_report": raw_report,
+            "final_report": final_report,
+        }
+        yield json.dumps(line) + "\n"
+
+
+async def to_csv(reports: AsyncIterator[tuple[str, dict, dict]]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_COLUMNS)
+    yield _drain(buffer)
+    async for status, _, final_report in reports:
+        summary = final_report["summary"]
+        counts = final_report["behavior_counts"]
+        writer.writerow([
+            final_report["session_id"],
+            status,
+            summary["risk_score"],
+            summary["risk_level"],
+            summary["movement_percentage"],
+            counts["face_missing"],
+            counts["tab_switch"],
+            counts["window_blur"],
+            counts["multiple_faces_detected"],
+        ])
+        yield _drain(buffer)
+
+
+async def _reports(
+    rules: CompiledRules,
+    session_id: str,
+    status: str,
+    path: str | None,
+    compression: str | None,
+    stored: tuple[dict, dict] | None,
+    event_counts: dict,
+    reasons: list,
+):
+    if stored is not None:
+        return status, *stored
+    if path is not None:
+        raw_report, final_report = await session_archive.read_reports(path, compression)
+        return status, raw_report, final_report
+    score = sum(reason["score_added"] for reason in reasons)
+    raw_report = build_risk_result(session_id, score, event_counts, reasons, rules)
+    return status, raw_report, build_final_report(raw_report)
+
+
+def _drain(buffer: io.StringIO) -> str:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
@@ -1,67 +1,156 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from collections import defaultdict
+from datetime import datetime, timezone
 from app.models.event import Event
-from app.services.risk_config import RISK_RULES, RISK_THRESHOLDS
+from app.services import risk_rules
+from app.services.risk_rules import CompiledRules
 from app.utils.enums import EventType
-from collections import defaultdict
-
-
-
-def calculate_risk_for_session(db: Session, session_id: str) -> dict:
-    event_counts = defaultdict(int)
-    events = (
-        db.query(Event)
-        .filter(Event.session_id == session_id)
-        .order_by(Event.timestamp.asc())
-        .all()
-    )
 
-    score = 0
-    reasons = []
-    hit_counter = defaultdict(int)
 
-    for event in events:
-        event_type = EventType(event.event_type)
+class RiskAccumulator:
+    """
+    Running risk state for one session, updated one event at a time.
+
+    An event row may be an episode of ``count`` coalesced repeats; it
+    counts and scores like ``count`` separate events stamped with the
+    episode start time. Event types are the plain strings stored in the
+    events table, scored against the rules in force when it was built.
+    """
+
+    def __init__(self, session_id: str, rules: CompiledRules | None = None):
+        self.session_id = session_id
+        self.rules = rules or risk_rules.current()
+        self.score = 0
+        self.reasons = []
+        self.hit_counter = defaultdict(int)
+        self.event_counts = defaultdict(int)
+        self.last_timestamp = None
+        # event_type -> (event_id, started_at, last_seen) of the latest row
+        self.episodes = {}
+
+    def apply(
+        self,
+        event_type: str,
+        timestamp: datetime,
+        count: int = 1,
+        event_id: str | None = None,
+        last_seen: datetime | None = None,
+    ):
+        timestamp = to_naive_utc(timestamp)
+        last_seen = to_naive_utc(last_seen) if last_seen else timestamp
+        self._seen(last_seen)
+
+        if event_id is not None:
+            self.episodes[event_type] = (event_id, timestamp, last_seen)
 
         # ✅ Count every event
-        event_counts[event_type] += 1
+        self.event_counts[event_type] += count
+        self._add_hits(event_type, timestamp, count)
+
+    def open_episode(self, event_type: str, timestamp: datetime, window_sec: float):
+        """Id of the episode a repeat at ``timestamp`` would extend, if any."""
+        episode = self.episodes.get(event_type)
+        if episode is None or window_sec <= 0:
+            return None
+
+        gap = (to_naive_utc(timestamp) - episode[2]).total_seconds()
+        return episode[0] if 0 <= gap <= window_sec else None
+
+    def extend(self, event_type: str, timestamp: datetime):
+        """Fold a repeat into the latest episode of its type."""
+        event_id, started_at, _ = self.episodes[event_type]
+        timestamp = to_naive_utc(timestamp)
+        self._seen(timestamp)
+
+        self.episodes[event_type] = (event_id, started_at, timestamp)
+        self.event_counts[event_type] += 1
+        self._add_hits(event_type, started_at, 1)
+
+    def _seen(self, timestamp: datetime):
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+    def _add_hits(self, event_type: str, timestamp: datetime, count: int):
+        rule = self.rules.lookup.get(event_type)
+        if rule is None:
+            return
+
+        score, cap = rule
+        hits = min(count, cap - self.hit_counter[event_type])
+        for _ in range(hits):
+            self.score += score
+            self.hit_counter[event_type] += 1
+
+            self.reasons.append({
+                "event_type": event_type,
+                "timestamp": timestamp.isoformat(),
+                "score_added": score,
+            })
+
+    def to_result(self) -> dict:
+        return build_risk_result(
+            self.session_id, self.score, self.event_counts, self.reasons, self.rules
+        )
+
+
+def build_risk_result(
+    session_id: str,
+    score: int,
+    event_counts: dict,
+    reasons: list,
+    rules: CompiledRules,
+) -> dict:
+    """Raw risk report shape shared by live scoring and bulk export."""
+    return {
+        "session_id": session_id,
+        "risk_score": score,
+        "risk_level": rules.level(score),
+        "rule_version": rules.version,
+        "event_counts": {
+            "tab_switch_count": event_counts.get(EventType.TAB_SWITCH.value, 0),
+            "window_blur_count": event_counts.get(EventType.WINDOW_BLUR.value, 0),
+            "face_missing_count": event_counts.get(EventType.FACE_MISSING.value, 0),
+        },
+        # Hits added to an open episode are stamped with its start time
+        "reasons": sorted(
+            reasons,
+            key=lambda reason: (reason["timestamp"], reason["event_type"]),
+        ),
+    }
 
-        if event_type not in RISK_RULES:
-            continue
 
-        rule = RISK_RULES[event_type]
+def to_naive_utc(timestamp: datetime) -> datetime:
+    # DB columns are naive UTC; normalise aware client timestamps to match
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
 
-        if hit_counter[event_type] >= rule["max_hits"]:
-            continue
 
-        score += rule["score"]
-        hit_counter[event_type] += 1
+async def build_accumulator(db: AsyncSession, session_id: str) -> RiskAccumulator:
+    accumulator = RiskAccumulator(session_id)
+    rows = await db.execute(
+        select(Event.id, Event.event_type, Event.timestamp, Event.ended_at, Event.count)
+        .where(Event.session_id == session_id)
+        .order_by(Event.timestamp.asc())
+    )
 
-        reasons.append({
-            "event_type": event_type.value,
-            "timestamp": event.timestamp.isoformat(),
-            "score_added": rule["score"],
-        })
+    for event_id, event_type, timestamp, ended_at, count in rows:
+        accumulator.apply(
+            event_type,
+            timestamp,
+            count=count or 1,
+            event_id=event_id,
+            last_seen=ended_at,
+        )
 
+    return accumulator
 
-    risk_level = determine_risk_level(score)
 
-    return {
-        "session_id": session_id,
-        "risk_score": score,
-        "risk_level": risk_level,
-        "event_counts": {
-            "tab_switch_count": event_counts.get(EventType.TAB_SWITCH, 0),
-            "window_blur_count": event_counts.get(EventType.WINDOW_BLUR, 0),
-            "face_missing_count": event_counts.get(EventType.FACE_MISSING, 0),
-        },
-        "reasons": reasons,
-    }
+async def calculate_risk_for_session(db: AsyncSession, session_id: str) -> dict:
+    accumulator = await build_accumulator(db, session_id)
+    return accumulator.to_result()
 
 
 def determine_risk_level(score: int) -> str:
-    if score >= RISK_THRESHOLDS["HIGH_RISK"]:
-        return "HIGH_RISK"
-    elif score >= RISK_THRESHOLDS["SUSPICIOUS"]:
-        return "SUSPICIOUS"
-    return "NORMAL"
+    return risk_rules.current().level(score)
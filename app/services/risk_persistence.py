@@ -1,21 +1,56 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from datetime import datetime
 from uuid import uuid4
+from app.core.config import settings
 from app.models.risk_score import RiskScore
+from app.models.session_risk import SessionRisk
 
 
-def save_risk_score(
-    db: Session,
+async def save_risk_score(
+    db: AsyncSession,
     session_id: str,
     score: int,
-    level: str
+    level: str,
+    rule_version: str | None = None,
+    changed: bool = True,
+    commit: bool = True,
+    updated_at: datetime | None = None,
 ):
-    risk = RiskScore(
-        id=str(uuid4()),
-        session_id=session_id,
-        score=score,
-        level=level,
+    now = updated_at or datetime.utcnow()
+
+    # 1. Current score: one row per session, updated in place
+    values = {"score": score, "level": level, "rule_version": rule_version, "updated_at": now}
+    stmt = dialect_insert(db)(SessionRisk).values(session_id=session_id, **values)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SessionRisk.session_id],
+            set_=values,
+        )
     )
 
-    db.add(risk)
-    db.commit()
+    # 2. History only records score (and therefore level) changes
+    risk = None
+    if changed and settings.RISK_HISTORY_ENABLED:
+        risk = RiskScore(
+            id=str(uuid4()),
+            session_id=session_id,
+            score=score,
+            level=level,
+            rule_version=rule_version,
+            created_at=now,
+        )
+        db.add(risk)
+
+    if commit:
+        await db.commit()
     return risk
+
+
+def dialect_insert(db: AsyncSession | Session):
+    """Insert construct of the session's dialect, for ON CONFLICT upserts."""
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
@@ -0,0 +1,147 @@
+"""
+Risk rules compiled for the per-event scoring loop.
+
+The built-in rules of `risk_config` can be replaced by a JSON file at
+RISK_RULES_PATH::
+
+    {"rules": {"TAB_SWITCH": {"score": 10, "max_hits": 5}, ...},
+     "thresholds": {"NORMAL": 0, "SUSPICIOUS": 40, "HIGH_RISK": 70}}
+
+A rule set is compiled once into a flat ``event type -> (score, cap)``
+lookup keyed by the plain strings stored in the events table, and its
+thresholds into a sorted table searched with `bisect`. The version is a
+hash of the compiled content, so every worker derives the same version
+from the same rules, and stored scores record the version they were
+computed with.
+
+The file is checked at most every RISK_RULES_RELOAD_SEC and recompiled
+when it changed. `reload` recompiles at once and tells the other workers
+on the pub/sub ``rules`` channel. A file that fails to compile on a
+background check is logged and the previous rules stay in force.
+"""
+import bisect
+import hashlib
+import json
+import logging
+import os
+import time
+
+from app.core.config import settings
+from app.services import pubsub
+from app.services.risk_config import RISK_RULES, RISK_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+RULES_CHANNEL = "rules"
+
+
+class CompiledRules:
+    def __init__(self, rules: dict, thresholds: dict):
+        self.lookup: dict[str, tuple[int, int]] = {}
+        for event_type, rule in rules.items():
+            event_type = getattr(event_type, "value", event_type)
+            self.lookup[event_type] = (
+                _count(rule, "score", event_type),
+                _count(rule, "max_hits", event_type),
+            )
+
+        if not thresholds:
+            raise ValueError("At least one risk threshold is required")
+        ordered = sorted((_count(thresholds, name, "thresholds"), name) for name in thresholds)
+        self.level_bounds = [bound for bound, _ in ordered]
+        self.level_names = [name for _, name in ordered]
+
+        content = json.dumps(self.to_dict(), sort_keys=True)
+        self.version = hashlib.sha256(content.encode()).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompiledRules":
+        with open(path) as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("Rules file must contain a JSON object")
+        return cls(config.get("rules", RISK_RULES), config.get("thresholds", RISK_THRESHOLDS))
+
+    def level(self, score: int) -> str:
+        index = bisect.bisect_right(self.level_bounds, score) - 1
+        return self.level_names[max(index, 0)]
+
+    def to_dict(self) -> dict:
+        return {
+            "rules": {
+                event_type: {"score": score, "max_hits": cap}
+                for event_type, (score, cap) in self.lookup.items()
+            },
+            "thresholds": dict(zip(self.level_names, self.level_bounds)),
+        }
+
+
+def current() -> CompiledRules:
+    """Rules in force, picking up a changed rules file."""
+    global _checked_at
+    if settings.RISK_RULES_PATH and time.monotonic() - _checked_at >= settings.RISK_RULES_RELOAD_SEC:
+        _checked_at = time.monotonic()
+        if _file_stamp() != _stamp:
+            try:
+                load()
+            except (OSError, ValueError):
+                logger.exception("Keeping risk rules %s; reload failed", _rules.version)
+    return _rules
+
+
+def load() -> CompiledRules:
+    """Compile the configured rules; raises and keeps the old ones on error."""
+    global _rules, _stamp
+    stamp = _file_stamp()
+    # Remember a broken file too, so it is not retried until it changes
+    _stamp = stamp
+    if settings.RISK_RULES_PATH:
+        rules = CompiledRules.from_file(settings.RISK_RULES_PATH)
+    else:
+        rules = CompiledRules(RISK_RULES, RISK_THRESHOLDS)
+
+    if rules.version != _rules.version:
+        logger.info("Risk rules %s loaded", rules.version)
+        _rules = rules
+    return _rules
+
+
+async def reload() -> CompiledRules:
+    """Reload the rules here and on every other worker."""
+    rules = load()
+    await pubsub.publish(RULES_CHANNEL, {"version": rules.version})
+    return rules
+
+
+def _file_stamp():
+    if not settings.RISK_RULES_PATH:
+        return None
+    try:
+        stat = os.stat(settings.RISK_RULES_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _count(values: dict, key: str, name: str) -> int:
+    value = values.get(key) if isinstance(values, dict) else None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"{name}: {key} must be a non-negative integer")
+    return value
+
+
+async def _on_message(channel: str, message: dict):
+    if message.get("version") != _rules.version:
+        try:
+            load()
+        except (OSError, ValueError):
+            logger.exception("Risk rules reload requested by another worker failed")
+
+
+_rules = CompiledRules(RISK_RULES, RISK_THRESHOLDS)
+_stamp = None
+_checked_at = time.monotonic()
+if settings.RISK_RULES_PATH:
+    load()
+
+pubsub.subscribe(RULES_CHANNEL, _on_message)
@@ -0,0 +1,105 @@
+"""
+In-process registry of running risk accumulators, one per ACTIVE session.
+
+Each ingested event is folded into its session's accumulator in O(1)
+instead of rescanning the full event history. A missing accumulator
+(first event after a restart) is rebuilt once from the events table.
+Accumulators are process-local. With several API workers each one keeps
+its own copy, so before use an accumulator is checked against the stored
+``session_risk`` row: if its score, rule version or write time is not
+what this worker last wrote, another writer got there first and the
+accumulator is rebuilt. Ingest holds the session row lock across the
+check and its own write, so the check cannot race another worker.
+An accumulator built with an older rule set is rebuilt on next use.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session_risk import SessionRisk
+from app.services import risk_rules
+from app.services.risk_engine import RiskAccumulator, build_accumulator
+
+_accumulators: dict[str, RiskAccumulator] = {}
+# session_id -> (score, rule_version, updated_at) this worker last wrote
+_written: dict[str, tuple] = {}
+# session_id -> [lock, number of holders and waiters]
+_locks: dict[str, list] = {}
+
+
+@asynccontextmanager
+async def session_lock(*session_ids: str):
+    """
+    Serialise ingest and lifecycle changes for the given sessions.
+
+    Callers hold it from reading the accumulator until commit, so events
+    are coalesced and applied against a consistent state. Locks are taken
+    in sorted order to avoid deadlocks between batches, and dropped once
+    unused for sessions without an accumulator.
+    """
+    entries = []
+    for session_id in sorted(set(session_ids)):
+        entry = _locks.get(session_id)
+        if entry is None:
+            entry = _locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        entries.append((session_id, entry))
+
+    acquired = []
+    try:
+        for _, entry in entries:
+            await entry[0].acquire()
+            acquired.append(entry[0])
+        yield
+    finally:
+        for lock in reversed(acquired):
+            lock.release()
+        for session_id, entry in entries:
+            entry[1] -= 1
+            if entry[1] == 0 and session_id not in _accumulators:
+                del _locks[session_id]
+
+
+async def get_accumulator(db: AsyncSession, session_id: str) -> tuple[RiskAccumulator, int | None]:
+    """
+    The session's up-to-date accumulator and its stored score, if any.
+
+    Call with the session row locked (see ``event_service._lock_active``).
+    """
+    stored = await _stored(db, session_id)
+    accumulator = _accumulators.get(session_id)
+    if (
+        accumulator is None
+        or accumulator.rules.version != risk_rules.current().version
+        or _written.get(session_id) != stored
+    ):
+        accumulator = await rebuild(db, session_id)
+    return accumulator, stored[0] if stored else None
+
+
+def written(session_id: str, score: int, rule_version: str | None, updated_at: datetime):
+    """Record the ``session_risk`` row written from the session's accumulator."""
+    if session_id in _accumulators:
+        _written[session_id] = (score, rule_version, updated_at)
+
+
+async def rebuild(db: AsyncSession, session_id: str) -> RiskAccumulator:
+    accumulator = await build_accumulator(db, session_id)
+    _accumulators[session_id] = accumulator
+    _written.pop(session_id, None)
+    return accumulator
+
+
+def discard(session_id: str):
+    _accumulators.pop(session_id, None)
+    _written.pop(session_id, None)
+
+
+async def _stored(db: AsyncSession, session_id: str) -> tuple | None:
+    row = (await db.execute(
+        select(SessionRisk.score, SessionRisk.rule_version, SessionRisk.updated_at)
+        .where(SessionRisk.session_id == session_id)
+    )).first()
+    return tuple(row) if row else None
@@ -0,0 +1,66 @@
+"""
+Live risk updates for proctor dashboards.
+
+`create_event` publishes every new score through the broker. Each worker
+fans the updates out in-process to the subscribers watching that session.
+A slow subscriber only loses its oldest queued updates; it never blocks
+ingest.
+"""
+import asyncio
+from collections import defaultdict
+
+from app.services import pubsub
+
+RISK_CHANNEL = "risk"
+
+
+class RiskSubscription:
+    def __init__(self, session_ids: set[str], maxsize: int = 100):
+        self.session_ids = session_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, update: dict):
+        if self.queue.full():
+            # Only the newest score matters, drop the stalest
+            self.queue.get_nowait()
+        self.queue.put_nowait(update)
+
+
+class RiskHub:
+    def __init__(self):
+        self._subscribers: dict[str, set[RiskSubscription]] = defaultdict(set)
+        pubsub.subscribe(RISK_CHANNEL, self._deliver)
+
+    def subscribe(self, session_ids: set[str]) -> RiskSubscription:
+        subscription = RiskSubscription(session_ids)
+        for session_id in session_ids:
+            self._subscribers[session_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RiskSubscription):
+        for session_id in subscription.session_ids:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[session_id]
+
+    async def publish(self, update: dict):
+        await pubsub.publish(RISK_CHANNEL, update)
+
+    async def _deliver(self, channel: str, message: dict):
+        for subscription in list(self._subscribers.get(message["session_id"], ())):
+            subscription.offer(message)
+
+
+risk_hub = RiskHub()
+
+
+def risk_update(risk_result: dict, updated_at) -> dict:
+    return {
+        "session_id": risk_result["session_id"],
+        "risk_score": risk_result["risk_score"],
+        "risk_level": risk_result["risk_level"],
+        "updated_at": updated_at.isoformat(),
+    }
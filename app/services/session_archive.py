@@ -0,0 +1,177 @@
+"""
+Cold archive of ENDED sessions.
+
+An archived session's events, risk history and reports are written to
+one compressed NDJSON file in blob storage and deleted from the hot
+tables; a `session_archives` row records where the file went. The first
+line holds the session and its reports, followed by one line per event
+and per risk history row in time order. zstd is used when the optional
+``zstandard`` package is installed, gzip otherwise.
+
+Only the first line is needed to serve reports, so `load_reports` keeps
+the report endpoints working for archived sessions, decompressing the
+archive as it streams in and stopping after that line.
+"""
+import gzip
+import hashlib
+import json
+import tempfile
+import zlib
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.event import Event
+from app.models.event_receipt import EventReceipt
+from app.models.risk_score import RiskScore
+from app.models.session import InterviewSession
+from app.models.session_archive import SessionArchive
+from app.models.session_report import SessionReport
+from app.services.blob_storage import iter_file, storage
+
+ARCHIVE_PREFIX = "archives"
+
+COMPRESSIONS = {"zstd": "zst", "gzip": "gz"}
+
+# Archives up to this size never touch the disk while being written
+SPOOL_MEMORY_BYTES = 4 * 1024 * 1024
+
+ROWS_PER_WRITE = 1000
+
+
+def default_compression() -> str:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return "gzip"
+    return "zstd"
+
+
+async def archive_session(
+    db: AsyncSession,
+    session: InterviewSession,
+    raw_report: dict,
+    final_report: dict,
+    compression: str,
+) -> SessionArchive:
+    """Write one ENDED session to the archive and delete its hot rows."""
+    key = (
+        f"{ARCHIVE_PREFIX}/{session.ended_at:%Y/%m}/{session.id}.ndjson."
+        f"{COMPRESSIONS[compression]}"
+    )
+    spool = await run_in_threadpool(tempfile.SpooledTemporaryFile, SPOOL_MEMORY_BYTES)
+    try:
+        # 1. Compress the session, its reports and its rows into the spool
+        writer = await run_in_threadpool(_open_writer, compression, spool)
+        header = {
+            "type": "session",
+            "session": _row(session.__table__, session),
+            "raw_report": raw_report,
+            "final_report": final_report,
+        }
+        await run_in_threadpool(_write_lines, writer, [header])
+
+        event_count = 0
+        for record_type, model, order in (
+            ("event", Event, (Event.timestamp, Event.id)),
+            ("risk_score", RiskScore, (RiskScore.created_at, RiskScore.id)),
+        ):
+            result = await db.stream(
+                select(model.__table__)
+                .where(model.session_id == session.id)
+                .order_by(*order)
+                .execution_options(yield_per=ROWS_PER_WRITE)
+            )
+            async for rows in result.partitions():
+                lines = [{"type": record_type, **row._mapping} for row in rows]
+                await run_in_threadpool(_write_lines, writer, lines)
+                if model is Event:
+                    event_count += len(lines)
+        await run_in_threadpool(writer.close)
+
+        # 2. Upload, hashing what is stored
+        await run_in_threadpool(spool.seek, 0)
+        digest = hashlib.sha256()
+        size = await storage.put(key, _hashed(iter_file(spool), digest))
+    finally:
+        await run_in_threadpool(spool.close)
+
+    # 3. Swap the hot rows for the archive record in one transaction
+    archive = SessionArchive(
+        session_id=session.id,
+        path=key,
+        compression=compression,
+        sha256=digest.hexdigest(),
+        size_bytes=size,
+        event_count=event_count,
+    )
+    db.add(archive)
+    await db.execute(delete(Event).where(Event.session_id == session.id))
+    await db.execute(delete(RiskScore).where(RiskScore.session_id == session.id))
+    await db.execute(delete(SessionReport).where(SessionReport.session_id == session.id))
+    await db.execute(delete(EventReceipt).where(EventReceipt.session_id == session.id))
+    await db.commit()
+    return archive
+
+
+async def load_reports(db: AsyncSession, session_id: str) -> tuple[dict, dict] | None:
+    """``(raw_report, final_report)`` of an archived session, None if not archived."""
+    archive = await db.get(SessionArchive, session_id)
+    if archive is None:
+        return None
+    return await read_reports(archive.path, archive.compression)
+
+
+async def read_reports(path: str, compression: str) -> tuple[dict, dict]:
+    """Reports from the first line of an archive, without fetching the rest of it."""
+    decompressor = _open_decompressor(compression)
+    header = bytearray()
+    async with aclosing(storage.read(path)) as chunks:
+        async for chunk in chunks:
+            searched = len(header)
+            header += await run_in_threadpool(decompressor.decompress, chunk)
+            end = header.find(b"\n", searched)
+            if end != -1:
+                record = json.loads(header[:end])
+                return record["raw_report"], record["final_report"]
+    raise ValueError(f"Archive {path} has no complete first line")
+
+
+def _open_writer(compression: str, fileobj):
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).stream_writer(fileobj, closefd=False)
+    return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6)
+
+
+def _open_decompressor(compression: str):
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+    # gzip container
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def _write_lines(writer, records: list[dict]):
+    writer.write("".join(json.dumps(record, default=_encode) + "\n" for record in records).encode())
+
+
+def _row(table, instance) -> dict:
+    return {column.name: getattr(instance, column.key) for column in table.columns}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+async def _hashed(chunks: AsyncIterator[bytes], digest) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
@@ -0,0 +1,130 @@
+"""
+Session status cache in front of `interview_sessions`.
+
+Event ingest checks a session's status before doing any work, and that
+check is served from an in-process LRU with a TTL instead of a query.
+The lifecycle functions in `session_service` write the new status here
+as they commit it and announce it on the pub/sub ``session`` channel, so
+the caches of the other workers follow.
+
+The cache decides nothing on its own: ingest rejects early on a cached
+non-ACTIVE status, and confirms ACTIVE with a locking read of the
+session row in its write transaction, which waits for an `end_session`
+on another worker to commit. An outdated entry therefore costs at most a
+wrong early answer until it expires, not an event written after the
+report froze. ENDED is final and kept for SESSION_CACHE_TTL_SEC; CREATED
+and ACTIVE expire after SESSION_CACHE_ACTIVE_TTL_SEC.
+"""
+import time
+from collections import OrderedDict
+from uuid import uuid4
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.session import InterviewSession
+from app.services import pubsub
+
+SESSION_CHANNEL = "session"
+
+# Statuses a session never leaves, cached for the full TTL
+FINAL_STATUSES = {"ENDED"}
+
+# Identifies this process so it skips its own announcements
+_ORIGIN = uuid4().hex
+
+_entries: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+_counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get(session_id: str) -> str | None:
+    entry = _entries.get(session_id)
+    if entry is not None:
+        status, expires_at = entry
+        if expires_at > time.monotonic():
+            _entries.move_to_end(session_id)
+            _counters["hits"] += 1
+            return status
+        del _entries[session_id]
+    _counters["misses"] += 1
+    return None
+
+
+def put(session_id: str, status: str):
+    if settings.SESSION_CACHE_SIZE <= 0:
+        return
+    ttl = (
+        settings.SESSION_CACHE_TTL_SEC if status in FINAL_STATUSES
+        else settings.SESSION_CACHE_ACTIVE_TTL_SEC
+    )
+    _entries[session_id] = (status, time.monotonic() + ttl)
+    _entries.move_to_end(session_id)
+    while len(_entries) > settings.SESSION_CACHE_SIZE:
+        _entries.popitem(last=False)
+
+
+def invalidate(session_id: str):
+    if _entries.pop(session_id, None) is not None:
+        _counters["invalidations"] += 1
+
+
+async def get_status(db: AsyncSession, session_id: str) -> str | None:
+    """Status of a session, or None if it does not exist."""
+    status = get(session_id)
+    if status is None:
+        status = await db.scalar(
+            select(InterviewSession.status).where(InterviewSession.id == session_id)
+        )
+        if status is not None:
+            put(session_id, status)
+    return status
+
+
+async def get_statuses(db: AsyncSession, session_ids: set[str]) -> dict[str, str]:
+    """Statuses of the sessions that exist, with one query for all misses."""
+    statuses = {}
+    missing = []
+    for session_id in session_ids:
+        status = get(session_id)
+        if status is None:
+            missing.append(session_id)
+        else:
+            statuses[session_id] = status
+
+    if missing:
+        rows = await db.execute(
+            select(InterviewSession.id, InterviewSession.status)
+            .where(InterviewSession.id.in_(missing))
+        )
+        for session_id, status in rows.all():
+            put(session_id, status)
+            statuses[session_id] = status
+
+    return statuses
+
+
+async def set_status(session_id: str, status: str):
+    """Record a committed status change here and on every other worker."""
+    put(session_id, status)
+    await pubsub.publish(SESSION_CHANNEL, {
+        "origin": _ORIGIN,
+        "session_id": session_id,
+        "status": status,
+    })
+
+
+def stats() -> dict:
+    lookups = _counters["hits"] + _counters["misses"]
+    return {
+        **_counters,
+        "size": len(_entries),
+        "hit_rate": round(_counters["hits"] / lookups, 4) if lookups else None,
+    }
+
+
+async def _on_message(channel: str, message: dict):
+    if message.get("origin") != _ORIGIN:
+        put(message["session_id"], message["status"])
+
+
+pubsub.subscribe(SESSION_CHANNEL, _on_message)
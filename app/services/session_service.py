@@ -1,46 +1,85 @@
-from sqlalchemy.orm import Session
+from contextlib import nullcontext
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from uuid import uuid4
 
+from app.core import metrics
 from app.models.session import InterviewSession
+from app.services import risk_state, session_cache
+from app.services.report_cache import store_reports
+from app.services.risk_engine import calculate_risk_for_session
 
 
-def create_session(db: Session) -> InterviewSession:
+async def create_session(db: AsyncSession) -> InterviewSession:
     session = InterviewSession(
         id=str(uuid4()),
         status="CREATED",
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    session_cache.put(session.id, session.status)
     return session
 
 
-def start_session(db: Session, session_id: str) -> InterviewSession:
-    session = db.query(InterviewSession).filter_by(id=session_id).first()
-    if not session:
-        raise ValueError("Session not found")
-
-    if session.status != "CREATED":
-        raise ValueError("Session cannot be started")
+async def start_session(db: AsyncSession, session_id: str) -> InterviewSession:
+    session = await _transition(
+        db, session_id, "CREATED", status="ACTIVE", started_at=datetime.utcnow()
+    )
+    if session is None:
+        await _raise_transition_error(db, session_id, "Session cannot be started")
 
-    session.status = "ACTIVE"
-    session.started_at = datetime.utcnow()
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await session_cache.set_status(session_id, session.status)
     return session
 
 
-def end_session(db: Session, session_id: str) -> InterviewSession:
-    session = db.query(InterviewSession).filter_by(id=session_id).first()
-    if not session:
-        raise ValueError("Session not found")
+async def end_session(db: AsyncSession, session_id: str, event_queue=None) -> InterviewSession:
+    # Events acknowledged by write-behind are written before the session ends
+    flushed = event_queue.flush_session(session_id) if event_queue is not None else nullcontext()
+    async with flushed:
+        return await _end_session(db, session_id)
+
+
+async def _end_session(db: AsyncSession, session_id: str) -> InterviewSession:
+    # Wait for in-flight ingest so the frozen report includes it. The
+    # UPDATE holds the session row lock until the report is committed,
+    # which is what ingest on other workers waits for
+    async with risk_state.session_lock(session_id):
+        session = await _transition(
+            db, session_id, "ACTIVE", status="ENDED", ended_at=datetime.utcnow()
+        )
+        if session is None:
+            await _raise_transition_error(db, session_id, "Session cannot be ended")
+
+        # Events are frozen from here on: compute the report once
+        with metrics.span("report.risk_rescan"):
+            raw_report = await calculate_risk_for_session(db, session_id)
+        await store_reports(db, session_id, raw_report)
 
-    if session.status != "ACTIVE":
-        raise ValueError("Session cannot be ended")
+        await db.commit()
+        # Before the lock is released, so queued ingest sees ENDED
+        await session_cache.set_status(session_id, session.status)
 
-    session.status = "ENDED"
-    session.ended_at = datetime.utcnow()
-    db.commit()
-    db.refresh(session)
+    # No more events can arrive, release the running risk state
+    risk_state.discard(session_id)
     return session
+
+
+async def _transition(db: AsyncSession, session_id: str, from_status: str, **values):
+    """Conditional UPDATE ... RETURNING: one round trip for lookup and write."""
+    result = await db.execute(
+        update(InterviewSession)
+        .where(InterviewSession.id == session_id, InterviewSession.status == from_status)
+        .values(**values)
+        .returning(InterviewSession)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _raise_transition_error(db: AsyncSession, session_id: str, message: str):
+    session_cache.invalidate(session_id)
+    if await session_cache.get_status(db, session_id) is None:
+        raise ValueError("Session not found")
+    raise ValueError(message)
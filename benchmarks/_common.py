@@ -0,0 +1,91 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Saved results wrap the benchmark's output with the revision and
+arguments it ran with, so runs can be compared with
+``python -m benchmarks.compare``.
+"""
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """Mean and percentiles in milliseconds of latencies given in seconds."""
+    if not latencies:
+        return {"mean": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "mean": round(statistics.mean(latencies) * 1000, 2),
+        "p50": round(percentile(latencies, 50) * 1000, 2),
+        "p95": round(percentile(latencies, 95) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def save_result(path: str, benchmark: str, args, result: dict):
+    record = {
+        "benchmark": benchmark,
+        "created_at": datetime.utcnow().isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "result": result,
+    }
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    print(f"Saved to {path}", file=sys.stderr)
+
+
+def interview_events(rng: random.Random, count: int, start: datetime) -> list[tuple[str, datetime]]:
+    """
+    ``count`` chronological ``(event_type, timestamp)`` of one interview.
+
+    Mixes FACE_MISSING bursts reported every second while the candidate
+    is away, TAB_SWITCH + WINDOW_BLUR pairs closed by a WINDOW_FOCUS, and
+    occasional MULTIPLE_FACES / FACE_DETECTED, separated by quiet gaps.
+    """
+    events = []
+    now = start
+    while len(events) < count:
+        now += timedelta(seconds=rng.uniform(5, 60))
+        scenario = rng.random()
+        if scenario < 0.45:
+            for _ in range(rng.randint(2, 8)):
+                events.append(("FACE_MISSING", now))
+                now += timedelta(seconds=1)
+            events.append(("FACE_DETECTED", now))
+        elif scenario < 0.85:
+            events.append(("TAB_SWITCH", now))
+            events.append(("WINDOW_BLUR", now + timedelta(milliseconds=200)))
+            now += timedelta(seconds=rng.uniform(3, 30))
+            events.append(("WINDOW_FOCUS", now))
+        elif scenario < 0.95:
+            for _ in range(rng.randint(1, 2)):
+                events.append(("MULTIPLE_FACES", now))
+                now += timedelta(seconds=1)
+        else:
+            events.append(("FACE_DETECTED", now))
+    return events[:count]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
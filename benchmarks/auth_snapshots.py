@@ -0,0 +1,135 @@
+"""
+Concurrent auth-snapshot upload benchmark.
+
+Uploads ``--requests`` synthetic JPEG snapshots from ``--concurrency``
+parallel clients through each upload mode and reports request latency.
+``base64`` is the legacy JSON data-URL route. ``binary`` sends the raw
+JPEG body, and ``multipart`` sends it as a form file. Every request
+carries a distinct image unless ``--repeat`` is set, which measures the
+dedup path instead:
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.auth_snapshots --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import time
+
+import httpx
+
+from app.ai.synthetic_frames import encode_jpeg, synthetic_frames
+from benchmarks._common import latency_summary, save_result
+
+MODES = ("base64", "binary", "multipart")
+
+
+def _request(mode: str, session_id: str, image: bytes) -> dict:
+    if mode == "base64":
+        data_url = "data:image/jpeg;base64," + base64.b64encode(image).decode()
+        return {
+            "url": f"/sessions/{session_id}/auth-snapshot",
+            "json": {"image_base64": data_url},
+        }
+    if mode == "binary":
+        return {
+            "url": f"/sessions/{session_id}/auth-snapshot/image",
+            "content": image,
+            "headers": {"Content-Type": "image/jpeg"},
+        }
+    return {
+        "url": f"/sessions/{session_id}/auth-snapshot/image",
+        "files": {"file": ("snapshot.jpg", image, "image/jpeg")},
+    }
+
+
+async def _worker(client, mode, session_ids, images, queue, latencies, errors):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        request = _request(mode, session_ids[index % len(session_ids)], images[index % len(images)])
+        started = time.perf_counter()
+        try:
+            response = await client.post(**request)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_mode(base_url, mode, images, requests, concurrency, sessions) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Fresh sessions per mode so one mode's dedup does not help the next
+        session_ids = []
+        for _ in range(sessions):
+            response = await client.post("/sessions")
+            response.raise_for_status()
+            session_ids.append(response.json()["session_id"])
+
+        queue = asyncio.Queue()
+        for index in range(requests):
+            queue.put_nowait(index)
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, mode, session_ids, images, queue, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "errors": len(errors),
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+async def run(base_url, modes, requests, concurrency, sessions, width, height, repeat) -> dict:
+    frames = synthetic_frames(width=width, height=height)
+    image_count = 1 if repeat else requests
+    images = [encode_jpeg(next(frames)) for _ in range(image_count)]
+
+    results = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "image_bytes": round(statistics.mean(len(image) for image in images)),
+        "repeat": repeat,
+    }
+    for mode in modes:
+        results[mode] = await run_mode(base_url, mode, images, requests, concurrency, sessions)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", action="store_true", help="Upload the same image every time")
+    parser.add_argument("--output", help="Save the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(
+        args.base_url, args.modes, args.requests, args.concurrency,
+        args.sessions, args.width, args.height, args.repeat,
+    ))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        save_result(args.output, "auth_snapshots", args, result)
+
+
+if __name__ == "__main__":
+    main()
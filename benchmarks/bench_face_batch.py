@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: per-frame FaceMonitor.process_frame vs process_batch.
+
+Feeds the same synthetic 720p frames through both paths and reports
+frames/sec for preprocessing alone and for preprocessing plus detection.
+
+    python -m benchmarks.bench_face_batch --frames 256 --batch-size 16
+"""
+import argparse
+import json
+import time
+
+import cv2
+
+from app.ai.face_monitor import FaceMonitor, FramePreprocessor
+from app.ai.synthetic_frames import synthetic_frames
+
+
+def _fps(count: int, started: float) -> float:
+    return round(count / (time.perf_counter() - started), 1)
+
+
+def run(frame_count: int, batch_size: int, width: int, height: int) -> dict:
+    source = synthetic_frames(width=width, height=height)
+    frames = [next(source) for _ in range(frame_count)]
+    batches = [frames[i:i + batch_size] for i in range(0, frame_count, batch_size)]
+
+    # Preprocessing only
+    started = time.perf_counter()
+    for frame in frames:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    per_frame_prep = _fps(frame_count, started)
+
+    preprocessor = FramePreprocessor(max_batch=batch_size)
+    started = time.perf_counter()
+    for batch in batches:
+        preprocessor.prepare(batch)
+    batch_prep = _fps(frame_count, started)
+
+    # Preprocessing + detection
+    monitor = FaceMonitor()
+    started = time.perf_counter()
+    for frame in frames:
+        monitor.process_frame(frame)
+    per_frame_total = _fps(frame_count, started)
+
+    monitor = FaceMonitor(detector=monitor.detector, preprocessor=preprocessor)
+    started = time.perf_counter()
+    for batch in batches:
+        monitor.process_batch(batch)
+    batch_total = _fps(frame_count, started)
+
+    return {
+        "frames": frame_count,
+        "batch_size": batch_size,
+        "frame_size": [width, height],
+        "preprocess_fps": {"per_frame": per_frame_prep, "batch": batch_prep},
+        "end_to_end_fps": {"per_frame": per_frame_total, "batch": batch_total},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.frames, args.batch_size, args.width, args.height), indent=2))
+
+
+if __name__ == "__main__":
+    main()
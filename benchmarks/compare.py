@@ -0,0 +1,58 @@
+"""
+Compare two saved benchmark results.
+
+Prints every numeric value present in both runs with the relative
+change, e.g. to check a branch against main::
+
+    python -m benchmarks.interviews --in-process --output main.json
+    python -m benchmarks.interviews --in-process --output branch.json
+    python -m benchmarks.compare main.json branch.json
+"""
+import argparse
+import json
+
+
+def flatten(value, prefix: str = "") -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(before: dict, after: dict) -> list[tuple[str, float, float, float | None]]:
+    old, new = flatten(before["result"]), flatten(after["result"])
+    rows = []
+    for key, old_value in old.items():
+        if key in new:
+            change = (new[key] - old_value) / old_value * 100 if old_value else None
+            rows.append((key, old_value, new[key], change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before["benchmark"] != after["benchmark"]:
+        parser.error(f"Cannot compare {before['benchmark']} with {after['benchmark']}")
+
+    print(f"{before['benchmark']}: {before['revision']} -> {after['revision']}")
+    rows = compare(before, after)
+    width = max((len(row[0]) for row in rows), default=0)
+    for key, old_value, new_value, change in rows:
+        delta = f"{change:+.1f}%" if change is not None else "-"
+        print(f"{key:<{width}}  {old_value:>12}  {new_value:>12}  {delta:>8}")
+
+
+if __name__ == "__main__":
+    main()
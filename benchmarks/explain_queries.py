@@ -0,0 +1,172 @@
+"""
+EXPLAIN ANALYZE timings for the hot read queries on a seeded Postgres.
+
+Seeds ``--sessions`` x ``--events-per-session`` rows server-side with
+generate_series, then reports plan shape and execution time for the
+query behind each endpoint. Compare index layouts by running it on both
+schema revisions:
+
+    python -m benchmarks.explain_queries --seed --sessions 20000 --events-per-session 100
+    alembic downgrade 8c4d1e6f2a90
+    python -m benchmarks.explain_queries --output before.json
+    alembic upgrade head
+    python -m benchmarks.explain_queries --output after.json
+    python -m benchmarks.explain_queries --compare before.json after.json
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine, select, text
+
+from app.core.config import settings
+from app.models.event import Event
+from app.models.risk_score import RiskScore
+from app.models.session import InterviewSession
+from app.models.session_risk import SessionRisk
+
+SEED_SQL = [
+    """
+    INSERT INTO interview_sessions (id, status, created_at, started_at)
+    SELECT 'bench-' || s, 'ACTIVE', now(), now()
+    FROM generate_series(1, :sessions) AS s
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO events (id, session_id, event_type, severity, confidence, timestamp, ended_at, count, created_at)
+    SELECT
+        md5(random()::text || s || '-' || e),
+        'bench-' || s,
+        (ARRAY['FACE_MISSING', 'TAB_SWITCH', 'WINDOW_BLUR', 'MULTIPLE_FACES'])[1 + (e % 4)],
+        'HIGH',
+        0.9,
+        now() - interval '30 days' * random(),
+        NULL,
+        1,
+        now()
+    FROM generate_series(1, :sessions) AS s, generate_series(1, :events) AS e
+    """,
+    """
+    INSERT INTO risk_scores (id, session_id, score, level, created_at)
+    SELECT md5(random()::text || s || '-' || e), 'bench-' || s, e * 10, 'NORMAL',
+           now() - interval '30 days' * random()
+    FROM generate_series(1, :sessions) AS s, generate_series(1, 5) AS e
+    """,
+    """
+    INSERT INTO session_risk (session_id, score, level, updated_at)
+    SELECT 'bench-' || s, 50, 'SUSPICIOUS', now()
+    FROM generate_series(1, :sessions) AS s
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+
+def _queries(session_id: str) -> dict:
+    # Same statements the services issue
+    return {
+        "session_lookup": select(InterviewSession).where(InterviewSession.id == session_id),
+        "risk_rebuild (/reports, ingest cold start)": (
+            select(Event.id, Event.event_type, Event.timestamp, Event.ended_at, Event.count)
+            .where(Event.session_id == session_id)
+            .order_by(Event.timestamp.asc())
+        ),
+        "latest_score (/reports/{id}/latest)": (
+            select(SessionRisk).where(SessionRisk.session_id == session_id)
+        ),
+        "latest_history_row": (
+            select(RiskScore)
+            .where(RiskScore.session_id == session_id)
+            .order_by(RiskScore.created_at.desc())
+            .limit(1)
+        ),
+    }
+
+
+def seed(engine, sessions: int, events: int):
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for statement in SEED_SQL:
+            conn.execute(text(statement), {"sessions": sessions, "events": events})
+        conn.execute(text("ANALYZE"))
+    print(f"Seeded {sessions * events} events in {time.perf_counter() - started:.1f}s")
+
+
+def explain(engine, samples: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        session_ids = conn.execute(text(
+            "SELECT id FROM interview_sessions WHERE id LIKE 'bench-%' ORDER BY random() LIMIT :n"
+        ), {"n": samples}).scalars().all()
+        if not session_ids:
+            raise SystemExit("No seeded sessions found, run with --seed first")
+
+        for name in _queries(session_ids[0]):
+            timings = []
+            plan = None
+            for session_id in session_ids:
+                statement = _queries(session_id)[name]
+                sql = statement.compile(engine, compile_kwargs={"literal_binds": True})
+                row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+                plan = row[0]
+                timings.append(plan["Execution Time"])
+
+            timings.sort()
+            results[name] = {
+                "node": plan["Plan"]["Node Type"],
+                "index": _index_names(plan["Plan"]),
+                "median_ms": round(timings[len(timings) // 2], 3),
+                "max_ms": round(timings[-1], 3),
+            }
+    return results
+
+
+def _index_names(node: dict) -> list[str]:
+    names = [node["Index Name"]] if "Index Name" in node else []
+    for child in node.get("Plans", []):
+        names.extend(_index_names(child))
+    return names
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    for name in before:
+        b, a = before[name], after.get(name, {})
+        print(f"{name}")
+        print(f"  before: {b['median_ms']:>9} ms  {b['node']} {b['index']}")
+        print(f"  after:  {a.get('median_ms', '-'):>9} ms  {a.get('node')} {a.get('index')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--events-per-session", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=25)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    engine = create_engine(settings.DATABASE_URL)
+    if not engine.dialect.name.startswith("postgres"):
+        raise SystemExit("EXPLAIN ANALYZE benchmark requires Postgres")
+
+    if args.seed:
+        seed(engine, args.sessions, args.events_per_session)
+
+    results = explain(engine, args.samples)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
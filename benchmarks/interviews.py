@@ -0,0 +1,183 @@
+"""
+End-to-end load test simulating concurrent interviews.
+
+Every synthetic interview runs the whole lifecycle: create, start, a
+realistic event stream (see `interview_events`), end and the final
+report. ``--interviews`` of them run with at most ``--concurrency`` at a
+time, and throughput and latency percentiles are reported per endpoint:
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.interviews --interviews 200 --concurrency 50 --output run.json
+
+``--in-process`` serves the app inside the benchmark process instead, on
+the database from DATABASE_URL (tables are created if missing)::
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.interviews --in-process
+
+``--embedded`` is the single-node preset: in-process on the SQLite file
+``--database`` (WAL mode) with group commit. Give interviews a think time
+to size how many live interviews one box sustains::
+
+    python -m benchmarks.interviews --embedded --interviews 300 --concurrency 300 --think-time 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import httpx
+
+from benchmarks._common import interview_events, latency_summary, save_result
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, endpoint: str, request) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+
+        if response is None or response.status_code != 200:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+
+async def _interview(client, recorder: Recorder, seed: int, events: int, batch_size: int, think_time: float):
+    response = await recorder.call("POST /sessions", client.post("/sessions"))
+    if response is None:
+        return
+    session_id = response.json()["session_id"]
+
+    if await recorder.call("POST /sessions/{id}/start", client.post(f"/sessions/{session_id}/start")) is None:
+        return
+
+    payloads = [
+        {
+            "session_id": session_id,
+            "event_type": event_type,
+            "severity": "HIGH",
+            "confidence": 0.9,
+            "timestamp": timestamp.isoformat(),
+        }
+        for event_type, timestamp in interview_events(random.Random(seed), events, datetime.utcnow())
+    ]
+    if batch_size:
+        for start in range(0, len(payloads), batch_size):
+            batch = {"events": payloads[start:start + batch_size]}
+            await recorder.call("POST /events/batch", client.post("/events/batch", json=batch))
+            await asyncio.sleep(think_time)
+    else:
+        for payload in payloads:
+            await recorder.call("POST /events", client.post("/events", json=payload))
+            await asyncio.sleep(think_time)
+
+    await recorder.call("POST /sessions/{id}/end", client.post(f"/sessions/{session_id}/end"))
+    await recorder.call("GET /reports/{id}/final", client.get(f"/reports/{session_id}/final"))
+
+
+async def _worker(client, recorder, queue, args):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        await _interview(client, recorder, args.seed + index, args.events, args.batch_size, args.think_time)
+
+
+@asynccontextmanager
+async def _client(base_url: str, concurrency: int, in_process: bool):
+    if not in_process:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            yield client
+        return
+
+    import app.models  # noqa: F401 - registers every table
+    from app.core.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://app/api/v1", timeout=60) as client:
+            yield client
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    async with _client(args.base_url, args.concurrency, args.in_process) as client:
+        queue = asyncio.Queue()
+        for index in range(args.interviews):
+            queue.put_nowait(index)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, recorder, queue, args)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    requests = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "interviews": args.interviews,
+        "concurrency": args.concurrency,
+        "events_per_interview": args.events,
+        "elapsed_sec": round(elapsed, 3),
+        "interviews_per_sec": round(args.interviews / elapsed, 2),
+        "requests": requests,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(requests / elapsed, 1),
+        "endpoints": {
+            endpoint: {
+                "requests": len(latencies),
+                "errors": recorder.errors[endpoint],
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "latency_ms": latency_summary(latencies),
+            }
+            for endpoint, latencies in recorder.latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--in-process", action="store_true", help="Serve the app inside the benchmark")
+    parser.add_argument("--embedded", action="store_true", help="In-process on SQLite with group commit")
+    parser.add_argument("--database", default="bench-embedded.db", help="SQLite file for --embedded")
+    parser.add_argument("--interviews", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--events", type=int, default=60, help="Events per interview")
+    parser.add_argument("--batch-size", type=int, default=0, help="Send events through /events/batch")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between event requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save the result as JSON")
+    args = parser.parse_args()
+
+    if args.embedded:
+        # Read by app.core.config when the app is imported in-process
+        os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["EVENT_GROUP_COMMIT"] = "true"
+        args.in_process = True
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        save_result(args.output, "interviews", args, result)
+
+
+if __name__ == "__main__":
+    main()
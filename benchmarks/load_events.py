@@ -0,0 +1,207 @@
+"""
+Concurrent event-ingest load test.
+
+Creates and starts a set of sessions, then fires POST /events from
+``--concurrency`` parallel clients and reports throughput and latency
+against a running server:
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.load_events --requests 5000 --concurrency 64
+
+``--mode async`` serves the app inside the benchmark process on the
+database from DATABASE_URL. ``--mode sync`` does the same, but answers
+POST /events with the blocking baseline: the write path on the sync
+``Session``, called from the event loop as the routes did before the
+async DB layer. The async layer pays off when queries wait on the
+network (Postgres); on a local SQLite file the blocking path can come
+out ahead::
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_events --mode sync
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_events --mode async
+"""
+import argparse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from uuid import uuid4
+
+import httpx
+
+from benchmarks._common import latency_summary, save_result
+
+EVENT_TYPES = ["FACE_MISSING", "TAB_SWITCH", "WINDOW_BLUR", "MULTIPLE_FACES"]
+
+
+async def _prepare_sessions(client: httpx.AsyncClient, count: int) -> list[str]:
+    session_ids = []
+    for _ in range(count):
+        response = await client.post("/sessions")
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+        (await client.post(f"/sessions/{session_id}/start")).raise_for_status()
+        session_ids.append(session_id)
+    return session_ids
+
+
+async def _worker(client, session_ids, queue, latencies, errors):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        payload = {
+            "session_id": session_ids[index % len(session_ids)],
+            "event_type": EVENT_TYPES[index % len(EVENT_TYPES)],
+            "severity": "HIGH",
+            "confidence": 0.9,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        started = time.perf_counter()
+        try:
+            response = await client.post("/events", json=payload)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+
+def _blocking_app(app):
+    """The app with POST /events served by the blocking sync baseline."""
+    from fastapi import FastAPI, HTTPException
+    from sqlalchemy import select
+
+    from app.core.database import SessionLocal
+    from app.models.event import Event, EventCreate
+    from app.models.session import InterviewSession
+    from app.models.session_risk import SessionRisk
+    from app.services.risk_engine import RiskAccumulator, to_naive_utc
+    from app.services.risk_persistence import dialect_insert
+
+    accumulators = {}
+
+    async def ingest_event(event: EventCreate):
+        # Deliberately blocking: every query below stalls the event loop
+        with SessionLocal() as db:
+            status = db.scalar(
+                select(InterviewSession.status).where(InterviewSession.id == event.session_id)
+            )
+            if status != "ACTIVE":
+                raise HTTPException(status_code=400, detail="Events are not allowed for this session state")
+
+            accumulator = accumulators.get(event.session_id)
+            if accumulator is None:
+                accumulator = accumulators[event.session_id] = RiskAccumulator(event.session_id)
+                rows = db.execute(
+                    select(Event.id, Event.event_type, Event.timestamp, Event.ended_at, Event.count)
+                    .where(Event.session_id == event.session_id)
+                    .order_by(Event.timestamp.asc())
+                )
+                for event_id, event_type, timestamp, ended_at, count in rows:
+                    accumulator.apply(event_type, timestamp, count=count or 1, event_id=event_id, last_seen=ended_at)
+
+            timestamp = to_naive_utc(event.timestamp)
+            event_id = str(uuid4())
+            db_event = Event(
+                id=event_id,
+                session_id=event.session_id,
+                event_type=event.event_type.value,
+                severity=event.severity.value,
+                confidence=event.confidence,
+                timestamp=timestamp,
+                ended_at=timestamp,
+                count=1,
+            )
+            db.add(db_event)
+            accumulator.apply(event.event_type.value, timestamp, event_id=event_id)
+            result = accumulator.to_result()
+
+            values = {
+                "score": result["risk_score"],
+                "level": result["risk_level"],
+                "rule_version": result["rule_version"],
+                "updated_at": datetime.utcnow(),
+            }
+            stmt = dialect_insert(db)(SessionRisk).values(session_id=event.session_id, **values)
+            db.execute(stmt.on_conflict_do_update(index_elements=[SessionRisk.session_id], set_=values))
+            db.commit()
+
+        return {"event_id": event_id, "current_risk_score": result["risk_score"]}
+
+    baseline = FastAPI()
+    baseline.add_api_route("/api/v1/events", ingest_event, methods=["POST"])
+    baseline.mount("/", app)
+    return baseline
+
+
+@asynccontextmanager
+async def _client(base_url: str, concurrency: int, mode: str):
+    if mode == "server":
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    import app.models  # noqa: F401 - registers every table
+    from app.core.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=_blocking_app(app) if mode == "sync" else app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://app/api/v1", timeout=30) as client:
+            yield client
+
+
+async def run(base_url: str, requests: int, concurrency: int, sessions: int, mode: str = "server") -> dict:
+    async with _client(base_url, concurrency, mode) as client:
+        session_ids = await _prepare_sessions(client, sessions)
+
+        queue = asyncio.Queue()
+        for index in range(requests):
+            queue.put_nowait(index)
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, session_ids, queue, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "requests": requests,
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "errors": len(errors),
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument(
+        "--mode", choices=["server", "async", "sync"], default="server",
+        help="Load a running server, or serve the app in-process (sync: blocking baseline)",
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--output", help="Save the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.requests, args.concurrency, args.sessions, args.mode))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        save_result(args.output, "load_events", args, result)
+
+
+if __name__ == "__main__":
+    main()
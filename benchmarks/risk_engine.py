@@ -0,0 +1,128 @@
+"""
+Micro-benchmarks of risk scoring and report building at growing event counts.
+
+Seeds one session per ``--event-counts`` entry with a realistic event
+mix on the database from DATABASE_URL and times, over ``--repeat`` runs:
+
+- ``calculate_risk_for_session``: load the events and score them
+- ``accumulator_fold``: the scoring alone, over rows already in memory
+- ``build_final_report``: the final report from the raw report
+
+The seeded sessions are deleted afterwards::
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.risk_engine --event-counts 100 1000 10000 --output risk.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.models.event import Event
+from app.models.session import InterviewSession
+from app.services.final_report_builder import build_final_report
+from app.services.risk_engine import RiskAccumulator, calculate_risk_for_session
+from benchmarks._common import interview_events, latency_summary, save_result
+
+
+def seed(event_count: int, seed_value: int) -> str:
+    session_id = f"bench-risk-{event_count}-{uuid4().hex[:8]}"
+    events = interview_events(random.Random(seed_value), event_count, datetime(2026, 1, 1))
+    with SessionLocal() as db:
+        db.add(InterviewSession(id=session_id, status="ENDED"))
+        db.execute(Event.__table__.insert(), [
+            {
+                "id": str(uuid4()),
+                "session_id": session_id,
+                "event_type": event_type,
+                "severity": "HIGH",
+                "confidence": 0.9,
+                "timestamp": timestamp,
+                "ended_at": timestamp,
+                "count": 1,
+            }
+            for event_type, timestamp in events
+        ])
+        db.commit()
+    return session_id
+
+
+def cleanup(session_ids: list[str]):
+    with SessionLocal() as db:
+        db.execute(delete(Event).where(Event.session_id.in_(session_ids)))
+        db.execute(delete(InterviewSession).where(InterviewSession.id.in_(session_ids)))
+        db.commit()
+
+
+async def measure(session_id: str, repeat: int) -> dict:
+    calculate, fold, final = [], [], []
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(Event.id, Event.event_type, Event.timestamp, Event.ended_at, Event.count)
+            .where(Event.session_id == session_id)
+            .order_by(Event.timestamp.asc())
+        )).all()
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            raw_report = await calculate_risk_for_session(db, session_id)
+            calculate.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            accumulator = RiskAccumulator(session_id)
+            for event_id, event_type, timestamp, ended_at, count in rows:
+                accumulator.apply(event_type, timestamp, count=count, event_id=event_id, last_seen=ended_at)
+            accumulator.to_result()
+            fold.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            build_final_report(raw_report)
+            final.append(time.perf_counter() - started)
+
+    return {
+        "risk_score": raw_report["risk_score"],
+        "calculate_risk_for_session_ms": latency_summary(calculate),
+        "accumulator_fold_ms": latency_summary(fold),
+        "build_final_report_ms": latency_summary(final),
+    }
+
+
+def run(event_counts: list[int], repeat: int, seed_value: int) -> dict:
+    Base.metadata.create_all(engine)
+    session_ids = {}
+    try:
+        for event_count in event_counts:
+            session_ids[event_count] = seed(event_count, seed_value)
+        return {
+            "database": engine.dialect.name,
+            "repeat": repeat,
+            "event_counts": {
+                str(event_count): asyncio.run(measure(session_id, repeat))
+                for event_count, session_id in session_ids.items()
+            },
+        }
+    finally:
+        cleanup(list(session_ids.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--event-counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save the result as JSON")
+    args = parser.parse_args()
+
+    result = run(args.event_counts, args.repeat, args.seed)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        save_result(args.output, "risk_engine", args, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Stream synthetic JPEG frames to the frame ingest WebSocket.
+
+Opens one socket per synthetic interview and pushes frames at ``--fps``
+for ``--duration`` seconds, then prints the server's per-worker stats.
+The API must run with FRAME_INGEST_ENABLED=true:
+
+    FRAME_INGEST_ENABLED=true uvicorn app.main:app --port 8000
+    python -m benchmarks.stream_frames --sessions 20 --fps 5 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+from app.ai.synthetic_frames import encode_jpeg, synthetic_frames
+
+
+async def _stream(ws_url: str, session_id: str, fps: float, duration: float, seed: int) -> int:
+    frames = synthetic_frames(absent_every=100, absent_for=30, seed=seed)
+    # Pre-encode so the client measures the server, not its own JPEG encoder
+    payloads = [encode_jpeg(next(frames)) for _ in range(100)]
+
+    sent = 0
+    interval = 1 / fps
+    deadline = time.monotonic() + duration
+    async with websockets.connect(f"{ws_url}/sessions/{session_id}/frames") as socket:
+        while time.monotonic() < deadline:
+            await socket.send(payloads[sent % len(payloads)])
+            sent += 1
+            await asyncio.sleep(interval)
+    return sent
+
+
+async def run(base_url: str, sessions: int, fps: float, duration: float) -> dict:
+    ws_url = base_url.replace("http", "ws", 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        session_ids = []
+        for _ in range(sessions):
+            session_id = (await client.post("/sessions")).json()["session_id"]
+            (await client.post(f"/sessions/{session_id}/start")).raise_for_status()
+            session_ids.append(session_id)
+
+        sent = await asyncio.gather(*(
+            _stream(ws_url, session_id, fps, duration, seed)
+            for seed, session_id in enumerate(session_ids)
+        ))
+        stats = (await client.get("/frames/stats")).json()
+
+    return {
+        "sessions": sessions,
+        "frames_sent": sum(sent),
+        "offered_fps": round(sum(sent) / duration, 1),
+        "server": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.sessions, args.fps, args.duration))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,15 @@ let interviewFaceMeshActive = false;
 let screenRecorder = null;
 let screenStream = null;
 let micStream = null;
-let screenChunks = [];
+let screenPending = [];       // recorded, not yet uploaded
+let screenPendingBytes = 0;
+let screenUploadOffset = 0;   // bytes acknowledged by the server
+let screenUpload = Promise.resolve();
+
+// Chunked recording upload
+const SCREEN_TIMESLICE_MS = 5000;
+const SCREEN_CHUNK_BYTES = 5 * 1024 * 1024;
+const SCREEN_UPLOAD_RETRIES = 5;
 
 // Thresholds
 const FACE_MISSING_FRAME_THRESHOLD = 40;
@@ -225,7 +233,8 @@ function captureSnapshot(video) {
   canvas.width = video.videoWidth;
   canvas.height = video.videoHeight;
   canvas.getContext("2d").drawImage(video, 0, 0);
-  return canvas.toDataURL("image/jpeg", 0.9);
+  // Binary JPEG, no base64 inflation
+  return new Promise(resolve => canvas.toBlob(resolve, "image/jpeg", 0.9));
 }
 
 function startAuthGate() {
@@ -301,10 +310,10 @@ function startAuthGate() {
       stream.getTracks().forEach(t => t.stop());
       overlay.style.display = "none";
 
-      await fetch(`${API_BASE}/sessions/${sessionId}/auth-snapshot`, {
+      await fetch(`${API_BASE}/sessions/${sessionId}/auth-snapshot/image`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ image_base64: snapshot }),
+        headers: { "Content-Type": "image/jpeg" },
+        body: await snapshot,
       });
 
       resolve();
@@ -340,10 +349,17 @@ async function startScreenRecording() {
       mimeType: "video/webm;codecs=vp8,opus"
     });
 
-    screenChunks = [];
+    screenPending = [];
+    screenPendingBytes = 0;
+    screenUploadOffset = 0;
+    screenUpload = Promise.resolve();
 
+    // Upload while recording instead of one huge file at the end
     screenRecorder.ondataavailable = e => {
-      if (e.data.size > 0) screenChunks.push(e.data);
+      if (e.data.size === 0) return;
+      screenPending.push(e.data);
+      screenPendingBytes += e.data.size;
+      if (screenPendingBytes >= SCREEN_CHUNK_BYTES) queueScreenChunk();
     };
 
     screenRecorder.onstop = handleScreenRecordingStop;
@@ -353,7 +369,7 @@ async function startScreenRecording() {
       stopScreenRecording();
     };
 
-    screenRecorder.start();
+    screenRecorder.start(SCREEN_TIMESLICE_MS);
     sendEvent("SCREEN_RECORDING_STARTED", "LOW");
 
   } catch (err) {
@@ -371,17 +387,16 @@ function stopScreenRecording() {
 }
 
 async function handleScreenRecordingStop() {
-  if (!screenChunks.length) return;
-
   try {
-    const blob = new Blob(screenChunks, { type: "video/webm" });
-    const formData = new FormData();
-    formData.append("file", blob, `${sessionId}.webm`);
+    await queueScreenChunk();
+    if (screenPending.length) throw new Error("recording not fully uploaded");
+    if (!screenUploadOffset) return;
 
-    await fetch(`${API_BASE}/sessions/${sessionId}/screen-recording`, {
-      method: "POST",
-      body: formData,
-    });
+    const res = await fetch(
+      `${API_BASE}/sessions/${sessionId}/screen-recording/complete?size=${screenUploadOffset}`,
+      { method: "POST" }
+    );
+    if (!res.ok) throw new Error(`complete failed: ${res.status}`);
 
     sendEvent("SCREEN_RECORDING_SAVED", "LOW");
 
@@ -390,6 +405,60 @@ async function handleScreenRecordingStop() {
   }
 }
 
+function queueScreenChunk() {
+  if (!screenPending.length) return screenUpload;
+
+  const blob = new Blob(screenPending, { type: "video/webm" });
+  screenPending = [];
+  screenPendingBytes = 0;
+
+  // Chunks are uploaded strictly in order
+  screenUpload = screenUpload.then(() => uploadScreenChunk(blob));
+  return screenUpload;
+}
+
+async function uploadScreenChunk(blob) {
+  const start = screenUploadOffset;
+
+  for (let attempt = 0; attempt <= SCREEN_UPLOAD_RETRIES; attempt++) {
+    try {
+      const res = await fetch(
+        `${API_BASE}/sessions/${sessionId}/screen-recording/chunks?offset=${screenUploadOffset}`,
+        {
+          method: "PUT",
+          headers: { "Content-Type": "application/octet-stream" },
+          body: blob.slice(screenUploadOffset - start),
+        }
+      );
+      const body = await res.json();
+      // On 409 the server reports how much of this chunk it already has
+      if ((res.ok || res.status === 409) && body.offset >= start) {
+        screenUploadOffset = body.offset;
+        if (screenUploadOffset >= start + blob.size) return;
+        continue;
+      }
+    } catch (e) {
+      console.warn("Screen chunk upload failed:", e);
+    }
+
+    await new Promise(r => setTimeout(r, 500 * 2 ** attempt));
+    await syncScreenUploadOffset(start);
+  }
+
+  // Keep the data: it goes out with the next chunk
+  screenPending.unshift(blob.slice(screenUploadOffset - start));
+  screenPendingBytes += start + blob.size - screenUploadOffset;
+}
+
+async function syncScreenUploadOffset(start) {
+  try {
+    const res = await fetch(`${API_BASE}/sessions/${sessionId}/screen-recording/upload`);
+    if (res.ok) screenUploadOffset = Math.max(start, (await res.json()).offset);
+  } catch {
+    // Still offline, retry with the offset we have
+  }
+}
+
 // ==============================
 // End Interview
 // ==============================
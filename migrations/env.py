@@ -2,8 +2,8 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
-from app.core.database import Base
-from app.models import session, event, risk_score
+from app.core.database import Base, configure_sqlite
+from app.models import session, event, risk_score, session_risk, session_report, auth_snapshot, session_archive, event_receipt
 from app.core.config import settings
 
 config = context.config
@@ -18,6 +18,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         compare_type=True,
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -30,12 +31,16 @@ def run_migrations_online():
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    configure_sqlite(connectable)
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            # SQLite cannot ALTER most constraints and columns: autogenerate
+            # emits batch operations that copy the table instead
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
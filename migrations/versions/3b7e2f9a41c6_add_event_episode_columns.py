@@ -0,0 +1,30 @@
+"""add event episode columns
+
+Revision ID: 3b7e2f9a41c6
+Revises: d5eca6d4510a
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2f9a41c6'
+down_revision: Union[str, Sequence[str], None] = 'd5eca6d4510a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('ended_at', sa.DateTime(), nullable=True))
+    op.add_column('events', sa.Column('count', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'count')
+    op.drop_column('events', 'ended_at')
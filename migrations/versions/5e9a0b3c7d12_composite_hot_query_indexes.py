@@ -0,0 +1,51 @@
+"""composite hot query indexes
+
+Revision ID: 5e9a0b3c7d12
+Revises: 8c4d1e6f2a90
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a0b3c7d12'
+down_revision: Union[str, Sequence[str], None] = '8c4d1e6f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Events of a session in timestamp order (risk rebuild, reports)
+    op.create_index('ix_events_session_id_timestamp', 'events', ['session_id', 'timestamp'], unique=False)
+    # Newest risk history row of a session
+    op.create_index(
+        'ix_risk_scores_session_id_created_at',
+        'risk_scores',
+        ['session_id', sa.text('created_at DESC')],
+        unique=False,
+    )
+
+    # Covered by the composite indexes' leading column
+    op.drop_index(op.f('ix_events_session_id'), table_name='events')
+    op.drop_index(op.f('ix_risk_scores_session_id'), table_name='risk_scores')
+
+    # Duplicates of the primary key indexes
+    op.drop_index(op.f('ix_events_id'), table_name='events')
+    op.drop_index(op.f('ix_risk_scores_id'), table_name='risk_scores')
+    op.drop_index(op.f('ix_interview_sessions_id'), table_name='interview_sessions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_interview_sessions_id'), 'interview_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_risk_scores_id'), 'risk_scores', ['id'], unique=False)
+    op.create_index(op.f('ix_events_id'), 'events', ['id'], unique=False)
+    op.create_index(op.f('ix_risk_scores_session_id'), 'risk_scores', ['session_id'], unique=False)
+    op.create_index(op.f('ix_events_session_id'), 'events', ['session_id'], unique=False)
+    op.drop_index('ix_risk_scores_session_id_created_at', table_name='risk_scores')
+    op.drop_index('ix_events_session_id_timestamp', table_name='events')
@@ -0,0 +1,102 @@
+"""partition events and risk_scores by month
+
+Postgres only: both tables become range partitioned on created_at, one
+partition per month plus a default partition. The primary key becomes
+(id, created_at) because Postgres requires the partition key in every
+unique constraint. `app.services.partitions` creates upcoming months and
+drops emptied ones. On other databases this revision does nothing.
+
+Revision ID: 6d8b2f4a9c13
+Revises: a1c5e9d3f7b2
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d8b2f4a9c13'
+down_revision: Union[str, Sequence[str], None] = 'a1c5e9d3f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> indexes recreated on the new table
+TABLES = {
+    'events': [
+        'CREATE INDEX ix_events_event_type ON events (event_type)',
+        'CREATE INDEX ix_events_session_id_timestamp ON events (session_id, timestamp)',
+    ],
+    'risk_scores': [
+        'CREATE INDEX ix_risk_scores_session_id_created_at ON risk_scores (session_id, created_at DESC)',
+    ],
+}
+
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, indexes in TABLES.items():
+        op.execute(f"UPDATE {table} SET created_at = now() AT TIME ZONE 'utc' WHERE created_at IS NULL")
+        op.execute(
+            f'CREATE TABLE {table}_partitioned (LIKE {table} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        op.execute(
+            f"ALTER TABLE {table}_partitioned ALTER COLUMN created_at SET NOT NULL, "
+            f"ALTER COLUMN created_at SET DEFAULT (now() AT TIME ZONE 'utc')"
+        )
+
+        oldest = bind.execute(sa.text(f'SELECT min(created_at) FROM {table}')).scalar()
+        first = date(oldest.year, oldest.month, 1) if oldest else date.today().replace(day=1)
+        for start, end in _months(first, MONTHS_AHEAD):
+            op.execute(
+                f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table}_partitioned "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table}_partitioned DEFAULT')
+
+        op.execute(f'INSERT INTO {table}_partitioned SELECT * FROM {table}')
+        op.execute(f'DROP TABLE {table}')
+        op.execute(f'ALTER TABLE {table}_partitioned RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)')
+        for index in indexes:
+            op.execute(index)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, indexes in TABLES.items():
+        op.execute(f'CREATE TABLE {table}_plain (LIKE {table} INCLUDING DEFAULTS)')
+        op.execute(
+            f'ALTER TABLE {table}_plain ALTER COLUMN created_at DROP NOT NULL, '
+            f'ALTER COLUMN created_at DROP DEFAULT'
+        )
+        op.execute(f'INSERT INTO {table}_plain SELECT * FROM {table}')
+        # Drops every partition with it
+        op.execute(f'DROP TABLE {table}')
+        op.execute(f'ALTER TABLE {table}_plain RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+        for index in indexes:
+            op.execute(index)
+
+
+def _months(first: date, months_ahead: int):
+    today = date.today()
+    last = (today.year * 12 + today.month - 1) + months_ahead
+    index = first.year * 12 + first.month - 1
+    while index <= last:
+        start = date(index // 12, index % 12 + 1, 1)
+        index += 1
+        yield start, date(index // 12, index % 12 + 1, 1)
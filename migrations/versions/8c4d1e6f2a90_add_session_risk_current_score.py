@@ -0,0 +1,50 @@
+"""add session_risk current score
+
+Revision ID: 8c4d1e6f2a90
+Revises: 3b7e2f9a41c6
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d1e6f2a90'
+down_revision: Union[str, Sequence[str], None] = '3b7e2f9a41c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('session_risk',
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.Column('level', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+
+    # Backfill from the newest risk_scores row of every session
+    op.execute("""
+        INSERT INTO session_risk (session_id, score, level, updated_at)
+        SELECT session_id, score, level, created_at
+        FROM (
+            SELECT
+                session_id, score, level, created_at,
+                ROW_NUMBER() OVER (
+                    PARTITION BY session_id ORDER BY created_at DESC
+                ) AS rn
+            FROM risk_scores
+            WHERE session_id IS NOT NULL
+        ) latest
+        WHERE rn = 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('session_risk')
@@ -0,0 +1,30 @@
+"""add risk rule version
+
+Revision ID: 9f3c1a7b5e24
+Revises: e4a7d2c9b158
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3c1a7b5e24'
+down_revision: Union[str, Sequence[str], None] = 'e4a7d2c9b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('session_risk', sa.Column('rule_version', sa.String(), nullable=True))
+    op.add_column('risk_scores', sa.Column('rule_version', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('risk_scores', 'rule_version')
+    op.drop_column('session_risk', 'rule_version')
@@ -0,0 +1,34 @@
+"""add session reports
+
+Revision ID: b2f6c8d04e37
+Revises: 5e9a0b3c7d12
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f6c8d04e37'
+down_revision: Union[str, Sequence[str], None] = '5e9a0b3c7d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('session_reports',
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('raw_report', sa.JSON(), nullable=False),
+    sa.Column('final_report', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('session_reports')
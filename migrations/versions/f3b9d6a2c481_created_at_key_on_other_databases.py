@@ -0,0 +1,59 @@
+"""created_at NOT NULL and part of the key outside Postgres
+
+Revision 6d8b2f4a9c13 made ``created_at`` NOT NULL and part of the
+primary key of `events` and `risk_scores` on Postgres only. This brings
+SQLite (embedded mode) in line with the models, copying each table in
+batch mode. On Postgres this revision does nothing.
+
+Revision ID: f3b9d6a2c481
+Revises: c7d4e1a8b396
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+import warnings
+from contextlib import contextmanager
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d6a2c481'
+down_revision: Union[str, Sequence[str], None] = 'c7d4e1a8b396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('events', 'risk_scores')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        return
+
+    for table in TABLES:
+        op.execute(f'UPDATE {table} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL')
+        with _replacing_primary_key(), op.batch_alter_table(table, recreate='always') as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+            batch_op.create_primary_key(f'{table}_pkey', ['id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        return
+
+    for table in TABLES:
+        with _replacing_primary_key(), op.batch_alter_table(table, recreate='always') as batch_op:
+            batch_op.create_primary_key(f'{table}_pkey', ['id'])
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+
+
+@contextmanager
+def _replacing_primary_key():
+    # Batch mode warns that the reflected key differs from the new one,
+    # which is the point
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='.*not matching locally specified', category=sa.exc.SAWarning)
+        yield
@@ -0,0 +1,32 @@
+"""
+Tests run against a throwaway SQLite database with in-memory blob
+storage; the environment is set before `app` is imported because
+settings are read at import time.
+"""
+import asyncio
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("RISK_RULES_PATH", None)
+os.environ["STORAGE_BACKEND"] = "memory"
+
+import pytest  # noqa: E402
+
+import app.models  # noqa: E402,F401 - registers every table
+from app.core.database import Base, async_engine, engine  # noqa: E402
+from app.services import report_cache, risk_state, session_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+    # Each test runs its own event loop: do not hand pooled connections on
+    asyncio.run(async_engine.dispose(close=False))
+    report_cache._lru.clear()
+    session_cache._entries.clear()
+    risk_state._accumulators.clear()
+    risk_state._written.clear()
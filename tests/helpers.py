@@ -0,0 +1,35 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.main import app
+
+
+@asynccontextmanager
+async def api_client():
+    """Client for the API with the app's lifespan (queues, broker) running."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+            yield client
+
+
+async def start_session(client: httpx.AsyncClient) -> str:
+    session_id = (await client.post("/sessions")).json()["session_id"]
+    response = await client.post(f"/sessions/{session_id}/start")
+    assert response.status_code == 200
+    return session_id
+
+
+def event(session_id: str, event_type: str, timestamp: datetime) -> dict:
+    return {
+        "session_id": session_id,
+        "event_type": event_type,
+        "severity": "HIGH",
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+def interview_start() -> datetime:
+    return datetime.utcnow().replace(microsecond=0) - timedelta(hours=2)
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.sessions import _parse_range
+from app.services.blob_storage import (
+    S3_MIN_PART_BYTES,
+    InMemoryS3Client,
+    LocalBlobStorage,
+    S3BlobStorage,
+    iter_bytes,
+)
+from tests.helpers import api_client, start_session
+
+MIB = 1024 * 1024
+
+
+class RecordingS3Client(InMemoryS3Client):
+    """Counts the multipart calls `finalize` makes."""
+
+    def __init__(self):
+        super().__init__()
+        self.copied_parts = 0
+        self.uploaded_parts = 0
+
+    def upload_part_copy(self, **kwargs):
+        self.copied_parts += 1
+        return super().upload_part_copy(**kwargs)
+
+    def upload_part(self, **kwargs):
+        self.uploaded_parts += 1
+        return super().upload_part(**kwargs)
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        return LocalBlobStorage(tmp_path)
+    return S3BlobStorage("bucket", client=RecordingS3Client(), prefix="media")
+
+
+async def _read(storage, key: str, start: int = 0, length: int | None = None) -> bytes:
+    return b"".join([chunk async for chunk in storage.read(key, start, length)])
+
+
+def test_put_read_and_delete(storage):
+    async def scenario():
+        size = await storage.put("a/blob.bin", iter_bytes(b"0123456789"))
+        whole = await _read(storage, "a/blob.bin")
+        middle = await _read(storage, "a/blob.bin", 3, 4)
+        await storage.delete("a/blob.bin")
+        return size, whole, middle, await storage.size("a/blob.bin")
+
+    size, whole, middle, deleted = asyncio.run(scenario())
+
+    assert (size, whole, middle, deleted) == (10, b"0123456789", b"3456", None)
+
+
+def test_append_and_finalize(storage):
+    async def scenario():
+        offset = await storage.append("rec.part", 0, iter_bytes(b"abc"))
+        offset = await storage.append("rec.part", offset, iter_bytes(b"defg"))
+        appended = await storage.appended_size("rec.part")
+        size = await storage.finalize("rec.part", "rec.webm")
+        return offset, appended, size, await _read(storage, "rec.webm"), await storage.appended_size("rec.part")
+
+    offset, appended, size, data, left = asyncio.run(scenario())
+
+    assert (offset, appended, size, data, left) == (7, 7, 7, b"abcdefg", 0)
+
+
+def test_s3_finalize_copies_large_parts_server_side():
+    client = RecordingS3Client()
+    storage = S3BlobStorage("bucket", client=client)
+    # Two parts big enough to copy, then two small ones merged into the last
+    chunks = [b"a" * S3_MIN_PART_BYTES, b"b" * (6 * MIB), b"c" * MIB, b"d" * 100]
+
+    async def scenario():
+        offset = 0
+        for chunk in chunks:
+            offset = await storage.append("rec.part", offset, iter_bytes(chunk))
+        size = await storage.finalize("rec.part", "rec.webm")
+        return size, await _read(storage, "rec.webm")
+
+    size, data = asyncio.run(scenario())
+
+    assert size == sum(map(len, chunks))
+    assert data == b"".join(chunks)
+    assert client.copied_parts == 2
+    assert client.uploaded_parts == 1
+    assert not [key for _, key in client.objects if key.startswith("rec.part")]
+
+
+def test_s3_finalize_merges_small_parts_until_they_fit():
+    client = RecordingS3Client()
+    storage = S3BlobStorage("bucket", client=client)
+    # A small first part cannot be copied, so the large one is merged too
+    chunks = [b"a" * MIB, b"b" * (6 * MIB), b"c" * (5 * MIB)]
+
+    async def scenario():
+        offset = 0
+        for chunk in chunks:
+            offset = await storage.append("rec.part", offset, iter_bytes(chunk))
+        await storage.finalize("rec.part", "rec.webm")
+        return await _read(storage, "rec.webm")
+
+    assert asyncio.run(scenario()) == b"".join(chunks)
+    assert client.copied_parts == 1
+    assert client.uploaded_parts == 1
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-9", (0, 9)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=95-", (95, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=-500", (0, 99)),
+        ("bytes=100-", None),
+        ("bytes=-0", None),
+        ("bytes=9-3", None),
+        ("bytes=-", None),
+        ("items=0-9", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert _parse_range(header, 100) == expected
+
+
+async def _playback(recording: bytes):
+    async with api_client() as client:
+        session_id = await start_session(client)
+        base = f"/sessions/{session_id}/screen-recording"
+        saved = await client.post(base, files={"file": ("screen.webm", recording, "video/webm")})
+        partial = await client.get(base, headers={"Range": "bytes=10-19"})
+        suffix = await client.get(base, headers={"Range": "bytes=-5"})
+        unsatisfiable = await client.get(base, headers={"Range": f"bytes={len(recording)}-"})
+        return session_id, saved.json(), partial, suffix, unsatisfiable
+
+
+def test_ranged_playback():
+    recording = bytes(range(256)) * 4
+    session_id, saved, partial, suffix, unsatisfiable = asyncio.run(_playback(recording))
+
+    assert saved["key"] == f"screen_recordings/{session_id}.webm"
+    assert saved["path"] == f"s3://local/screen_recordings/{session_id}.webm"
+    assert partial.status_code == 206
+    assert partial.content == recording[10:20]
+    assert partial.headers["Content-Range"] == f"bytes 10-19/{len(recording)}"
+    assert suffix.content == recording[-5:]
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(recording)}"
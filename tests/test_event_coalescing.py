@@ -0,0 +1,51 @@
+import asyncio
+import random
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.event import Event
+from benchmarks._common import interview_events
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _ingest_and_end(events: list) -> tuple[str, dict, dict]:
+    async with api_client() as client:
+        session_id = await start_session(client)
+        batch = [event(session_id, event_type, timestamp) for event_type, timestamp in events]
+        for start in range(0, len(batch), 500):
+            response = await client.post("/events/batch", json={"events": batch[start:start + 500]})
+            assert response.status_code == 200
+        assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+
+        raw_report = (await client.get(f"/reports/{session_id}")).json()
+        final_report = (await client.get(f"/reports/{session_id}/final")).json()
+    return session_id, raw_report, final_report
+
+
+def _event_rows(session_id: str) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).where(Event.session_id == session_id))
+
+
+def _comparable(raw_report: dict, final_report: dict):
+    # Hits in an episode are stamped with its start, so only their order by
+    # type and score is comparable with raw rows
+    reasons = sorted((reason["event_type"], reason["score_added"]) for reason in raw_report["reasons"])
+    raw = {key: value for key, value in raw_report.items() if key not in ("session_id", "reasons")}
+    final = {key: value for key, value in final_report.items() if key != "session_id"}
+    return raw, reasons, final
+
+
+def test_coalesced_episodes_score_like_raw_events(monkeypatch):
+    events = interview_events(random.Random(7), 600, interview_start())
+
+    monkeypatch.setattr(settings, "EVENT_COALESCE_WINDOW_SEC", 0.0)
+    raw_id, *raw = asyncio.run(_ingest_and_end(events))
+    monkeypatch.setattr(settings, "EVENT_COALESCE_WINDOW_SEC", 5.0)
+    coalesced_id, *coalesced = asyncio.run(_ingest_and_end(events))
+
+    assert _event_rows(raw_id) == len(events)
+    assert _event_rows(coalesced_id) < len(events)
+    assert raw[0]["event_counts"]["face_missing_count"] > 0
+    assert _comparable(*coalesced) == _comparable(*raw)
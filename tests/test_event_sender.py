@@ -0,0 +1,53 @@
+import requests
+
+from app.ai.event_sender import EventSender
+
+
+class FlakyApi:
+    """Refuses the first ``failures`` posts, then accepts every event."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.delivered = []
+
+    def post(self, url, json, timeout):
+        if self.failures:
+            self.failures -= 1
+            raise requests.ConnectionError("API down")
+        self.delivered.append([event["n"] for event in json["events"]])
+        return Response({"results": [{"status": "accepted"} for _ in json["events"]]})
+
+    def close(self):
+        pass
+
+
+class Response:
+    status_code = 200
+
+    def __init__(self, body: dict):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def test_spool_is_replayed_in_order_then_truncated(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    sender = EventSender("http://api", spool_path=str(spool), batch_size=2)
+    api = sender._http = FlakyApi(failures=2)
+
+    def deliver(*numbers):
+        # The backoff has passed by the next batch
+        sender._retry_at = 0.0
+        sender._deliver([{"n": n, "idempotency_key": f"k{n}"} for n in numbers])
+
+    deliver(1, 2)  # fails: spooled
+    deliver(3)     # replay fails again: spooled behind 1 and 2
+    assert spool.read_text().count("\n") == 3
+
+    deliver(4)     # API back: spool first, in order, then the new batch
+    assert api.delivered == [[1, 2], [3], [4]]
+    assert spool.stat().st_size == 0
+    assert sender.stats()["replayed"] == 3
+    assert sender.sent == 4
+    assert sender.failures == 2
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.ai.adaptive_sampler import AdaptiveSampler
+from app.ai.face_monitor import FaceMonitor, FramePreprocessor
+
+FPS = 10
+
+
+class FakeDetector:
+    """Reports ``faces`` faces on every frame it is given."""
+
+    def __init__(self):
+        self.faces = 1
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        return SimpleNamespace(detections=[object()] * self.faces)
+
+
+def _frame(level: int):
+    return np.full((240, 320, 3), level, dtype=np.uint8)
+
+
+def _first_missing(monitor, detector, leave_at: float, moves: bool, until: float = 10.0):
+    """Feed FPS frames per second; the face leaves at ``leave_at``."""
+    for tick in range(int(until * FPS)):
+        now = tick / FPS
+        gone = now >= leave_at
+        detector.faces = 0 if gone else 1
+        # Leaving changes the picture unless ``moves`` is False
+        frame = _frame(160 if gone and moves else 100)
+        if "FACE_MISSING" in monitor.process_frame(frame, now):
+            return now
+    return None
+
+
+def test_absence_is_timed_from_the_last_skipped_frame_with_the_face():
+    detector = FakeDetector()
+    monitor = FaceMonitor(2.0, detector=detector, sampler=AdaptiveSampler())
+    monitor.last_face_time = 0.0
+
+    fired = _first_missing(monitor, detector, leave_at=1.9, moves=True)
+
+    # Not at 2.0 s because the last detection with the face was at 0 s
+    assert fired is not None and 3.7 <= fired <= 4.0
+    assert monitor.sampler.stats()["skipped"] > 0
+
+
+def test_motionless_exit_is_reported_within_skip_bound():
+    detector = FakeDetector()
+    monitor = FaceMonitor(2.0, detector=detector, sampler=AdaptiveSampler(max_skip_sec=5.0))
+    monitor.last_face_time = 0.0
+
+    fired = _first_missing(monitor, detector, leave_at=3.0, moves=False)
+
+    assert monitor.sampler.max_skip_sec == 2.0
+    assert fired is not None and fired - 3.0 <= 2.0 + 2.0
+
+
+def test_without_sampler_every_frame_is_detected():
+    detector = FakeDetector()
+    monitor = FaceMonitor(2.0, detector=detector)
+    monitor.last_face_time = 0.0
+
+    fired = _first_missing(monitor, detector, leave_at=1.9, moves=True)
+
+    assert 3.7 <= fired <= 4.0
+    assert detector.calls == int(fired * FPS) + 1
+
+
+def test_preprocessor_letterboxes_instead_of_stretching():
+    # A 16:9 frame with a centred square
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    frame[130:230, 270:370] = (255, 0, 0)
+
+    [rgb] = FramePreprocessor(max_batch=1).prepare([frame])
+
+    rows, cols = np.nonzero(rgb[:, :, 2] > 128)
+    assert rgb.shape == (240, 320, 3)
+    # Scaled by 0.5 into 320x180, 30 px bars above and below
+    assert (rows.min(), rows.max() + 1) == (95, 145)
+    assert (cols.min(), cols.max() + 1) == (135, 185)
+    assert not rgb[:30].any() and not rgb[210:].any()
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import timedelta
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.event import Event
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _post_twice():
+    async with api_client() as client:
+        session_id = await start_session(client)
+        start = interview_start()
+        first = {**event(session_id, "TAB_SWITCH", start), "idempotency_key": "k1"}
+        other = {**event(session_id, "WINDOW_BLUR", start + timedelta(minutes=1)), "idempotency_key": "k2"}
+        # The same key twice in one batch, e.g. a resend after a lost response
+        batch = {"events": [first, {**first}, other]}
+
+        original = (await client.post("/events/batch", json=batch)).json()
+        retried = (await client.post("/events/batch", json=batch)).json()
+        single = (await client.post("/events", json=first)).json()
+        return session_id, original, retried, single
+
+
+def test_repeated_idempotency_keys_are_answered_as_duplicates():
+    session_id, original, retried, single = asyncio.run(_post_twice())
+
+    first, repeat, other = original["results"]
+    assert first["status"] == other["status"] == "accepted"
+    assert repeat == {"index": 1, "status": "duplicate", "event_id": first["event_id"]}
+    assert [result["status"] for result in retried["results"]] == ["duplicate"] * 3
+    assert [result["event_id"] for result in retried["results"]] == [
+        first["event_id"], first["event_id"], other["event_id"]
+    ]
+    assert single["duplicate"] is True
+    assert single["event_id"] == first["event_id"]
+
+    # Scored once: the score did not move after the first request
+    score = original["sessions"][session_id]["current_risk_score"]
+    assert retried["sessions"][session_id]["current_risk_score"] == score
+    assert single["current_risk_score"] == score
+    with SessionLocal() as db:
+        stored = db.scalar(select(func.count()).select_from(Event).where(Event.session_id == session_id))
+    assert stored == 2
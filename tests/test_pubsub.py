@@ -0,0 +1,103 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from app.api.v1.reports import stream_risk_updates
+from app.services import pubsub
+from app.services.risk_stream import risk_hub
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def _message(chunk: str) -> tuple[str, dict]:
+    kind, data = chunk.strip().split("\n")
+    return kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+async def _stream_one_update():
+    async with api_client() as client:
+        session_id = await start_session(client)
+        start = interview_start()
+        await client.post("/events", json=event(session_id, "TAB_SWITCH", start))
+
+        response = await stream_risk_updates(ConnectedRequest(), session_id=[session_id])
+        stream = response.body_iterator
+        snapshot = _message(await anext(stream))
+
+        await client.post("/events", json=event(session_id, "FACE_MISSING", start + timedelta(minutes=1)))
+        pushed = _message(await asyncio.wait_for(anext(stream), timeout=5))
+
+        await stream.aclose()
+        return session_id, snapshot, pushed, dict(risk_hub._subscribers)
+
+
+def test_report_stream_pushes_score_changes():
+    session_id, snapshot, pushed, subscribers = asyncio.run(_stream_one_update())
+
+    assert snapshot[0] == "risk"
+    assert snapshot[1]["session_id"] == session_id
+    assert pushed[0] == "risk"
+    assert pushed[1]["session_id"] == session_id
+    assert pushed[1]["risk_score"] > snapshot[1]["risk_score"]
+    # Closing the stream unsubscribes
+    assert session_id not in subscribers
+
+
+class FlakyRedis:
+    """A Redis client whose first subscription drops, the second delivers."""
+
+    def __init__(self, message: dict):
+        self.message = message
+        self.subscriptions = 0
+
+    def pubsub(self):
+        self.subscriptions += 1
+        return FlakyPubSub(self.message, drop=self.subscriptions == 1)
+
+
+class FlakyPubSub:
+    def __init__(self, message: dict, drop: bool):
+        self.message = message
+        self.drop = drop
+        self.closed = False
+
+    async def psubscribe(self, pattern):
+        pass
+
+    async def listen(self):
+        if self.drop:
+            raise ConnectionError("Connection reset by peer")
+        yield {"type": "psubscribe", "channel": b"interview:*", "data": 1}
+        yield {"type": "pmessage", "channel": b"interview:risk", "data": json.dumps(self.message)}
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def _deliver_after_drop(message: dict):
+    client = FlakyRedis(message)
+    broker = pubsub.RedisBroker("redis://unused", client=client)
+    received = asyncio.Queue()
+
+    async def handler(channel, data):
+        await received.put((channel, data))
+
+    await broker.start(handler)
+    delivered = await asyncio.wait_for(received.get(), timeout=5)
+    broker._task.cancel()
+    return client.subscriptions, delivered
+
+
+def test_redis_broker_resubscribes_after_a_dropped_connection(monkeypatch):
+    monkeypatch.setattr(pubsub, "RECONNECT_MIN_SEC", 0.01)
+    message = {"session_id": "s1", "risk_score": 20}
+
+    subscriptions, delivered = asyncio.run(_deliver_after_drop(message))
+
+    assert subscriptions == 2
+    assert delivered == ("risk", message)
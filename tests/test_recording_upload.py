@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.api.v1 import sessions
+from app.services import blob_storage
+from app.services.blob_storage import LocalBlobStorage
+from app.services.recording_upload import RecordingUploads
+from tests.helpers import api_client, start_session
+
+CHUNK = 1024
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    # Write through to disk in pieces smaller than a chunk
+    monkeypatch.setattr(blob_storage, "READ_CHUNK_BYTES", 256)
+    uploads = RecordingUploads(LocalBlobStorage(tmp_path), max_chunk_bytes=CHUNK)
+    monkeypatch.setattr(sessions, "recording_uploads", uploads)
+    return uploads
+
+
+async def _streamed(data: bytes, piece: int = 256):
+    # No Content-Length: the limit is only hit while the body streams in
+    for start in range(0, len(data), piece):
+        yield data[start:start + piece]
+
+
+async def _upload(recording: bytes):
+    async with api_client() as client:
+        session_id = await start_session(client)
+        base = f"/sessions/{session_id}/screen-recording"
+
+        first = await client.put(f"{base}/chunks", params={"offset": 0}, content=recording[:CHUNK])
+        # A retry of a chunk that already landed is told where to resume
+        retry = await client.put(f"{base}/chunks", params={"offset": 0}, content=recording[:CHUNK])
+        resumed_at = retry.json()["offset"]
+        second = await client.put(
+            f"{base}/chunks", params={"offset": resumed_at}, content=recording[CHUNK:]
+        )
+        status = (await client.get(f"{base}/upload")).json()
+        complete = await client.post(f"{base}/complete", params={"size": len(recording)})
+        playback = await client.get(base)
+        return session_id, first, retry, second, status, complete, playback
+
+
+def test_resume_after_offset_mismatch_and_complete(uploads, tmp_path):
+    recording = bytes(range(256)) * 6
+    session_id, first, retry, second, status, complete, playback = asyncio.run(_upload(recording))
+
+    assert first.json()["offset"] == CHUNK
+    assert retry.status_code == 409
+    assert retry.headers["Upload-Offset"] == str(CHUNK)
+    assert second.json()["offset"] == len(recording)
+    assert status == {"session_id": session_id, "offset": len(recording), "complete": False}
+    assert complete.json()["size"] == len(recording)
+    assert complete.json()["path"] == str(tmp_path / "screen_recordings" / f"{session_id}.webm")
+    assert playback.content == recording
+    assert (tmp_path / "screen_recordings" / f"{session_id}.webm").read_bytes() == recording
+    assert not (tmp_path / "screen_recordings" / f"{session_id}.part").exists()
+
+
+async def _oversized(first_chunk: bytes, oversized: bytes):
+    async with api_client() as client:
+        session_id = await start_session(client)
+        base = f"/sessions/{session_id}/screen-recording"
+
+        await client.put(f"{base}/chunks", params={"offset": 0}, content=first_chunk)
+        rejected = await client.put(
+            f"{base}/chunks", params={"offset": len(first_chunk)}, content=_streamed(oversized)
+        )
+        declared = await client.put(
+            f"{base}/chunks", params={"offset": len(first_chunk)}, content=oversized
+        )
+        status = (await client.get(f"{base}/upload")).json()
+        return session_id, rejected, declared, status
+
+
+def test_oversized_chunk_keeps_no_bytes(uploads, tmp_path):
+    first_chunk = b"a" * 100
+    session_id, rejected, declared, status = asyncio.run(_oversized(first_chunk, b"b" * (CHUNK + 1)))
+
+    # Streamed past the limit, and refused up front from Content-Length
+    for response in (rejected, declared):
+        assert response.status_code == 413
+        assert response.json()["offset"] == len(first_chunk)
+        assert response.headers["Upload-Offset"] == str(len(first_chunk))
+    assert status["offset"] == len(first_chunk)
+    assert (tmp_path / "screen_recordings" / f"{session_id}.part").read_bytes() == first_chunk
@@ -0,0 +1,95 @@
+import asyncio
+import csv
+import io
+import json
+import random
+
+from app.core.database import AsyncSessionLocal
+from app.services import risk_rules
+from app.services.final_report_builder import build_final_report
+from app.services.risk_engine import calculate_risk_for_session
+from benchmarks._common import interview_events
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _export_and_live(session_count: int) -> tuple[list[dict], dict]:
+    rng = random.Random(18)
+    async with api_client() as client:
+        session_ids = []
+        for number in range(session_count):
+            session_id = await start_session(client)
+            events = interview_events(rng, rng.randint(0, 300), interview_start())
+            if events:
+                batch = [event(session_id, event_type, timestamp) for event_type, timestamp in events]
+                assert (await client.post("/events/batch", json={"events": batch})).status_code == 200
+            # Leave some sessions ACTIVE: they are scored live
+            if number % 3:
+                assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+            session_ids.append(session_id)
+
+        response = await client.get("/reports/export", params={"session_id": session_ids})
+        assert response.status_code == 200
+        exported = [json.loads(line) for line in response.text.splitlines()]
+
+    live = {}
+    async with AsyncSessionLocal() as db:
+        for session_id in session_ids:
+            raw_report = await calculate_risk_for_session(db, session_id)
+            live[session_id] = (raw_report, build_final_report(raw_report))
+    return exported, live
+
+
+def test_export_matches_live_reports():
+    exported, live = asyncio.run(_export_and_live(12))
+
+    assert sorted(line["session_id"] for line in exported) == sorted(live)
+    assert {line["status"] for line in exported} == {"ACTIVE", "ENDED"}
+    for line in exported:
+        raw_report, final_report = live[line["session_id"]]
+        assert line["raw_report"] == raw_report
+        assert line["final_report"] == final_report
+
+
+async def _export_after_reload(session_count: int, proposed: risk_rules.CompiledRules):
+    rng = random.Random(28)
+    async with api_client() as client:
+        session_ids = []
+        for _ in range(session_count):
+            session_id = await start_session(client)
+            events = interview_events(rng, rng.randint(20, 200), interview_start())
+            batch = [event(session_id, event_type, timestamp) for event_type, timestamp in events]
+            assert (await client.post("/events/batch", json={"events": batch})).status_code == 200
+            assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+            session_ids.append(session_id)
+
+        # Rules reloaded on this worker, no rescore run yet
+        risk_rules._rules = proposed
+        final = {
+            session_id: (await client.get(f"/reports/{session_id}/final")).json()
+            for session_id in session_ids
+        }
+        params = {"session_id": session_ids}
+        ndjson = (await client.get("/reports/export", params=params)).text
+        exported_csv = (await client.get("/reports/export", params={**params, "format": "csv"})).text
+    return final, [json.loads(line) for line in ndjson.splitlines()], exported_csv
+
+
+def test_export_serves_stored_reports_like_final(monkeypatch):
+    config = risk_rules.current().to_dict()
+    config["rules"]["TAB_SWITCH"]["score"] += 15
+    proposed = risk_rules.CompiledRules(config["rules"], config["thresholds"])
+    monkeypatch.setattr(risk_rules, "_rules", risk_rules.current())
+
+    final, exported, exported_csv = asyncio.run(_export_after_reload(6, proposed))
+
+    assert {line["session_id"]: line["final_report"] for line in exported} == final
+    rows = list(csv.DictReader(io.StringIO(exported_csv)))
+    assert sorted(row["session_id"] for row in rows) == sorted(final)
+    for row in rows:
+        report = final[row["session_id"]]
+        assert row["status"] == "ENDED"
+        assert int(row["risk_score"]) == report["summary"]["risk_score"]
+        assert row["risk_level"] == report["summary"]["risk_level"]
+        assert float(row["movement_percentage"]) == report["summary"]["movement_percentage"]
+        for column, value in report["behavior_counts"].items():
+            assert row[column] == str(value)
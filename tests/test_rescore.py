@@ -0,0 +1,105 @@
+import asyncio
+import json
+import random
+from collections import Counter
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.jobs.rescore import RuleTables, rescore
+from app.models.risk_score import RiskScore
+from app.models.session_report import SessionReport
+from app.models.session_risk import SessionRisk
+from app.services import risk_rules
+from app.services.final_report_builder import build_final_report
+from app.services.risk_engine import calculate_risk_for_session
+from benchmarks._common import interview_events
+from tests.helpers import api_client, event, interview_start, start_session
+
+PROPOSAL = {
+    "rules": {"TAB_SWITCH": {"score": 25, "max_hits": 10}},
+    "thresholds": {"SUSPICIOUS": 30},
+}
+
+
+async def _ended_sessions(count: int) -> list[str]:
+    rng = random.Random(19)
+    async with api_client() as client:
+        session_ids = []
+        for _ in range(count):
+            session_id = await start_session(client)
+            events = interview_events(rng, rng.randint(1, 200), interview_start())
+            batch = [event(session_id, event_type, timestamp) for event_type, timestamp in events]
+            assert (await client.post("/events/batch", json={"events": batch})).status_code == 200
+            assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+            # Cache the frozen report
+            assert (await client.get(f"/reports/{session_id}/final")).status_code == 200
+            session_ids.append(session_id)
+    return session_ids
+
+
+async def _live_reports(session_ids: list[str]) -> dict:
+    async with AsyncSessionLocal() as db:
+        reports = {}
+        for session_id in session_ids:
+            raw_report = await calculate_risk_for_session(db, session_id)
+            reports[session_id] = build_final_report(raw_report)
+        return reports
+
+
+async def _final_reports(session_ids: list[str]) -> dict:
+    async with api_client() as client:
+        return {
+            session_id: (await client.get(f"/reports/{session_id}/final")).json()
+            for session_id in session_ids
+        }
+
+
+def _snapshot() -> tuple:
+    with SessionLocal() as db:
+        return (
+            db.execute(select(SessionRisk.session_id, SessionRisk.score, SessionRisk.rule_version)).all(),
+            db.scalar(select(func.count()).select_from(RiskScore)),
+            db.scalar(select(func.count()).select_from(SessionReport)),
+        )
+
+
+def _proposed_rules(tmp_path) -> tuple[str, risk_rules.CompiledRules]:
+    path = tmp_path / "proposal.json"
+    path.write_text(json.dumps(PROPOSAL))
+    config = risk_rules.current().to_dict()
+    config["rules"]["TAB_SWITCH"].update(PROPOSAL["rules"]["TAB_SWITCH"])
+    config["thresholds"].update(PROPOSAL["thresholds"])
+    return str(path), risk_rules.CompiledRules(config["rules"], config["thresholds"])
+
+
+def test_dry_run_predicts_levels_and_writes_nothing(tmp_path, monkeypatch):
+    session_ids = asyncio.run(_ended_sessions(15))
+    path, proposed = _proposed_rules(tmp_path)
+    before = _snapshot()
+
+    with SessionLocal() as db:
+        result = rescore(db, RuleTables.from_proposal(path), dry_run=True)
+
+    assert _snapshot() == before
+    assert result["sessions"] == len(session_ids)
+    assert result["rule_version"] == proposed.version
+
+    monkeypatch.setattr(risk_rules, "_rules", proposed)
+    expected = asyncio.run(_live_reports(session_ids))
+    assert result["levels_after"] == dict(Counter(
+        report["summary"]["risk_level"] for report in expected.values()
+    ))
+    assert result["changed"] > 0
+
+
+def test_rescore_replaces_cached_reports(tmp_path, monkeypatch):
+    session_ids = asyncio.run(_ended_sessions(10))
+    _, proposed = _proposed_rules(tmp_path)
+
+    # The rules file changed and every worker reloaded it
+    monkeypatch.setattr(risk_rules, "_rules", proposed)
+    with SessionLocal() as db:
+        result = rescore(db, RuleTables.current())
+
+    assert result["changed"] > 0
+    assert asyncio.run(_final_reports(session_ids)) == asyncio.run(_live_reports(session_ids))
@@ -0,0 +1,39 @@
+import asyncio
+import copy
+from datetime import timedelta
+
+from app.core.database import AsyncSessionLocal
+from app.services import risk_state
+from app.services.risk_engine import calculate_risk_for_session
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _score_on_two_workers() -> tuple[int, int]:
+    async with api_client() as client:
+        session_id = await start_session(client)
+        start = interview_start()
+
+        async def post(minutes: int) -> int:
+            response = await client.post(
+                "/events", json=event(session_id, "TAB_SWITCH", start + timedelta(minutes=minutes))
+            )
+            assert response.status_code == 200
+            return response.json()["current_risk_score"]
+
+        await post(0)
+        # Worker A's state; the next event is scored by worker B
+        worker_a = copy.deepcopy((risk_state._accumulators, risk_state._written))
+        await post(1)
+        risk_state._accumulators, risk_state._written = worker_a
+
+        score = await post(2)
+        async with AsyncSessionLocal() as db:
+            expected = (await calculate_risk_for_session(db, session_id))["risk_score"]
+        return score, expected
+
+
+def test_accumulator_catches_up_with_another_workers_writes():
+    score, expected = asyncio.run(_score_on_two_workers())
+
+    assert score == expected
+    assert score == 30
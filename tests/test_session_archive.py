@@ -0,0 +1,57 @@
+import asyncio
+import random
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.jobs.archive import archive
+from app.services import blob_storage, report_cache, session_archive
+from benchmarks._common import interview_events
+from tests.helpers import api_client, event, interview_start, start_session
+
+COMPRESSIONS = ["gzip", pytest.param("zstd", marks=pytest.mark.skipif(
+    session_archive.default_compression() != "zstd", reason="zstandard is not installed"
+))]
+
+
+async def _ended_session() -> tuple[str, dict]:
+    async with api_client() as client:
+        session_id = await start_session(client)
+        events = interview_events(random.Random(23), 3000, interview_start())
+        batch = [event(session_id, event_type, timestamp) for event_type, timestamp in events]
+        for start in range(0, len(batch), 1000):
+            assert (await client.post("/events/batch", json={"events": batch[start:start + 1000]})).status_code == 200
+        assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+        return session_id, (await client.get(f"/reports/{session_id}/final")).json()
+
+
+async def _archive(compression: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await archive(db, older_than_days=-1, compression=compression)
+
+
+async def _archived_final(session_id: str) -> dict:
+    async with api_client() as client:
+        return (await client.get(f"/reports/{session_id}/final")).json()
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_archived_reports_are_read_from_the_first_line(compression, monkeypatch):
+    session_id, final_report = asyncio.run(_ended_session())
+    stats = asyncio.run(_archive(compression))
+    assert stats["archived"] == 1
+
+    # Small reads, counted, to see that the rest of the archive is not fetched
+    monkeypatch.setattr(blob_storage, "READ_CHUNK_BYTES", 1024)
+    fetched = []
+    read = blob_storage.storage.read
+
+    async def counting_read(*args, **kwargs):
+        async for chunk in read(*args, **kwargs):
+            fetched.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(blob_storage.storage, "read", counting_read)
+    report_cache._lru.clear()
+    assert asyncio.run(_archived_final(session_id)) == final_report
+    assert 0 < sum(fetched) < stats["bytes"]
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import timedelta
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models.session import InterviewSession
+from app.services import session_cache
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _post_after_foreign_end() -> tuple:
+    async with api_client() as client:
+        session_id = await start_session(client)
+        start = interview_start()
+        first = await client.post("/events", json=event(session_id, "TAB_SWITCH", start))
+        assert first.status_code == 200
+
+        # Another worker ends the session; this worker still caches ACTIVE
+        with SessionLocal() as db:
+            db.execute(
+                update(InterviewSession)
+                .where(InterviewSession.id == session_id)
+                .values(status="ENDED")
+            )
+            db.commit()
+        assert session_cache.get(session_id) == "ACTIVE"
+
+        late = event(session_id, "TAB_SWITCH", start + timedelta(minutes=1))
+        single = await client.post("/events", json=late)
+        batch = await client.post("/events/batch", json={"events": [late]})
+        return single, batch.json(), session_cache.get(session_id)
+
+
+def test_stale_active_status_does_not_admit_events():
+    single, batch, cached = asyncio.run(_post_after_foreign_end())
+
+    assert single.status_code == 400
+    assert batch["results"][0]["status"] == "rejected"
+    assert batch["sessions"] == {}
+    # The stale entry is dropped, so later requests are refused from the cache
+    assert cached == "ENDED"
@@ -0,0 +1,92 @@
+import queue
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.ai import face_monitor
+from app.ai.shared_frames import SharedFrameRing
+from app.ai.worker_pool import FaceWorkerPool, _worker_main
+
+SHAPE = (48, 64, 3)
+
+
+class NoFaceDetector:
+    def process(self, rgb):
+        return SimpleNamespace(detections=[])
+
+
+def _pool(frame_queue, control_queue, **options) -> FaceWorkerPool:
+    """A one-worker pool wired to in-process queues instead of processes."""
+    pool = FaceWorkerPool(num_workers=1, **options)
+    pool._frame_queues = [frame_queue]
+    pool._control_queues = [control_queue]
+    return pool
+
+
+def _frame(session_id, slot, timestamp, seq):
+    return ("frame", session_id, slot, SHAPE, timestamp, timestamp, seq)
+
+
+def test_drop_oldest_leaves_control_messages_in_place():
+    frame_queue, control_queue = queue.Queue(), queue.Queue()
+    pool = _pool(frame_queue, control_queue, drop_policy="drop_oldest")
+    pool._rings = [SimpleNamespace(free_slots=queue.Queue())]
+
+    frame_queue.put(_frame("a", 0, 1.0, 0))
+    pool.close_session("b")
+    frame_queue.put(_frame("a", 1, 2.0, 1))
+
+    assert pool._acquire_slot(0) == 0
+    assert control_queue.get_nowait() == ("close", "b", -1)
+    # The next queued frame is untouched; the wake-up may go
+    assert pool._acquire_slot(0) == 1
+    assert frame_queue.empty()
+
+
+def test_worker_discards_frames_queued_before_their_session_closed(monkeypatch):
+    monkeypatch.setattr(face_monitor, "create_detector", NoFaceDetector)
+    frame_queue, control_queue, result_queue = queue.Queue(), queue.Queue(), queue.Queue()
+    ring = SharedFrameRing(3, SHAPE, queue)
+    slots = [ring.free_slots.get_nowait() for _ in range(3)]
+    for slot in slots:
+        ring.write(slot, np.zeros(SHAPE, dtype=np.uint8))
+
+    # Two frames submitted before the close, one after it reopened the session
+    frame_queue.put(_frame("s", slots[0], 0.0, 0))
+    frame_queue.put(_frame("s", slots[1], 5.0, 1))
+    frame_queue.put(_frame("s", slots[2], 10.0, 2))
+    control_queue.put(("close", "s", 1))
+    control_queue.put(None)
+
+    try:
+        _worker_main(0, frame_queue, control_queue, result_queue, ring.attach_args(), 0.5, 0, 8, False)
+    finally:
+        ring.close()
+
+    results = []
+    while not result_queue.empty():
+        results.append(result_queue.get_nowait())
+    assert not [item for item in results if item[0] == "events"]
+    [(_, _, stats, _)] = [item for item in results if item[0] == "stats"]
+    assert stats["processed"] == 1
+    assert stats["sessions"] == 1
+    assert ring.free_slots.qsize() == 3
+
+
+def test_collector_survives_a_failing_callback():
+    delivered = []
+
+    def on_events(session_id, events, timestamp):
+        if session_id == "bad":
+            raise RuntimeError("sender down")
+        delivered.append(session_id)
+
+    pool = FaceWorkerPool(num_workers=1, on_events=on_events)
+    pool._result_queue = queue.Queue()
+    for session_id in ("bad", "good"):
+        pool._result_queue.put(("events", session_id, ["FACE_MISSING"], 1.0))
+    pool._result_queue.put(None)
+
+    pool._collect()
+
+    assert delivered == ["good"]
@@ -0,0 +1,33 @@
+import asyncio
+from datetime import timedelta
+
+from app.core.config import settings
+from app.main import app
+from tests.helpers import api_client, event, interview_start, start_session
+
+
+async def _queue_then_end() -> tuple[dict, dict]:
+    async with api_client() as client:
+        session_id = await start_session(client)
+        start = interview_start()
+        for second in range(5):
+            # Far apart, so none are coalesced
+            timestamp = start + timedelta(minutes=second)
+            response = await client.post("/events", json=event(session_id, "TAB_SWITCH", timestamp))
+            assert response.status_code == 202
+
+        assert (await client.post(f"/sessions/{session_id}/end")).status_code == 200
+        final_report = (await client.get(f"/reports/{session_id}/final")).json()
+        return final_report, app.state.event_queue.stats()
+
+
+def test_end_keeps_events_acknowledged_before_it(monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_WRITE_BEHIND", True)
+    # Still queued when the end request arrives
+    monkeypatch.setattr(settings, "EVENT_QUEUE_FLUSH_INTERVAL_SEC", 0.5)
+
+    final_report, stats = asyncio.run(_queue_then_end())
+
+    assert final_report["behavior_counts"]["tab_switch"] == 5
+    assert stats["rejected"] == 0
+    assert stats["flushed"] == 5